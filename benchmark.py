@@ -0,0 +1,232 @@
+"""Offline benchmark of the extraction pipeline on a synthetic corpus
+
+Generates (or reuses) a deterministic corpus with syllabus_corpus, then times
+each stage of the pipeline on it: read_file, parallel load_documents, Syllabus
+parsing, extract_section, extract_prerequisites, check_boilerplate,
+write_to_excel, build_comparison, diff_sections, write_comparison_to_excel and
+write_comparisons_to_excel (all comparisons in one workbook). Each stage reports its throughput and the peak
+memory it allocated, so regressions show up as a drop in one row.
+
+Example:
+    python benchmark.py -n 1000 --formats txt,pdf --json results.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from syllabus_core import (
+    predefined_sections, read_file, load_documents, Syllabus, extract_section,
+    extract_prerequisites, write_to_excel, build_comparison, write_comparison_to_excel, write_comparisons_to_excel
+)
+from syllabus_corpus import generate_corpus, parse_formats
+from syllabus_diff import diff_sections
+from syllabus_similarity import check_boilerplate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Corpus sizes the suite is meant to cover
+MIN_DOCUMENTS = 10
+MAX_DOCUMENTS = 10000
+
+
+def run_stage(name, func, items, unit, size_bytes=None, trace_memory=True):
+    """Time func() and return its result with a stage report of throughput and peak traced memory"""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    stage = {
+        'stage': name,
+        'items': items,
+        'unit': unit,
+        'seconds': seconds,
+        'items_per_second': items / seconds if seconds else None,
+        'mb_per_second': size_bytes / seconds / 1e6 if size_bytes is not None and seconds else None,
+        'peak_memory_bytes': peak,
+    }
+    return result, stage
+
+
+def run_benchmark(paths, workers=None, pairs=10, trace_memory=True, log=None):
+    """Run every stage over paths and return the list of stage reports"""
+    stages = []
+    sections = list(predefined_sections)
+    file_bytes = sum(os.path.getsize(path) for path in paths)
+
+    def record(stage):
+        stages.append(stage)
+        if log:
+            log(format_stage(stage))
+
+    texts, stage = run_stage(
+        'read_file', lambda: [read_file(path) or "" for path in paths],
+        len(paths), 'docs', file_bytes, trace_memory
+    )
+    record(stage)
+    text_bytes = sum(len(text.encode('utf-8')) for text in texts)
+
+    def load():
+        # Drain the generator so every worker's result is counted
+        return sum(1 for result in load_documents(paths, workers=workers) if result['syllabus'])
+    _, stage = run_stage('load_documents', load, len(paths), 'docs', file_bytes, trace_memory)
+    record(stage)
+
+    syllabi, stage = run_stage(
+        'Syllabus', lambda: [Syllabus(path, text) for path, text in zip(paths, texts)],
+        len(paths), 'docs', text_bytes, trace_memory
+    )
+    record(stage)
+
+    def extract_all():
+        return [
+            {section: extract_section(syllabus.text, section, syllabus.index) for section in sections}
+            for syllabus in syllabi
+        ]
+    extracted, stage = run_stage(
+        'extract_section', extract_all, len(paths) * len(sections), 'sections', text_bytes, trace_memory
+    )
+    record(stage)
+
+    _, stage = run_stage(
+        'extract_prerequisites', lambda: [extract_prerequisites(text) for text in texts],
+        len(paths), 'docs', text_bytes, trace_memory
+    )
+    record(stage)
+
+    _, stage = run_stage(
+        'check_boilerplate', lambda: check_boilerplate(syllabi), len(syllabi), 'docs', None, trace_memory
+    )
+    record(stage)
+
+    rows = [syllabus.export_row(sections) for syllabus in syllabi]
+    _, stage = run_stage(
+        'write_to_excel', lambda: write_to_excel(BytesIO(), rows),
+        len(rows), 'rows', None, trace_memory
+    )
+    record(stage)
+
+    count = max(0, min(pairs, len(syllabi) - 1))
+    comparisons, stage = run_stage(
+        'build_comparison', lambda: [build_comparison(syllabi[i], syllabi[i + 1], sections) for i in range(count)],
+        count, 'pairs', None, trace_memory
+    )
+    record(stage)
+
+    _, stage = run_stage(
+        'diff_sections', lambda: [
+            [diff_sections(extracted[i][section], extracted[i + 1][section]) for section in sections]
+            for i in range(len(comparisons))
+        ],
+        len(comparisons) * len(sections), 'sections', None, trace_memory
+    )
+    record(stage)
+
+    def compare_all():
+        for comparison_data in comparisons:
+            write_comparison_to_excel(BytesIO(), comparison_data)
+    _, stage = run_stage(
+        'write_comparison_to_excel', compare_all, len(comparisons), 'workbooks', None, trace_memory
+    )
+    record(stage)
+
+    _, stage = run_stage(
+        'write_comparisons_to_excel',
+        lambda: write_comparisons_to_excel(BytesIO(), [(f"Pair {i}", data) for i, data in enumerate(comparisons, 1)]),
+        len(comparisons), 'sheets', None, trace_memory
+    )
+    record(stage)
+
+    return stages
+
+
+def format_stage(stage):
+    """One aligned report line for a stage"""
+    rate = f"{stage['items_per_second']:>10.1f} {stage['unit']}/s" if stage['items_per_second'] else f"{'-':>10} {stage['unit']}/s"
+    mb_rate = f"{stage['mb_per_second']:>7.2f} MB/s" if stage['mb_per_second'] else f"{'':>12}"
+    peak = f"{stage['peak_memory_bytes'] / 1e6:>8.1f} MB peak" if stage['peak_memory_bytes'] is not None else ''
+    return f"{stage['stage']:<26} {stage['seconds']:>8.3f} s  {rate:<22} {mb_rate}  {peak}"
+
+
+def max_rss_bytes():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS), or None"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark syllabus extraction on a synthetic corpus.")
+    parser.add_argument('-n', '--documents', type=int, default=100,
+                        help=f"Corpus size, {MIN_DOCUMENTS} to {MAX_DOCUMENTS} (default: %(default)s)")
+    parser.add_argument('--formats', type=parse_formats, default=('.txt', '.docx', '.pdf'),
+                        help="Comma-separated formats to generate (default: txt,docx,pdf)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed (default: %(default)s)")
+    parser.add_argument('--corpus', help="Keep the corpus in this directory, reusing it if already generated")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Processes for the load_documents stage (defaults to the CPU count)")
+    parser.add_argument('--pairs', type=int, default=10,
+                        help="Comparison workbooks to write (default: %(default)s)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip tracemalloc, whose overhead slows allocation-heavy stages")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not MIN_DOCUMENTS <= args.documents <= MAX_DOCUMENTS:
+        parser.error(f"-n/--documents must be between {MIN_DOCUMENTS} and {MAX_DOCUMENTS}")
+    if args.workers is not None and args.workers < 1:
+        parser.error("-j/--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix='syllabi_benchmark_')
+    try:
+        # A kept corpus is only regenerated when its parameters change
+        marker = Path(corpus_dir) / 'corpus.json'
+        settings = {'documents': args.documents, 'formats': list(args.formats), 'seed': args.seed}
+        if marker.exists() and json.loads(marker.read_text()) == settings:
+            paths = sorted(path for path in Path(corpus_dir).iterdir() if path.suffix in args.formats)
+        else:
+            start = time.perf_counter()
+            paths = generate_corpus(corpus_dir, args.documents, args.formats, args.seed)
+            marker.write_text(json.dumps(settings))
+            print(f"Generated {len(paths)} syllabi in {time.perf_counter() - start:.1f} s")
+
+        print(f"Benchmarking {len(paths)} document(s) ({', '.join(args.formats)})")
+        stages = run_benchmark(paths, args.workers, args.pairs, not args.no_memory, print)
+    finally:
+        if not args.corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    peak_rss = max_rss_bytes()
+    if peak_rss is not None:
+        print(f"Peak resident memory: {peak_rss / 1e6:.1f} MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'corpus': settings, 'stages': stages, 'peak_rss_bytes': peak_rss}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
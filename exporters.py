@@ -0,0 +1,138 @@
+"""Export rows in columnar and line-oriented formats alongside Excel
+
+Every writer takes the row dicts Syllabus.export_row builds (Source File,
+Course Code, Course Title and one key per section) and the same arguments as
+write_to_excel, so callers pick one with exporter_for(path) by the output's
+extension. CSV and JSON Lines are streamed a row at a time; Parquet is
+written in row groups of PARQUET_BATCH_ROWS and needs pyarrow, which is
+optional.
+"""
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from profiling import stage
+from syllabus_core import export_columns, metadata_column, write_to_excel
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_ROWS = 1000
+
+
+class _TextOutput:
+    """A path or writable binary file object opened for UTF-8 text, leaving file objects open on exit"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.stream = None
+
+    def __enter__(self):
+        if hasattr(self.file_path, 'write'):
+            self.stream = io.TextIOWrapper(self.file_path, encoding='utf-8', newline='')
+        else:
+            self.stream = open(self.file_path, 'w', encoding='utf-8', newline='')
+        return self.stream
+
+    def __exit__(self, *exc):
+        if hasattr(self.file_path, 'write'):
+            self.stream.flush()
+            self.stream.detach()
+        else:
+            self.stream.close()
+
+
+def _columns_and_rows(data, columns):
+    """The export columns and the rows, collecting the rows first when the columns must be worked out"""
+    if columns is None:
+        data = list(data)
+        columns = export_columns(data) if data else []
+    return columns, data
+
+
+def write_csv(file_path, data, columns=None):
+    """Write export rows as CSV with a header row; missing sections are left empty"""
+    columns, data = _columns_and_rows(data, columns)
+    with stage('csv write'), _TextOutput(file_path) as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(data)
+
+
+def write_jsonl(file_path, data, columns=None):
+    """Write one JSON object per row; with columns, each object has exactly those keys"""
+    with stage('jsonl write'), _TextOutput(file_path) as f:
+        for row_data in data:
+            if columns is not None:
+                row_data = {column: row_data.get(column) for column in columns}
+            f.write(json.dumps(row_data, ensure_ascii=False))
+            f.write('\n')
+
+
+def _arrow_type(column):
+    """Arrow type of an export column: boolean or integer for section metadata, string for everything else"""
+    if column.endswith(metadata_column('', 'Found')):
+        return pyarrow.bool_()
+    if column.endswith((metadata_column('', 'Characters'), metadata_column('', 'Page'))):
+        return pyarrow.int64()
+    return pyarrow.string()
+
+
+def write_parquet(file_path, data, columns=None):
+    """Write export rows as a Parquet table, one row group per PARQUET_BATCH_ROWS rows
+
+    Sections are string columns; section metadata columns keep their
+    boolean and integer types.
+    """
+    if pyarrow is None:
+        raise ValueError("pyarrow is required to write Parquet files (pip install pyarrow)")
+    columns, data = _columns_and_rows(data, columns)
+    schema = pyarrow.schema([(column, _arrow_type(column)) for column in columns])
+    with stage('parquet write'):
+        rows = iter(data)
+        batch = list(islice(rows, PARQUET_BATCH_ROWS))
+        writer = pyarrow.parquet.ParquetWriter(file_path, schema)
+        try:
+            while batch:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                batch = list(islice(rows, PARQUET_BATCH_ROWS))
+        finally:
+            writer.close()
+
+
+# Writer for each supported output extension
+EXPORTERS = {
+    '.xlsx': write_to_excel,
+    '.csv': write_csv,
+    '.jsonl': write_jsonl,
+    '.parquet': write_parquet,
+}
+
+# Download MIME type of each output extension
+EXPORT_MIME_TYPES = {
+    '.xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    '.csv': "text/csv",
+    '.jsonl': "application/jsonl",
+    '.parquet': "application/vnd.apache.parquet",
+}
+
+
+def export_formats():
+    """Output extensions that can be written here (Parquet only when pyarrow is installed)"""
+    return [extension for extension in EXPORTERS if extension != '.parquet' or pyarrow is not None]
+
+
+def exporter_for(file_path):
+    """The writer for an output path's extension, raising ValueError for formats that cannot be written"""
+    extension = Path(str(file_path)).suffix.lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"unsupported export format {extension or str(file_path)!r} "
+                         f"(use {', '.join(EXPORTERS)})")
+    if extension not in export_formats():
+        raise ValueError("pyarrow is required to write Parquet files (pip install pyarrow)")
+    return EXPORTERS[extension]
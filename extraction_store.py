@@ -0,0 +1,252 @@
+"""Persistent store of extraction results: documents, course info and every section with its offsets"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from text_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_STORE_PATH = DEFAULT_CACHE_DIR / 'extractions.sqlite3'
+
+
+class ExtractionStore:
+    """SQLite store of what was extracted from each document
+
+    Documents are keyed by the SHA-256 of their text plus the extractor
+    version, so identical files share one entry and results from an older
+    extractor are never reused. Each document keeps its course code and
+    title, prerequisites and, for every section looked up, its
+    (heading, content start, content end) offsets and extracted text, or
+    NULLs when the section was not found. Files on disk point at the
+    document they last held, so exports and searches can be served without
+    opening them; files that have since been deleted or renamed are dropped.
+    Like the text cache, a store that fails never breaks extraction.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The connection is shared by every thread of the process (e.g. the web app's sessions)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "content_hash TEXT NOT NULL, extractor_version TEXT NOT NULL, "
+            "course_code TEXT, course_title TEXT, prerequisites TEXT, "
+            "PRIMARY KEY (content_hash, extractor_version))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            "content_hash TEXT NOT NULL, extractor_version TEXT NOT NULL, section TEXT NOT NULL, "
+            "heading_start INTEGER, content_start INTEGER, content_end INTEGER, body TEXT, "
+            "PRIMARY KEY (content_hash, extractor_version, section))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "path TEXT PRIMARY KEY, name TEXT NOT NULL, content_hash TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS documents_course_code ON documents (course_code)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sections_section ON sections (section, extractor_version)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sources_content_hash ON sources (content_hash)")
+        self.conn.commit()
+
+    def hydrate(self, syllabus, extractor_version):
+        """Fill a Syllabus's memoized sections, spans and prerequisites from the store; False if not stored"""
+        content_hash = syllabus.content_hash
+        try:
+            with self.lock:
+                document = self.conn.execute(
+                    "SELECT prerequisites FROM documents WHERE content_hash = ? AND extractor_version = ?",
+                    (content_hash, extractor_version)
+                ).fetchone()
+                if document is None:
+                    return False
+                rows = self.conn.execute(
+                    "SELECT section, heading_start, content_start, content_end, body FROM sections "
+                    "WHERE content_hash = ? AND extractor_version = ?",
+                    (content_hash, extractor_version)
+                ).fetchall()
+        except sqlite3.Error:
+            return False
+
+        for section, heading_start, content_start, content_end, body in rows:
+            syllabus._spans[section] = (heading_start, content_start, content_end) if heading_start is not None else None
+            syllabus._sections[section] = body
+        if document[0] is not None:
+            syllabus._prerequisites = document[0]
+        return True
+
+    def save(self, syllabus, sections, extractor_version):
+        """Record a Syllabus's course info, prerequisites and the given sections"""
+        rows = []
+        for section in sections:
+            span = syllabus.span(section)
+            rows.append((
+                syllabus.content_hash, extractor_version, section,
+                span[0] if span else None, span[1] if span else None, span[2] if span else None,
+                syllabus.section(section)
+            ))
+        # Empty string records a prerequisite search that found nothing
+        prerequisites = syllabus.prerequisites() or ''
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO documents (content_hash, extractor_version, course_code, course_title, prerequisites) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (syllabus.content_hash, extractor_version, syllabus.course_code, syllabus.course_title, prerequisites)
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO sections "
+                    "(content_hash, extractor_version, section, heading_start, content_start, content_end, body) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+
+    def record_source(self, path, syllabus):
+        """Point a file on disk at the document it currently holds"""
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources (path, name, content_hash, updated) VALUES (?, ?, ?, ?)",
+                    (os.path.abspath(path), syllabus.name, syllabus.content_hash, time.time())
+                )
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+
+    def forget_sources(self, paths):
+        """Stop pointing the given files (e.g. deleted or renamed ones) at any document"""
+        with self.lock:
+            try:
+                self.conn.executemany(
+                    "DELETE FROM sources WHERE path = ?", [(os.path.abspath(path),) for path in paths]
+                )
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+
+    def _present(self, rows):
+        """Rows (path first) whose file still exists, forgetting the files that are gone"""
+        present = [row for row in rows if os.path.isfile(row[0])]
+        if len(present) < len(rows):
+            self.forget_sources({row[0] for row in rows} - {row[0] for row in present})
+        return present
+
+    def export_rows(self, sections, extractor_version, course_code=None, paths=None):
+        """Export rows (as Syllabus.export_row builds them) for stored files, from two bulk queries
+
+        course_code is an SQL LIKE pattern (e.g. 'SM 2%'); paths limits the
+        rows to those files. Files whose document was stored without one of
+        the sections get "[Not Found]" for it. Files no longer on disk are
+        left out and forgotten.
+        """
+        query = (
+            "SELECT sources.path, sources.name, sources.content_hash, documents.course_code, "
+            "documents.course_title, documents.prerequisites "
+            "FROM sources JOIN documents ON documents.content_hash = sources.content_hash "
+            "AND documents.extractor_version = ?"
+        )
+        parameters = [extractor_version]
+        if course_code is not None:
+            query += " WHERE documents.course_code LIKE ?"
+            parameters.append(course_code)
+        query += " ORDER BY sources.path"
+
+        # One pass over the section index for every requested section
+        bodies = {}
+        with self.lock:
+            documents = self.conn.execute(query, parameters).fetchall()
+            if sections:
+                placeholders = ', '.join('?' for _ in sections)
+                for content_hash, section, body in self.conn.execute(
+                    f"SELECT content_hash, section, body FROM sections "
+                    f"WHERE section IN ({placeholders}) AND extractor_version = ?",
+                    list(sections) + [extractor_version]
+                ):
+                    bodies[(content_hash, section)] = body
+
+        # Checked once the lock is released, since forgetting missing files takes it again
+        documents = self._present(documents)
+        if paths is not None:
+            wanted = {os.path.abspath(path) for path in paths}
+            documents = [document for document in documents if document[0] in wanted]
+
+        rows = []
+        for path, name, content_hash, code, title, prerequisites in documents:
+            row_data = {'Source File': name, 'Course Code': code or 'Unknown', 'Course Title': title or 'Unknown'}
+            for section in sections:
+                row_data[section] = bodies.get((content_hash, section)) or "[Not Found]"
+            if 'Prerequisites' in sections and row_data['Prerequisites'] == "[Not Found]" and prerequisites:
+                row_data['Prerequisites'] = prerequisites
+            rows.append(row_data)
+        return rows
+
+    def find(self, extractor_version, course_code=None, section=None, contains=None):
+        """Stored sections matching a course code LIKE pattern, section name and/or substring
+
+        Returns {'path', 'course_code', 'course_title', 'section', 'body'}
+        dicts for every file still on disk pointing at a matching document.
+        """
+        query = (
+            "SELECT sources.path, documents.course_code, documents.course_title, sections.section, sections.body "
+            "FROM sections "
+            "JOIN documents ON documents.content_hash = sections.content_hash "
+            "AND documents.extractor_version = sections.extractor_version "
+            "JOIN sources ON sources.content_hash = sections.content_hash "
+            "WHERE sections.extractor_version = ? AND sections.body IS NOT NULL"
+        )
+        parameters = [extractor_version]
+        if course_code is not None:
+            query += " AND documents.course_code LIKE ?"
+            parameters.append(course_code)
+        if section is not None:
+            query += " AND sections.section = ?"
+            parameters.append(section)
+        if contains is not None:
+            query += " AND instr(lower(sections.body), lower(?)) > 0"
+            parameters.append(contains)
+        query += " ORDER BY sources.path, sections.section"
+        with self.lock:
+            rows = self.conn.execute(query, parameters).fetchall()
+        return [
+            {'path': path, 'course_code': code, 'course_title': title, 'section': section_name, 'body': body}
+            for path, code, title, section_name, body in self._present(rows)
+        ]
+
+    def stats(self):
+        """Return the number of stored documents and of files pointing at them"""
+        with self.lock:
+            documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            sources = self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        return {'documents': documents, 'sources': sources}
+
+    def clear(self):
+        """Remove every stored result"""
+        with self.lock:
+            self.conn.execute("DELETE FROM sections")
+            self.conn.execute("DELETE FROM documents")
+            self.conn.execute("DELETE FROM sources")
+            self.conn.commit()
+            self.conn.execute("VACUUM")
+
+    def close(self):
+        self.conn.close()
+
+
+_open_stores = {}
+
+
+def open_store(path):
+    """Return this process's ExtractionStore for path, or None if it cannot be opened"""
+    path = str(path)
+    if path not in _open_stores:
+        try:
+            _open_stores[path] = ExtractionStore(path)
+        except (OSError, sqlite3.Error):
+            _open_stores[path] = None
+    return _open_stores[path]
@@ -0,0 +1,120 @@
+"""Incremental re-extraction of a folder of syllabi as files are added, changed or removed
+
+A FolderWatcher remembers, per file, its size, modification time, content
+hash and extraction result. Each scan only stats the files; a file is hashed
+when its size or mtime changed, and parsed again only when its hash changed,
+so touching or re-copying an unchanged syllabus costs one read and editing one
+syllabus costs one parse. Polling needs no extra dependencies and works on
+network shares where change notifications are unreliable.
+"""
+import hashlib
+import os
+import time
+from extraction_store import open_store
+from syllabus_core import load_documents, sort_by_course_number
+
+# Seconds a file's mtime must be in the past before it is read, so a syllabus
+# still being copied into the folder is picked up on a later scan instead
+SETTLE_SECONDS = 2.0
+
+
+def file_hash(path):
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    """Per-document extraction results for a set of files, kept current by update()
+
+    list_files is called on every scan and returns the syllabus paths to
+    track (e.g. collect_files over the watched folders).
+    """
+
+    def __init__(self, list_files, sections, workers=None, cache_path=None, log=None, settle=SETTLE_SECONDS,
+                 store_path=None, metadata=False):
+        self.list_files = list_files
+        self.sections = sections
+        self.workers = workers
+        self.cache_path = cache_path
+        self.store_path = store_path
+        self.metadata = metadata
+        self.log = log
+        self.settle = settle
+        # path -> {'size', 'mtime_ns', 'hash', 'syllabus', 'row', 'error'}
+        self.documents = {}
+        self.order = []
+
+    def scan(self):
+        """Return (paths to parse, paths no longer present), refreshing stat info of unchanged files"""
+        paths = [str(path) for path in self.list_files()]
+        now = time.time()
+        changed = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            document = self.documents.get(path)
+            if document and (document['size'], document['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            if now - stat.st_mtime < self.settle:
+                continue
+            try:
+                digest = file_hash(path)
+            except OSError:
+                continue
+            if document and document['hash'] == digest:
+                # Touched or re-copied but identical; nothing to re-extract
+                document['size'], document['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+                continue
+            self.documents[path] = {
+                'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest,
+                'syllabus': None, 'row': None, 'error': None
+            }
+            changed.append(path)
+
+        present = set(paths)
+        removed = [path for path in self.documents if path not in present]
+        self.order = [path for path in paths if path in self.documents]
+        return changed, removed
+
+    def update(self):
+        """Re-extract new and modified files and forget removed ones; return (changed, removed) paths"""
+        changed, removed = self.scan()
+        for path in removed:
+            del self.documents[path]
+        # Deleted or renamed files must not linger in --from-store exports
+        store = open_store(self.store_path) if self.store_path and removed else None
+        if store is not None:
+            store.forget_sources(removed)
+
+        for result in load_documents(
+            changed, self.sections, self.workers, self.cache_path, self.store_path, self.metadata
+        ):
+            document = self.documents[result['path']]
+            document['syllabus'] = result['syllabus']
+            document['row'] = result['row']
+            document['error'] = result['error'] or (None if result['syllabus'] else "no text extracted")
+            if document['error'] and self.log:
+                self.log(f"Failed to load {result['path']}: {document['error']}")
+        return changed, removed
+
+    def rows(self):
+        """Export rows of every successfully extracted file, sorted by course number"""
+        return sort_by_course_number(
+            self.documents[path]['row'] for path in self.order if self.documents[path]['row'] is not None
+        )
+
+    def syllabi(self):
+        """Parsed Syllabus objects of every successfully extracted file, in file order"""
+        return [
+            self.documents[path]['syllabus'] for path in self.order if self.documents[path]['syllabus'] is not None
+        ]
+
+    def failures(self):
+        """(path, error) of every file that could not be extracted"""
+        return [(path, self.documents[path]['error']) for path in self.order if self.documents[path]['error']]
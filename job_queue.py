@@ -0,0 +1,170 @@
+"""Background jobs shared by every session of the web app, run on one process pool
+
+A JobQueue owns one ProcessPoolExecutor sized to the machine's cores, so
+parsing, extraction and workbook generation scale with cores however many
+browser tabs are open. Each submitted job runs in a coordinator thread: it
+hands its CPU-bound steps to the pool (run, map, or load_documents with
+executor=queue.pool) and records its progress, so the sessions polling it stay
+responsive. Files a job writes are kept in the queue's directory until the job
+is discarded or expires, as is anything else a job registered with on_discard.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from profiling import Profiler, activate, active
+from syllabus_core import process_pool
+
+# Seconds a finished job (and its file) is kept for its session to pick up
+JOB_TTL_SECONDS = 60 * 60
+
+
+def _call(function, profile, args):
+    """Run function(*args) in a worker process, returning (result, profile records or None)"""
+    if not profile:
+        return function(*args), None
+    profiler = Profiler()
+    activate(profiler)
+    try:
+        return function(*args), profiler.records()
+    finally:
+        activate(None)
+
+
+class JobQueue:
+    """Jobs by id, run by coordinator threads on a shared process pool
+
+    A job is a dict with 'id', 'label', 'status' (queued, running, done or
+    failed), 'done' and 'total' (progress, total None if unknown), 'result',
+    'error', 'warnings' and the 'submitted' and 'finished' times.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Worker processes are started from a server full of threads (see process_pool)
+        self.pool = process_pool(self.workers)
+        # Coordinators mostly wait on the pool, so there can be more of them than cores
+        self.coordinators = ThreadPoolExecutor(max_workers=2 * self.workers, thread_name_prefix='job')
+        self.directory = tempfile.mkdtemp(prefix='syllabi_jobs_')
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.cleanups = {}  # job id -> callables run when the job is discarded
+        self.discarding = {}  # job id -> cleanup flag, for jobs discarded while still in progress
+
+    def submit(self, label, function, *args, profiler=None):
+        """Queue function(queue, job, *args) and return the job's id
+
+        The function's return value becomes the job's result; an exception
+        fails the job with its message. With profiler, the job's stages
+        (including those run on the pool) are recorded into it.
+        """
+        self.expire()
+        job = {
+            'id': uuid.uuid4().hex, 'label': label, 'status': 'queued', 'done': 0, 'total': None,
+            'result': None, 'error': None, 'warnings': [], 'submitted': time.time(), 'finished': None
+        }
+        with self.lock:
+            self.jobs[job['id']] = job
+        self.coordinators.submit(self._run, job, function, args, profiler)
+        return job['id']
+
+    def _run(self, job, function, args, profiler):
+        job['status'] = 'running'
+        activate(profiler)
+        try:
+            job['result'] = function(self, job, *args)
+            job['status'] = 'done'
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            activate(None)
+            with self.lock:
+                job['finished'] = time.time()
+                discarding = self.discarding.pop(job['id'], None)
+            if discarding is not None:
+                self.discard(job['id'], discarding)
+
+    def run(self, function, *args):
+        """Run function(*args) on the pool from a job and wait for its result"""
+        profiler = active()
+        result, records = self.pool.submit(_call, function, profiler is not None, args).result()
+        if records:
+            profiler.merge(records)
+        return result
+
+    def map(self, function, arguments, chunksize=1):
+        """Yield function(*args) for each tuple in arguments, run across the pool, in order"""
+        profiler = active()
+        arguments = list(arguments)
+        results = self.pool.map(
+            _call, [function] * len(arguments), [profiler is not None] * len(arguments), arguments,
+            chunksize=chunksize
+        )
+        for result, records in results:
+            if records:
+                profiler.merge(records)
+            yield result
+
+    def output_path(self, job, suffix):
+        """Path of a file written by job, removed with it"""
+        return os.path.join(self.directory, job['id'] + suffix)
+
+    def status(self, job_id):
+        """A snapshot of a job, or None if it is unknown or expired"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job, warnings=list(job['warnings'])) if job is not None else None
+
+    def on_discard(self, job, callback):
+        """Have callback() run when job is discarded or expires, e.g. to drop what it added to a shared index"""
+        with self.lock:
+            self.cleanups.setdefault(job['id'], []).append(callback)
+
+    def discard(self, job_id, cleanup=True):
+        """Forget a job and delete the files it wrote
+
+        Callbacks registered with on_discard run too, unless cleanup is False
+        because the caller has taken over what the job produced. A job still
+        queued or running is discarded once it finishes, so its files and
+        cleanup are not pulled from under it.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job['finished'] is None:
+                self.discarding[job_id] = cleanup
+                return
+            self.jobs.pop(job_id, None)
+            callbacks = self.cleanups.pop(job_id, [])
+        if cleanup:
+            for callback in callbacks:
+                callback()
+        if job is not None:
+            for name in os.listdir(self.directory):
+                if name.startswith(job_id):
+                    os.remove(os.path.join(self.directory, name))
+
+    def expire(self):
+        """Discard jobs that finished more than JOB_TTL_SECONDS ago"""
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items() if job['finished'] and job['finished'] < cutoff]
+        for job_id in expired:
+            self.discard(job_id)
+
+    def stats(self):
+        """Number of jobs by status"""
+        counts = {}
+        with self.lock:
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return counts
+
+    def shutdown(self):
+        """Cancel queued jobs, wait for running ones and stop the pool, releasing its processes and semaphores"""
+        self.coordinators.shutdown(wait=True, cancel_futures=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
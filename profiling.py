@@ -0,0 +1,145 @@
+"""Per-stage and per-file timing of the extraction pipeline
+
+Pipeline code wraps each stage in ``with stage(name, file, size):``. While a
+Profiler is activated on the current thread, every stage records its wall
+time, the thread's CPU time and the bytes it processed, both per stage and
+per file. With no Profiler active, stage() returns a shared no-op context,
+so instrumented code pays one function call per stage.
+
+Activation is per thread, so concurrent Streamlit sessions and the desktop
+app's worker threads record into their own profilers. load_documents passes
+the request on to its worker processes and merges what they recorded.
+"""
+import json
+import threading
+import time
+
+_local = threading.local()
+
+
+class Profiler:
+    """Accumulated calls, wall seconds, CPU seconds and bytes per (file, stage)
+
+    Stages run outside any one file (e.g. saving a workbook) are kept under
+    file None.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {}
+
+    def add(self, name, wall, cpu, size=None, file=None, calls=1):
+        with self.lock:
+            totals = self.totals.setdefault((file, name), [0, 0.0, 0.0, 0])
+            totals[0] += calls
+            totals[1] += wall
+            totals[2] += cpu
+            totals[3] += size or 0
+
+    def records(self):
+        """Picklable (name, file, calls, wall, cpu, bytes) tuples"""
+        with self.lock:
+            return [(name, file, *totals) for (file, name), totals in self.totals.items()]
+
+    def merge(self, records):
+        """Add records from another Profiler (e.g. a worker process's)"""
+        for name, file, calls, wall, cpu, size in records:
+            self.add(name, wall, cpu, size, file, calls)
+
+    def clear(self):
+        with self.lock:
+            self.totals = {}
+
+    def report(self):
+        """Machine-readable totals: {'stages': [...], 'files': {file: [...]}}, slowest stages first"""
+        stages = {}
+        files = {}
+        for name, file, *values in self.records():
+            targets = [stages.setdefault(name, [0, 0.0, 0.0, 0])]
+            if file is not None:
+                targets.append(files.setdefault(file, {}).setdefault(name, [0, 0.0, 0.0, 0]))
+            for totals in targets:
+                for i, value in enumerate(values):
+                    totals[i] += value
+
+        def entries(totals):
+            return sorted((
+                {'stage': name, 'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu, 'bytes': size}
+                for name, (calls, wall, cpu, size) in totals.items()
+            ), key=lambda entry: -entry['wall_seconds'])
+
+        return {'stages': entries(stages), 'files': {file: entries(totals) for file, totals in files.items()}}
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'file', 'size', 'wall', 'cpu')
+
+    def __init__(self, profiler, name, file, size):
+        self.profiler = profiler
+        self.name = name
+        self.file = file
+        self.size = size
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.wall, time.thread_time() - self.cpu, self.size, self.file)
+
+
+class _NoStage:
+    """Stand-in returned while profiling is off; size may be set on it and is ignored"""
+    size = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_no_stage = _NoStage()
+
+
+def stage(name, file=None, size=None):
+    """Context manager timing one stage; set .size on it to record bytes known only afterwards"""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _no_stage
+    return _Stage(profiler, name, file, size)
+
+
+def activate(profiler):
+    """Record this thread's stages into profiler (None stops recording)"""
+    _local.profiler = profiler
+
+
+def active():
+    """The Profiler recording on this thread, or None"""
+    return getattr(_local, 'profiler', None)
+
+
+def format_report(report, limit=None):
+    """Aligned text lines of a report's stage totals"""
+    lines = [f"{'Stage':<24} {'Calls':>7} {'Wall s':>9} {'CPU s':>9} {'MB':>9}"]
+    for entry in report['stages'][:limit]:
+        lines.append(
+            f"{entry['stage']:<24} {entry['calls']:>7} {entry['wall_seconds']:>9.3f} "
+            f"{entry['cpu_seconds']:>9.3f} {entry['bytes'] / 1e6:>9.2f}"
+        )
+    return lines
+
+
+def slowest_files(report, count=10):
+    """(file, wall seconds) of the files that took longest across all stages"""
+    totals = [(file, sum(entry['wall_seconds'] for entry in entries)) for file, entries in report['files'].items()]
+    return sorted(totals, key=lambda item: -item[1])[:count]
@@ -0,0 +1,163 @@
+"""Persistent full-text index over loaded syllabi and their extracted sections"""
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from text_cache import DEFAULT_CACHE_DIR
+from syllabus_core import predefined_sections
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR / 'search_index.sqlite3'
+
+# Section name stored for the whole document text
+FULL_TEXT = 'Full Text'
+
+_query_terms = re.compile(r'\w+', re.UNICODE)
+
+
+def build_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    terms = _query_terms.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+class SearchIndex:
+    """SQLite FTS5 inverted index of every predefined section of each document, plus its full text
+
+    Documents are keyed by the caller (a file path, or a content hash for
+    uploads) and indexed incrementally: add skips a document whose text is
+    unchanged and replaces only that document's rows otherwise, and remove
+    drops one document, so the index is never rebuilt. The connection may be
+    shared between threads.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, content_hash TEXT NOT NULL)")
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5("
+            "key UNINDEXED, section UNINDEXED, body, tokenize='porter unicode61')"
+        )
+        self.conn.commit()
+
+    def add(self, key, syllabus):
+        """Index a Syllabus under key unless the same text is already indexed there"""
+        return self.add_many([(key, syllabus)]) == 1
+
+    def add_many(self, documents):
+        """Index (key, Syllabus) pairs in one transaction, returning how many needed (re)indexing"""
+        added = 0
+        with self.lock:
+            try:
+                for key, syllabus in documents:
+                    row = self.conn.execute("SELECT content_hash FROM documents WHERE key = ?", (key,)).fetchone()
+                    if row is not None and row[0] == syllabus.content_hash:
+                        continue
+                    # A mapped document's text is indexed in streamed pieces rather than decoded whole
+                    rows = [(key, FULL_TEXT, chunk) for chunk in syllabus.text_chunks()]
+                    for section in predefined_sections:
+                        section_content = syllabus.section(section)
+                        if section_content:
+                            rows.append((key, section, section_content))
+                    self.conn.execute("DELETE FROM sections WHERE key = ?", (key,))
+                    self.conn.executemany("INSERT INTO sections (key, section, body) VALUES (?, ?, ?)", rows)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO documents (key, content_hash) VALUES (?, ?)",
+                        (key, syllabus.content_hash)
+                    )
+                    added += 1
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+        return added
+
+    def remove(self, key):
+        """Drop a document from the index"""
+        with self.lock:
+            self.conn.execute("DELETE FROM sections WHERE key = ?", (key,))
+            self.conn.execute("DELETE FROM documents WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def _bind_keys(self, keys):
+        """Load keys into the connection's temporary key table (callers hold the lock)
+
+        A table rather than bound parameters, so any number of keys can be
+        joined against without running into SQLite's variable limit.
+        """
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS search_keys (key TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM temp.search_keys")
+        self.conn.executemany("INSERT OR IGNORE INTO temp.search_keys (key) VALUES (?)", ((key,) for key in keys))
+        # Committed straight away so the connection holds no open transaction (and no stale snapshot)
+        self.conn.commit()
+
+    def indexed(self, keys):
+        """The subset of keys that currently have a document in the index"""
+        with self.lock:
+            self._bind_keys(keys)
+            return {
+                key for (key,) in self.conn.execute(
+                    "SELECT key FROM documents WHERE key IN (SELECT key FROM temp.search_keys)"
+                )
+            }
+
+    def search(self, text, keys=None, limit=50):
+        """Best matches for free text as {'key', 'section', 'snippet'} dicts
+
+        keys, when given, limits results to those documents (e.g. the ones
+        currently loaded). Section matches rank ahead of full-text matches of
+        the same document.
+        """
+        query = build_query(text)
+        if query is None:
+            return []
+        with self.lock:
+            try:
+                # Documents outside keys are filtered in SQL, so only the kept rows are
+                # ranked and sorted; snippets are built for the returned rows alone
+                if keys is None:
+                    ranked = self.conn.execute(
+                        "SELECT rowid, key, section FROM sections WHERE sections MATCH ? "
+                        "ORDER BY section = ?, rank LIMIT ?",
+                        (query, FULL_TEXT, limit)
+                    ).fetchall()
+                else:
+                    self._bind_keys(keys)
+                    ranked = self.conn.execute(
+                        "SELECT rowid, key, section FROM sections WHERE sections MATCH ? "
+                        "AND key IN (SELECT key FROM temp.search_keys) ORDER BY section = ?, rank LIMIT ?",
+                        (query, FULL_TEXT, limit)
+                    ).fetchall()
+                return [
+                    {
+                        'key': key,
+                        'section': section,
+                        'snippet': self.conn.execute(
+                            "SELECT snippet(sections, 2, '[', ']', '...', 12) FROM sections "
+                            "WHERE sections MATCH ? AND rowid = ?",
+                            (query, rowid)
+                        ).fetchone()[0]
+                    }
+                    for rowid, key, section in ranked
+                ]
+            except sqlite3.OperationalError:
+                return []
+
+    def close(self):
+        self.conn.close()
+
+
+def open_search_index(path=DEFAULT_INDEX_PATH):
+    """Open the search index, or return None if it cannot be opened (e.g. SQLite without FTS5)"""
+    try:
+        return SearchIndex(path)
+    except (OSError, sqlite3.Error):
+        return None
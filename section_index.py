@@ -0,0 +1,87 @@
+"""Heading index built once per syllabus document"""
+from bisect import bisect_left
+
+# Bytes lowercased at a time when indexing a mapped document
+CHUNK_SIZE = 1024 * 1024
+
+
+class SectionIndex:
+    """Offsets of every section alias and boundary marker in a document
+
+    The document is lowercased once and every occurrence of every pattern is
+    recorded up front, so locating a section afterwards is a dictionary lookup
+    plus a binary search instead of a fresh pass over the whole text. Offsets
+    are positions in the lowercased text, exactly as ``content.lower().find``
+    would report them. Patterns that were not indexed are reported as absent.
+    """
+
+    def __init__(self, content, patterns):
+        content_lower = content.lower()
+        self.offsets = {}
+        # Characters of content indexed, and their length once lowercased, for extend
+        self.length = len(content)
+        self.lower_length = len(content_lower)
+
+        # str.find runs the C fast-search for each literal; in CPython this is
+        # several times quicker than one combined regex alternation
+        for pattern in {pattern.lower() for pattern in patterns if pattern}:
+            positions = []
+            pos = content_lower.find(pattern)
+            while pos != -1:
+                positions.append(pos)
+                pos = content_lower.find(pattern, pos + 1)
+            self.offsets[pattern] = positions
+
+    def extend(self, content):
+        """Index what was appended to the indexed text, given the whole text so far
+
+        Only the new text, plus enough of the old to catch a pattern straddling
+        the join, is lowercased and searched, so indexing a document page by
+        page costs about as much as indexing it once. Afterwards the index is
+        the same as one built from content.
+        """
+        overlap = max((len(pattern) for pattern in self.offsets), default=1) - 1
+        # Lowercasing works character by character, so the old tail lowercases on its own
+        # exactly as it did within the whole text
+        old_tail = content[max(0, self.length - overlap):self.length].lower()
+        segment = old_tail + content[self.length:].lower()
+        base = self.lower_length - len(old_tail)
+        for pattern, positions in self.offsets.items():
+            # Occurrences ending within the old text were found before
+            pos = segment.find(pattern, max(0, len(old_tail) - len(pattern) + 1))
+            while pos != -1:
+                positions.append(base + pos)
+                pos = segment.find(pattern, pos + 1)
+        self.length = len(content)
+        self.lower_length = base + len(segment)
+
+    @classmethod
+    def from_buffer(cls, buffer, patterns, chunk_size=CHUNK_SIZE):
+        """Index a bytes-like document (e.g. an mmap of a UTF-8 file) one chunk at a time
+
+        Only one lowercased chunk is held at a time; consecutive chunks overlap
+        by the longest pattern so no occurrence straddling a boundary is
+        missed or counted twice. Offsets are byte positions. Only ASCII
+        letters are case-folded, which covers every heading in the schema.
+        """
+        index = cls('', ())
+        encoded = {pattern.lower(): pattern.lower().encode('utf-8') for pattern in patterns if pattern}
+        overlap = max((len(pattern) for pattern in encoded.values()), default=1) - 1
+        positions = {pattern: [] for pattern in encoded}
+        for chunk_start in range(0, len(buffer), chunk_size):
+            chunk = buffer[chunk_start:chunk_start + chunk_size + overlap].lower()
+            for pattern, needle in encoded.items():
+                pos = chunk.find(needle)
+                while pos != -1 and pos < chunk_size:
+                    positions[pattern].append(chunk_start + pos)
+                    pos = chunk.find(needle, pos + 1)
+        index.offsets = positions
+        return index
+
+    def find(self, pattern, start=0):
+        """Return the first offset of pattern at or after start, or -1"""
+        positions = self.offsets.get(pattern.lower())
+        if not positions:
+            return -1
+        i = bisect_left(positions, start)
+        return positions[i] if i < len(positions) else -1
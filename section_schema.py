@@ -0,0 +1,124 @@
+"""Loadable description of the sections a syllabus is split into
+
+A schema file (JSON, or YAML when PyYAML is installed) lists each section
+with the headings (aliases) that introduce it, the boundary markers that end
+a section, the "key: value" metadata lines skipped at the start of a section
+and the patterns that find prerequisites anywhere in a document. It is
+loaded and compiled once per process into a SectionSchema, whose lowercased
+aliases, per-section boundary lists and compiled regexes are shared by every
+extraction call.
+
+The bundled section_schema.json is used unless SYLLABI_SECTION_SCHEMA names
+another file, e.g. a department's own copy with extra headings.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # YAML schemas are optional
+    yaml = None
+
+DEFAULT_SCHEMA_PATH = Path(__file__).with_name('section_schema.json')
+
+
+class SectionSchema:
+    """A section schema compiled into the lookups extraction needs
+
+    sections maps each section name to its lowercased aliases, preferred
+    first; boundaries maps it to the lowercased markers that can end it (every
+    marker except the section's own name). fingerprint identifies the
+    schema's content, so results extracted under another schema are not
+    reused.
+    """
+
+    def __init__(self, data):
+        if not isinstance(data, dict) or not isinstance(data.get('sections'), list) or not data['sections']:
+            raise ValueError("a section schema needs a non-empty 'sections' list")
+
+        self.sections = {}
+        self.numbered = set()
+        for entry in data['sections']:
+            if not isinstance(entry, dict) or not entry.get('name'):
+                raise ValueError(f"every section needs a name (got {entry!r})")
+            name = entry['name']
+            if name in self.sections:
+                raise ValueError(f"section {name!r} is listed twice")
+            aliases = [alias.lower() for alias in entry.get('aliases') or [name] if alias]
+            self.sections[name] = aliases
+            if entry.get('numbered'):
+                self.numbered.add(name)
+
+        self.markers = [marker.lower() for marker in data.get('markers', []) if marker]
+        self.metadata_keywords = tuple(keyword.lower() for keyword in data.get('metadata_keywords', []))
+        self.metadata_keyword_bytes = tuple(keyword.encode('utf-8') for keyword in self.metadata_keywords)
+        try:
+            self.prerequisite_patterns = [
+                re.compile(pattern, re.IGNORECASE) for pattern in data.get('prerequisite_patterns', [])
+            ]
+            # The same patterns for memory-mapped documents
+            self.prerequisite_byte_patterns = [
+                re.compile(pattern.encode('utf-8'), re.IGNORECASE) for pattern in data.get('prerequisite_patterns', [])
+            ]
+        except re.error as e:
+            raise ValueError(f"invalid prerequisite pattern: {e}")
+
+        self.boundaries = {
+            name: [marker for marker in self.markers if marker != name.lower()] for name in self.sections
+        }
+        # Every alias and marker, indexed once per loaded document
+        self.index_patterns = sorted({alias for aliases in self.sections.values() for alias in aliases} | set(self.markers))
+        # Longest boundary marker; a marker closer than this to the end of a partial
+        # text could still be preceded by one that straddles the end
+        self.max_marker_length = max((len(marker) for marker in self.markers), default=0)
+
+        canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        self.fingerprint = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
+    def aliases(self, section_name):
+        """Lowercased headings of a section, preferred first (a section outside the schema matches its own name)"""
+        return self.sections.get(section_name) or [section_name.lower()]
+
+    def is_numbered(self, section_name):
+        """Whether a section's lines are numbered: a numbered section, or a name containing one of its aliases"""
+        if section_name in self.numbered:
+            return True
+        name = section_name.lower()
+        return any(alias in name for numbered in self.numbered for alias in self.sections[numbered])
+
+    def boundaries_for(self, section_name):
+        """Lowercased markers that end a section"""
+        boundaries = self.boundaries.get(section_name)
+        if boundaries is None:
+            boundaries = [marker for marker in self.markers if marker != section_name.lower()]
+        return boundaries
+
+
+def load_schema(path=DEFAULT_SCHEMA_PATH):
+    """Read and compile a JSON or YAML section schema, raising ValueError if it is malformed"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ValueError(f"PyYAML is required to read {path}")
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path} is not valid YAML: {e}")
+        else:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path} is not valid JSON: {e}")
+    try:
+        return SectionSchema(data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+def configured_schema_path():
+    """The schema file named by SYLLABI_SECTION_SCHEMA, or the bundled one"""
+    return Path(os.environ.get('SYLLABI_SECTION_SCHEMA') or DEFAULT_SCHEMA_PATH)
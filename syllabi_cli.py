@@ -0,0 +1,383 @@
+"""Headless batch extraction of syllabus sections to Excel, CSV, JSON Lines or Parquet
+
+Runs the same read_file -> Syllabus -> write_to_excel pipeline as the desktop
+app, without importing PyQt6 or Streamlit, so it can run under cron on a
+headless machine.
+
+Example:
+    python syllabi_cli.py syllabi/ "archive/*.pdf" -o export.xlsx -s "Course Description" -s Prerequisites
+
+The output format follows the -o extension (.xlsx, .csv, .jsonl or .parquet):
+    python syllabi_cli.py syllabi/ -o export.parquet
+
+With --watch it keeps running, re-extracting only new or modified files and
+rewriting the export whenever something changed:
+    python syllabi_cli.py /shared/syllabi -o export.xlsx --watch
+
+With --from-store --find it searches the stored sections instead of exporting:
+    python syllabi_cli.py --from-store --find "attendance" -s "Attendance Policy"
+
+With --profile it also times every pipeline stage per file and writes the
+totals as JSON:
+    python syllabi_cli.py syllabi/ -o export.xlsx --profile timings.json
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from folder_watch import FolderWatcher
+from syllabus_core import (
+    EXTRACTOR_VERSION, SUPPORTED_EXTENSIONS, predefined_sections, load_documents,
+    sort_by_course_number, write_similarity_to_excel,
+    write_boilerplate_to_excel
+)
+from syllabus_similarity import (
+    compare_syllabi, cluster_summary, check_boilerplate, boilerplate_summary
+)
+from exporters import EXPORTERS, exporter_for
+from extraction_store import DEFAULT_STORE_PATH, ExtractionStore
+from profiling import Profiler, activate, active, format_report, slowest_files, stage
+from text_cache import DEFAULT_CACHE_PATH, TextCache
+
+
+def collect_files(inputs, recursive=False):
+    """Expand files, directories and glob patterns into an ordered list of syllabus files"""
+    file_paths = []
+    seen = set()
+
+    def add(path):
+        if path.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(path):
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                file_paths.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for root, dirs, files in os.walk(item):
+                    dirs.sort()
+                    for name in sorted(files):
+                        add(os.path.join(root, name))
+            else:
+                for name in sorted(os.listdir(item)):
+                    add(os.path.join(item, name))
+        elif any(char in item for char in '*?['):
+            for path in sorted(glob.glob(item, recursive=recursive)):
+                add(path)
+        else:
+            add(item)
+
+    return file_paths
+
+
+def extract_rows(file_paths, sections, workers=None, cache_path=None, log=None, syllabi=None, store_path=None,
+                 metadata=False):
+    """Read and extract every file, returning export rows and (path, error) failures
+
+    When a syllabi list is given, each parsed Syllabus is appended to it in input order.
+    With metadata, rows also hold each section's found, character count and page columns.
+    """
+    export_data = []
+    failures = []
+    for result in load_documents(file_paths, sections, workers, cache_path, store_path, metadata):
+        error = result['error'] or (None if result['syllabus'] else "no text extracted")
+        if error:
+            failures.append((result['path'], error))
+            if log:
+                log(f"Failed to load {result['path']}: {error}")
+            continue
+
+        export_data.append(result['row'])
+        if syllabi is not None:
+            syllabi.append(result['syllabus'])
+
+    return sort_by_course_number(export_data), failures
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Extract syllabus sections from TXT, PDF and DOCX files into an Excel workbook "
+                    "or a CSV, JSON Lines or Parquet file."
+    )
+    parser.add_argument('inputs', nargs='*', help="Files, directories or glob patterns to process")
+    parser.add_argument('-o', '--output',
+                        help=f"Path of the export to write; its extension picks the format ({', '.join(EXPORTERS)})")
+    parser.add_argument('-s', '--section', dest='sections', action='append', default=[],
+                        help="Section to extract (repeatable; defaults to every predefined section)")
+    parser.add_argument('--section-metadata', action='store_true',
+                        help="Add found, character count and PDF page columns after every section")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Descend into subdirectories")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Parallel parsing processes (defaults to the CPU count; 1 disables the pool)")
+    parser.add_argument('--similarity', metavar='PATH',
+                        help="Also write each section's clusters and similarities across all files to PATH")
+    parser.add_argument('--boilerplate', metavar='PATH',
+                        help="Also write how far each file's boilerplate sections "
+                             "(Academic Integrity, Disability Services) deviate from the canonical wording to PATH")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and update the exports whenever files are added, changed or removed")
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help="Seconds between folder scans in --watch mode (default: %(default)s)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only report errors")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Time every extraction stage per file and write the totals to PATH as JSON")
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help="Extracted-text cache file (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true', help="Parse every file without consulting the cache")
+    parser.add_argument('--store', default=str(DEFAULT_STORE_PATH),
+                        help="Extraction store file (default: %(default)s)")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Extract every section without consulting or updating the extraction store")
+    parser.add_argument('--from-store', action='store_true',
+                        help="Export previously extracted files straight from the store without reading them "
+                             "(inputs, if given, limit the export to those files)")
+    parser.add_argument('--course', metavar='PATTERN',
+                        help="With --from-store, only export courses whose code matches PATTERN (* is a wildcard)")
+    parser.add_argument('--find', metavar='TEXT',
+                        help="With --from-store, print the stored sections containing TEXT (limited by -s, "
+                             "--course and inputs) instead of writing an export")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Invalidate every cached document and stored extraction before processing (or on its own)")
+    parser.add_argument('--list-sections', action='store_true', help="Print the predefined section names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list_sections or (args.clear_cache and not args.inputs):
+        return args
+
+    if not args.inputs and not args.from_store:
+        parser.error("at least one input file, directory or pattern is required")
+    if args.from_store and (args.watch or args.no_store):
+        parser.error("--from-store cannot be combined with --watch or --no-store")
+    if args.from_store and args.section_metadata:
+        parser.error("--section-metadata needs the documents themselves and cannot be combined with --from-store")
+    if args.course and not args.from_store:
+        parser.error("--course requires --from-store")
+    if args.find is not None and not args.from_store:
+        parser.error("--find requires --from-store")
+    if args.find is not None:
+        if args.output:
+            parser.error("--find prints its matches and cannot be combined with -o/--output")
+    elif not args.output:
+        parser.error("the -o/--output path is required")
+    try:
+        if args.output:
+            exporter_for(args.output)
+    except ValueError as e:
+        parser.error(f"-o/--output: {e}")
+    if args.workers is not None and args.workers < 1:
+        parser.error("-j/--workers must be at least 1")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+
+    unknown = [section for section in args.sections if section not in predefined_sections]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)} (see --list-sections)")
+
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.list_sections:
+        for section in predefined_sections:
+            print(section)
+        return 0
+
+    if args.clear_cache:
+        cache = TextCache(args.cache)
+        cleared = cache.stats()['entries']
+        cache.clear()
+        cache.close()
+        store = ExtractionStore(args.store)
+        stored = store.stats()['documents']
+        store.clear()
+        store.close()
+        if not args.quiet:
+            print(f"Cleared {cleared} cached document(s) from {args.cache}")
+            print(f"Cleared {stored} stored extraction(s) from {args.store}")
+        if not args.inputs and not args.from_store:
+            return 0
+
+    def log_error(message):
+        print(message, file=sys.stderr)
+
+    if args.profile:
+        activate(Profiler())
+    try:
+        return run(args, log_error)
+    finally:
+        if args.profile:
+            write_profile(args)
+            activate(None)
+
+
+def run(args, log_error):
+    """Extract and export as args ask, returning the exit status"""
+    sections = args.sections or list(predefined_sections)
+    if args.from_store and args.find is not None:
+        return find_in_store(args, log_error)
+    if args.from_store:
+        return export_from_store(args, sections, log_error)
+
+    cache_path = None if args.no_cache else args.cache
+    store_path = None if args.no_store else args.store
+    if args.watch:
+        # A drop folder may well start out empty
+        return watch(args, sections, cache_path, store_path, log_error)
+
+    file_paths = collect_files(args.inputs, args.recursive)
+    if not file_paths:
+        log_error("No .txt, .pdf or .docx files matched the given inputs.")
+        return 1
+
+    syllabi = [] if args.similarity or args.boilerplate else None
+    export_data, failures = extract_rows(
+        file_paths, sections, args.workers, cache_path, log_error, syllabi, store_path, args.section_metadata
+    )
+    write_outputs(args, sections, export_data, syllabi, len(file_paths))
+    return 1 if failures and not export_data else 0
+
+
+def write_profile(args):
+    """Write the active profiler's report to args.profile and summarize it"""
+    save_workbook(active().write_json, args.profile)
+    report = active().report()
+    if not args.quiet:
+        for line in format_report(report):
+            print(line)
+        for file_path, seconds in slowest_files(report, 5):
+            print(f"{seconds:>9.3f} s  {file_path}")
+        print(f"Wrote stage timings to {args.profile}")
+
+
+def save_workbook(write, path, *data):
+    """Call write(temporary path, *data), then move the result over path
+
+    Readers of a shared export never see a half-written workbook (or CSV,
+    JSON Lines or Parquet file).
+    """
+    temporary = f"{path}.tmp"
+    try:
+        write(temporary, *data)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def write_outputs(args, sections, export_data, syllabi, file_count):
+    """Write the export and any requested similarity and boilerplate workbooks"""
+    save_workbook(exporter_for(args.output), args.output, export_data)
+
+    if not args.quiet:
+        print(f"Exported {len(export_data)} of {file_count} file(s) to {args.output}")
+
+    if args.similarity:
+        with stage('similarity'):
+            results = compare_syllabi(syllabi, sections)
+        save_workbook(write_similarity_to_excel, args.similarity, [syllabus.name for syllabus in syllabi], results)
+        if not args.quiet:
+            for line in cluster_summary(results):
+                print(line)
+            print(f"Wrote similarity matrices to {args.similarity}")
+
+    if args.boilerplate:
+        with stage('boilerplate'):
+            reports = check_boilerplate(syllabi)
+        save_workbook(write_boilerplate_to_excel, args.boilerplate, [syllabus.name for syllabus in syllabi], reports)
+        if not args.quiet:
+            for line in boilerplate_summary(reports):
+                print(line)
+            print(f"Wrote boilerplate check to {args.boilerplate}")
+
+
+def export_from_store(args, sections, log_error):
+    """Write the export from stored extraction results alone, without opening any syllabus"""
+    if args.similarity or args.boilerplate:
+        log_error("--similarity and --boilerplate need the documents themselves and are ignored with --from-store")
+
+    paths = collect_files(args.inputs, args.recursive) if args.inputs else None
+    course_code = args.course.replace('*', '%') if args.course else None
+    store = ExtractionStore(args.store)
+    try:
+        export_data = store.export_rows(sections, EXTRACTOR_VERSION, course_code, paths)
+    finally:
+        store.close()
+    if not export_data:
+        log_error(f"No stored extractions matched in {args.store}.")
+        return 1
+
+    save_workbook(exporter_for(args.output), args.output, sort_by_course_number(export_data))
+    if not args.quiet:
+        print(f"Exported {len(export_data)} stored file(s) to {args.output}")
+    return 0
+
+
+def find_in_store(args, log_error):
+    """Print every stored section containing args.find, without opening any syllabus"""
+    paths = {os.path.abspath(path) for path in collect_files(args.inputs, args.recursive)} if args.inputs else None
+    course_code = args.course.replace('*', '%') if args.course else None
+    store = ExtractionStore(args.store)
+    try:
+        matches = []
+        for section in args.sections or [None]:
+            matches.extend(store.find(EXTRACTOR_VERSION, course_code, section, args.find))
+    finally:
+        store.close()
+    if paths is not None:
+        matches = [match for match in matches if match['path'] in paths]
+    if not matches:
+        log_error(f"No stored sections contain {args.find!r} in {args.store}.")
+        return 1
+
+    for match in sorted(matches, key=lambda match: (match['path'], match['section'])):
+        print(f"{match['path']}: {match['section']} ({match['course_code'] or 'Unknown'})")
+        print(f"    {excerpt(match['body'], args.find)}")
+    if not args.quiet:
+        print(f"{len(matches)} stored section(s) matched")
+    return 0
+
+
+def excerpt(body, text, width=60):
+    """One line of body around the first case-insensitive occurrence of text"""
+    position = max(body.casefold().find(text.casefold()), 0)
+    start = max(position - width, 0)
+    end = position + len(text) + width
+    snippet = ' '.join(body[start:end].split())
+    return ('...' if start else '') + snippet + ('...' if end < len(body) else '')
+
+
+def watch(args, sections, cache_path, store_path, log_error):
+    """Poll the inputs until interrupted, re-extracting changed files and rewriting the exports"""
+    watcher = FolderWatcher(
+        lambda: collect_files(args.inputs, args.recursive), sections, args.workers, cache_path, log_error,
+        store_path=store_path, metadata=args.section_metadata
+    )
+    if not args.quiet:
+        print(f"Watching {', '.join(args.inputs)} every {args.interval:g} s (Ctrl+C to stop)")
+    try:
+        while True:
+            start = time.perf_counter()
+            changed, removed = watcher.update()
+            if changed or removed:
+                syllabi = watcher.syllabi() if args.similarity or args.boilerplate else None
+                write_outputs(args, sections, watcher.rows(), syllabi, len(watcher.documents))
+                if not args.quiet:
+                    failing = len(watcher.failures())
+                    print(f"{time.strftime('%H:%M:%S')} {len(changed)} new or modified, {len(removed)} removed "
+                          f"file(s) processed in {time.perf_counter() - start:.2f} s"
+                          + (f"; {failing} file(s) could not be extracted" if failing else ""))
+                if args.profile:
+                    # Totals since the watch started, so far
+                    save_workbook(active().write_json, args.profile)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
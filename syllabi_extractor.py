@@ -1,67 +1,198 @@
 import sys
 import os
+from bisect import bisect_right
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QFileDialog, QTextEdit, QCheckBox, QGroupBox,
+    QPushButton, QFileDialog, QTextEdit, QPlainTextEdit, QCheckBox, QGroupBox,
     QLabel, QListWidget, QListWidgetItem, QScrollArea, QMessageBox,
-    QSplitter, QComboBox
+    QSplitter, QComboBox, QProgressDialog, QLineEdit
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont, QTextCursor
-from docx import Document
-import PyPDF2
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from datetime import datetime
+from syllabus_core import (
+    predefined_sections, load_documents, sort_by_course_number, preview_pages, build_comparison,
+    write_comparison_to_excel, write_comparisons_to_excel, write_similarity_to_excel,
+    write_boilerplate_to_excel
+)
+from syllabus_diff import format_diff
+from syllabus_similarity import (
+    compare_syllabi, cluster_summary, check_boilerplate, boilerplate_summary
+)
+from exporters import export_formats, exporter_for
+from extraction_store import DEFAULT_STORE_PATH
+from profiling import Profiler, activate, format_report, slowest_files, stage
+from search_index import FULL_TEXT, open_search_index
+from text_cache import DEFAULT_CACHE_PATH
+
+
+class LoadFilesThread(QThread):
+    """Parse syllabus files off the GUI thread, reporting each one as it finishes"""
+    file_loaded = pyqtSignal(object)
+    progress = pyqtSignal(int)
+    
+    def __init__(self, file_paths, workers=None, cache_path=None, search_index=None, store_path=None, profiler=None,
+                 parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.workers = workers
+        self.cache_path = cache_path
+        self.search_index = search_index
+        self.store_path = store_path
+        self.profiler = profiler
+    
+    def run(self):
+        activate(self.profiler)
+        results = load_documents(
+            self.file_paths, workers=self.workers, cache_path=self.cache_path, store_path=self.store_path
+        )
+        try:
+            for done, result in enumerate(results, 1):
+                # Index here too, so the GUI thread only adds the file to the list
+                if self.search_index is not None and result['syllabus']:
+                    with stage('search index', result['path']):
+                        self.search_index.add(result['path'], result['syllabus'])
+                self.file_loaded.emit(result)
+                self.progress.emit(done)
+                if self.isInterruptionRequested():
+                    break
+        finally:
+            results.close()
+
+
+class ExportThread(QThread):
+    """Extract checked sections from every document and write the workbook off the GUI thread"""
+    progress = pyqtSignal(int)
+    exported = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, file_path, documents, checked_sections, selected_text=None, current_file=None, profiler=None,
+                 metadata=False, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.documents = documents  # (file path, Syllabus) snapshots
+        self.checked_sections = checked_sections
+        self.selected_text = selected_text
+        self.current_file = current_file
+        self.profiler = profiler
+        self.metadata = metadata
+    
+    def run(self):
+        activate(self.profiler)
+        export_data = []
+        for done, (file_path, syllabus) in enumerate(self.documents, 1):
+            if self.isInterruptionRequested():
+                return
+            selected_text = self.selected_text if file_path == self.current_file else None
+            export_data.append(syllabus.export_row(self.checked_sections, selected_text, self.metadata))
+            self.progress.emit(done)
+        
+        # Sort by course number
+        export_data = sort_by_course_number(export_data)
+        
+        try:
+            exporter_for(self.file_path)(self.file_path, export_data)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.exported.emit(self.file_path)
+
+
+class WorkbookThread(QThread):
+    """Build a comparison, similarity or boilerplate workbook off the GUI thread
+
+    task(thread, file_path, *args) writes the workbook and returns the
+    message to show once it is saved. It may report progress and stop early
+    once interruption is requested; a cancelled workbook is removed.
+    """
+    progress = pyqtSignal(int)
+    exported = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, file_path, task, *args, profiler=None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.task = task
+        self.args = args
+        self.profiler = profiler
+    
+    def run(self):
+        activate(self.profiler)
+        try:
+            message = self.task(self, self.file_path, *self.args)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if self.isInterruptionRequested():
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+            return
+        self.exported.emit(message)
+
+
+def write_comparison(thread, file_path, original, new, sections):
+    """Compare two syllabi's sections and write the comparison workbook"""
+    write_comparison_to_excel(file_path, build_comparison(original, new, sections))
+    return f"Comparison exported to {file_path}"
+
+
+def write_all_comparisons(thread, file_path, original, others, sections):
+    """Compare the original against every other syllabus and write one sheet each"""
+    def comparisons():
+        # Sheets are built one at a time as the workbook is written
+        for done, syllabus in enumerate(others, 1):
+            if thread.isInterruptionRequested():
+                return
+            yield syllabus.name, build_comparison(original, syllabus, sections)
+            thread.progress.emit(done)
+    
+    write_comparisons_to_excel(file_path, comparisons())
+    return f"{len(others)} comparison(s) with {original.name} exported to {file_path}"
+
+
+def write_similarity(thread, file_path, syllabi, sections):
+    """Compare sections across every syllabus and write the clusters and matrices"""
+    with stage('similarity'):
+        results = compare_syllabi(syllabi, sections)
+    write_similarity_to_excel(file_path, [syllabus.name for syllabus in syllabi], results)
+    return f"Similarity matrix exported to {file_path}\n\n" + "\n".join(cluster_summary(results))
+
+
+def write_boilerplate(thread, file_path, syllabi):
+    """Check every syllabus's boilerplate sections and write the report"""
+    with stage('boilerplate'):
+        reports = check_boilerplate(syllabi)
+    write_boilerplate_to_excel(file_path, [syllabus.name for syllabus in syllabi], reports)
+    return f"Boilerplate check exported to {file_path}\n\n" + "\n".join(boilerplate_summary(reports))
 
 
 class SyllabiExtractorApp(QMainWindow):
     def __init__(self):
         super().__init__()
+        # Parsed Syllabus for each loaded file, shared by preview, export and comparison
         self.loaded_files = {}
         self.current_file = None
         self.selected_text = ""
         
-        # Define predefined sections commonly found in syllabi
-        self.predefined_sections = {
-            'Course Information': [],
-            'Instructor Information': [],
-            'Course Description': [],
-            'Prerequisites': [],
-            'Credit Hours': [],
-            'Learning Outcomes': [],
-            'Course Materials': [],
-            'Required Text': [],
-            'Course Requirements': [],
-            'Grading Policy': [],
-            'Grading Scale': [],
-            'Attendance Policy': [],
-            'Late Work Policy': [],
-            'Academic Integrity': [],
-            'Disability Services': [],
-            'Course Schedule': [],
-        }
+        # Processes used to parse files in parallel (None uses every CPU core)
+        self.ingest_workers = None
         
-        # Map section names to alternative keywords for searching
-        self.section_aliases = {
-            'Learning Outcomes': ['learning outcomes', 'learning objectives', 'course objectives'],
-            'Prerequisites': ['prerequisites', 'pre-requisites', 'pre requisites'],
-            'Course Information': ['course information'],
-            'Instructor Information': ['instructor information', 'instructor'],
-            'Course Description': ['course description'],
-            'Credit Hours': ['credit hours'],
-            'Course Materials': ['course materials'],
-            'Required Text': ['required text', 'required texts', 'textbook', 'textbooks'],
-            'Course Requirements': ['course requirements'],
-            'Grading Policy': ['grading policy'],
-            'Grading Scale': ['grading scale'],
-            'Attendance Policy': ['attendance policy', 'absences'],
-            'Late Work Policy': ['late work policy', 'late submission'],
-            'Academic Integrity': ['academic integrity', 'plagiarism', 'honor code'],
-            'Disability Services': ['disability services', 'accommodations', 'ada'],
-            'Course Schedule': ['course schedule', 'course calendar'],
-        }
+        # Extracted text is cached on disk so unchanged files are not parsed again
+        self.cache_path = DEFAULT_CACHE_PATH
+        
+        # Extracted sections are stored on disk so they are not extracted again next session
+        self.store_path = DEFAULT_STORE_PATH
+        
+        # Full-text index of loaded files, updated as files are loaded and removed (None if unavailable)
+        self.search_index = open_search_index()
+        
+        # Stage timings, recorded while "Record stage timings" is checked
+        self.profiler = Profiler()
+        
+        # Background work in progress, if any
+        self.load_thread = None
+        self.export_thread = None
+        self.load_failures = []
         
         self.initUI()
         
@@ -95,6 +226,17 @@ class SyllabiExtractorApp(QMainWindow):
         file_layout.addWidget(QLabel("Loaded Files:"))
         file_layout.addWidget(self.file_list)
         
+        # Search across every loaded file and its sections
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search loaded syllabi...")
+        self.search_box.textChanged.connect(self.run_search)
+        self.search_box.setEnabled(self.search_index is not None)
+        file_layout.addWidget(self.search_box)
+        
+        self.search_results = QListWidget()
+        self.search_results.itemClicked.connect(self.on_search_result_selected)
+        file_layout.addWidget(self.search_results)
+        
         file_group.setLayout(file_layout)
         top_splitter.addWidget(file_group)
         
@@ -114,12 +256,36 @@ class SyllabiExtractorApp(QMainWindow):
         preview_group = QGroupBox("Text Preview (Select text to extract)")
         preview_layout = QVBoxLayout()
         
-        self.text_editor = QTextEdit()
+        # Jump to a section, and page through documents too long to show at once
+        navigation_layout = QHBoxLayout()
+        self.jump_combo = QComboBox()
+        self.jump_combo.activated.connect(self.on_jump_to_section)
+        navigation_layout.addWidget(self.jump_combo, 1)
+        
+        self.previous_page_btn = QPushButton("< Previous")
+        self.previous_page_btn.clicked.connect(lambda: self.show_preview_page(self.preview_page - 1))
+        navigation_layout.addWidget(self.previous_page_btn)
+        
+        self.page_label = QLabel()
+        navigation_layout.addWidget(self.page_label)
+        
+        self.next_page_btn = QPushButton("Next >")
+        self.next_page_btn.clicked.connect(lambda: self.show_preview_page(self.preview_page + 1))
+        navigation_layout.addWidget(self.next_page_btn)
+        preview_layout.addLayout(navigation_layout)
+        
+        # QPlainTextEdit lays out only the blocks in view, unlike a rich QTextEdit
+        self.text_editor = QPlainTextEdit()
         self.text_editor.setReadOnly(False)
         self.text_editor.setFont(QFont("Courier", 10))
         self.text_editor.selectionChanged.connect(self.on_text_selected)
         preview_layout.addWidget(self.text_editor)
         
+        # Start offset of each preview page of the current file, and the page shown
+        self.preview_pages = [0]
+        self.preview_page = 0
+        self.update_preview_navigation(None)
+        
         preview_group.setLayout(preview_layout)
         text_splitter.addWidget(preview_group)
         
@@ -150,7 +316,7 @@ class SyllabiExtractorApp(QMainWindow):
         self.sections_checkboxes = {}
         sections_inner_layout = QVBoxLayout(sections_widget)
         
-        for section in self.predefined_sections.keys():
+        for section in predefined_sections.keys():
             checkbox = QCheckBox(section)
             self.sections_checkboxes[section] = checkbox
             sections_inner_layout.addWidget(checkbox)
@@ -173,10 +339,13 @@ class SyllabiExtractorApp(QMainWindow):
         export_group = QGroupBox("Export")
         export_layout = QVBoxLayout()
         
-        export_btn = QPushButton('Export to Excel')
+        export_btn = QPushButton('Export (Excel, CSV, JSON Lines, Parquet)')
         export_btn.clicked.connect(self.export_to_excel)
         export_layout.addWidget(export_btn)
         
+        self.metadata_checkbox = QCheckBox("Add found / length / page columns per section")
+        export_layout.addWidget(self.metadata_checkbox)
+        
         export_group.setLayout(export_layout)
         bottom_layout.addWidget(export_group)
         
@@ -200,15 +369,58 @@ class SyllabiExtractorApp(QMainWindow):
         export_comparison_btn.clicked.connect(self.export_comparison_to_excel)
         compare_layout.addWidget(export_comparison_btn)
         
+        export_all_comparisons_btn = QPushButton('Export Original vs All Loaded')
+        export_all_comparisons_btn.clicked.connect(self.export_all_comparisons_to_excel)
+        compare_layout.addWidget(export_all_comparisons_btn)
+        
+        similarity_btn = QPushButton('Compare All Loaded (Similarity Matrix)')
+        similarity_btn.clicked.connect(self.export_similarity_matrix)
+        compare_layout.addWidget(similarity_btn)
+        
+        boilerplate_btn = QPushButton('Check Boilerplate Sections')
+        boilerplate_btn.clicked.connect(self.export_boilerplate_check)
+        compare_layout.addWidget(boilerplate_btn)
+        
         compare_group.setLayout(compare_layout)
         bottom_layout.addWidget(compare_group)
         
+        # Performance section: per-stage timings of loads, previews and exports
+        performance_group = QGroupBox("Performance")
+        performance_layout = QVBoxLayout()
+        
+        self.profiling_checkbox = QCheckBox("Record stage timings")
+        self.profiling_checkbox.toggled.connect(self.on_profiling_toggled)
+        performance_layout.addWidget(self.profiling_checkbox)
+        
+        self.performance_report = QPlainTextEdit()
+        self.performance_report.setReadOnly(True)
+        self.performance_report.setFont(QFont("Courier New", 9))
+        self.performance_report.setMinimumWidth(480)
+        self.performance_report.setPlaceholderText('Check "Record stage timings", then load, preview or export files.')
+        performance_layout.addWidget(self.performance_report)
+        
+        performance_buttons = QHBoxLayout()
+        save_report_btn = QPushButton('Save Report (JSON)')
+        save_report_btn.clicked.connect(self.save_performance_report)
+        performance_buttons.addWidget(save_report_btn)
+        clear_report_btn = QPushButton('Clear')
+        clear_report_btn.clicked.connect(self.clear_performance_report)
+        performance_buttons.addWidget(clear_report_btn)
+        performance_layout.addLayout(performance_buttons)
+        
+        performance_group.setLayout(performance_layout)
+        bottom_layout.addWidget(performance_group)
+        
         bottom_layout.addStretch()
         
         main_layout.addLayout(bottom_layout)
         
     def load_files(self):
-        """Load syllabus files"""
+        """Load syllabus files in the background, adding each to the list as it finishes"""
+        if self.load_thread is not None and self.load_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "Files are still loading. Please wait or cancel the current load.")
+            return
+        
         file_dialog = QFileDialog()
         file_paths, _ = file_dialog.getOpenFileNames(
             self,
@@ -217,20 +429,49 @@ class SyllabiExtractorApp(QMainWindow):
             "Text Files (*.txt);;PDF Files (*.pdf);;Word Files (*.docx);;All Files (*)"
         )
         
-        for file_path in file_paths:
-            if file_path not in self.loaded_files:
-                try:
-                    content = self.read_file(file_path)
-                    if content:
-                        self.loaded_files[file_path] = content
-                        item = QListWidgetItem(Path(file_path).name)
-                        item.setData(Qt.ItemDataRole.UserRole, file_path)
-                        self.file_list.addItem(item)
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to load {file_path}: {str(e)}")
+        new_paths = [file_path for file_path in dict.fromkeys(file_paths) if file_path not in self.loaded_files]
+        if not new_paths:
+            return
+        
+        # Parse new files across a process pool on a worker thread; results come back in selection order
+        self.load_failures = []
+        progress = QProgressDialog("Loading syllabi...", "Cancel", 0, len(new_paths), self)
+        progress.setWindowTitle("Loading")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
         
+        self.load_thread = LoadFilesThread(
+            new_paths, self.ingest_workers, self.cache_path, self.search_index, self.store_path,
+            self.recording_profiler(), self
+        )
+        self.load_thread.file_loaded.connect(self.on_file_loaded)
+        self.load_thread.progress.connect(progress.setValue)
+        self.load_thread.finished.connect(progress.close)
+        self.load_thread.finished.connect(self.on_load_finished)
+        progress.canceled.connect(self.load_thread.requestInterruption)
+        self.load_thread.start()
+    
+    def on_file_loaded(self, result):
+        """Add one parsed file to the loaded files list"""
+        file_path = result['path']
+        if result['error']:
+            self.load_failures.append(f"{Path(file_path).name}: {result['error']}")
+        elif result['syllabus'] and file_path not in self.loaded_files:
+            self.loaded_files[file_path] = result['syllabus']
+            item = QListWidgetItem(Path(file_path).name)
+            item.setData(Qt.ItemDataRole.UserRole, file_path)
+            self.file_list.addItem(item)
+    
+    def on_load_finished(self):
+        """Refresh the comparison choices and report any files that failed to load"""
         # Update combo boxes with loaded files
         self.update_comparison_combos()
+        self.run_search()
+        self.update_performance_report()
+        
+        if self.load_failures:
+            QMessageBox.critical(self, "Error", "Failed to load:\n" + "\n".join(self.load_failures))
+            self.load_failures = []
     
     def remove_selected_file(self):
         """Remove the selected file from loaded files"""
@@ -244,6 +485,8 @@ class SyllabiExtractorApp(QMainWindow):
         # Remove from dictionary
         if file_path in self.loaded_files:
             del self.loaded_files[file_path]
+        if self.search_index is not None:
+            self.search_index.remove(file_path)
         
         # Remove from list widget
         self.file_list.takeItem(self.file_list.row(current_item))
@@ -252,46 +495,114 @@ class SyllabiExtractorApp(QMainWindow):
         if file_path == self.current_file:
             self.current_file = None
             self.text_editor.clear()
+            self.update_preview_navigation(None)
             self.file_info_label.setText("No file loaded")
             self.selected_text_display.clear()
         
         # Update combo boxes
         self.update_comparison_combos()
+        self.run_search()
     
-    def read_file(self, file_path):
-        """Read file content based on extension"""
-        file_path = str(file_path)
-        
-        if file_path.endswith('.txt'):
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        
-        elif file_path.endswith('.pdf'):
-            text = ""
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-            return text
+    def run_search(self):
+        """List the loaded files and sections matching the search box"""
+        self.search_results.clear()
+        query = self.search_box.text().strip()
+        if not query or self.search_index is None:
+            return
         
-        elif file_path.endswith('.docx'):
-            doc = Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text
+        for result in self.search_index.search(query, keys=self.loaded_files.keys()):
+            snippet = " ".join(result['snippet'].split())
+            item = QListWidgetItem(f"{Path(result['key']).name} - {result['section']}: {snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, (result['key'], result['section']))
+            self.search_results.addItem(item)
+    
+    def on_search_result_selected(self, item):
+        """Open the matching file and move the preview to the matching section"""
+        file_path, section = item.data(Qt.ItemDataRole.UserRole)
+        for row in range(self.file_list.count()):
+            file_item = self.file_list.item(row)
+            if file_item.data(Qt.ItemDataRole.UserRole) == file_path:
+                self.file_list.setCurrentItem(file_item)
+                self.on_file_selected(file_item)
+                break
+        else:
+            return
         
-        return None
+        syllabus = self.loaded_files[file_path]
+        if section == FULL_TEXT:
+            # No section to jump to; go to the first occurrence of the first search term
+            terms = self.search_box.text().split()
+            position = max(syllabus.text.lower().find(terms[0].lower()), 0) if terms else 0
+        else:
+            span = syllabus.span(section)
+            position = span[0] if span else 0
+        self.show_offset(position)
     
     def on_file_selected(self, item):
         """Handle file selection from list"""
         file_path = item.data(Qt.ItemDataRole.UserRole)
         self.current_file = file_path
         
-        content = self.loaded_files.get(file_path, "")
-        self.text_editor.setPlainText(content)
+        syllabus = self.loaded_files.get(file_path)
+        self.update_preview_navigation(syllabus)
+        self.show_preview_page(0)
         self.file_info_label.setText(f"File: {Path(file_path).name}")
         self.selected_text_display.clear()
         self.selected_text = ""
     
+    def update_preview_navigation(self, syllabus):
+        """Split the previewed file into pages and list the sections found in it"""
+        self.preview_pages = preview_pages(syllabus.text) if syllabus else [0]
+        self.preview_page = 0
+        
+        # Section offsets come from the document's heading index
+        self.jump_combo.clear()
+        self.jump_combo.addItem("Jump to section...", None)
+        if syllabus:
+            for section in predefined_sections:
+                span = syllabus.span(section)
+                if span:
+                    self.jump_combo.addItem(section, span[0])
+        self.jump_combo.setEnabled(self.jump_combo.count() > 1)
+        
+        paged = len(self.preview_pages) > 1
+        self.previous_page_btn.setVisible(paged)
+        self.next_page_btn.setVisible(paged)
+        self.page_label.setVisible(paged)
+    
+    def show_preview_page(self, page):
+        """Show one page of the current file in the preview"""
+        syllabus = self.loaded_files.get(self.current_file)
+        if not syllabus or not 0 <= page < len(self.preview_pages):
+            self.text_editor.clear()
+            return
+        
+        self.preview_page = page
+        start = self.preview_pages[page]
+        end = self.preview_pages[page + 1] if page + 1 < len(self.preview_pages) else len(syllabus.text)
+        self.text_editor.setPlainText(syllabus.text[start:end])
+        
+        self.page_label.setText(f"Page {page + 1} of {len(self.preview_pages)}")
+        self.previous_page_btn.setEnabled(page > 0)
+        self.next_page_btn.setEnabled(page + 1 < len(self.preview_pages))
+    
+    def show_offset(self, offset):
+        """Scroll the preview to a text offset of the current file, turning the page if needed"""
+        page = bisect_right(self.preview_pages, offset) - 1
+        if page != self.preview_page:
+            self.show_preview_page(page)
+        
+        cursor = self.text_editor.textCursor()
+        cursor.setPosition(offset - self.preview_pages[page])
+        self.text_editor.setTextCursor(cursor)
+        self.text_editor.centerCursor()
+    
+    def on_jump_to_section(self, index):
+        """Move the preview to the section picked in the jump list"""
+        offset = self.jump_combo.itemData(index)
+        if offset is not None:
+            self.show_offset(offset)
+    
     def on_text_selected(self):
         """Handle text selection in the editor"""
         cursor = self.text_editor.textCursor()
@@ -300,7 +611,7 @@ class SyllabiExtractorApp(QMainWindow):
             self.selected_text_display.setPlainText(self.selected_text)
     
     def export_to_excel(self):
-        """Export selected sections from all loaded syllabi to Excel"""
+        """Export selected sections from all loaded syllabi to Excel, CSV, JSON Lines or Parquet"""
         if not self.loaded_files:
             QMessageBox.warning(self, "Warning", "Please load at least one file first.")
             return
@@ -312,230 +623,81 @@ class SyllabiExtractorApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select text or check predefined sections to export.")
             return
         
-        # Gather data from all loaded files
-        export_data = []
-        for file_path, content in self.loaded_files.items():
-            course_code, course_title = self.extract_course_info(content)
-            row_data = {
-                'Source File': Path(file_path).name,
-                'Course Code': course_code or 'Unknown',
-                'Course Title': course_title or 'Unknown'
-            }
-            
-            # Add selected text if it's from this file
-            if self.selected_text and file_path == self.current_file:
-                row_data['Selected Text'] = self.selected_text
-            
-            # Add checked sections
-            for section in checked_sections:
-                section_content = self.extract_section(content, section)
-                row_data[section] = section_content if section_content else "[Not Found]"
-            
-            # Search for prerequisites anywhere in the document
-            if 'Prerequisites' in checked_sections and (row_data.get('Prerequisites') == "[Not Found]" or 'Prerequisites' not in row_data):
-                extracted_prereqs = self.extract_prerequisites(content)
-                if extracted_prereqs:
-                    row_data['Prerequisites'] = extracted_prereqs
-            
-            export_data.append(row_data)
-        
-        # Sort by course number
-        export_data = self.sort_by_course_number(export_data)
+        if self.export_running():
+            return
         
-        # Save to Excel
-        file_path, _ = QFileDialog.getSaveFileName(
+        # Save to Excel, CSV, JSON Lines or Parquet
+        filters = {
+            '.xlsx': "Excel Files (*.xlsx)", '.csv': "CSV Files (*.csv)",
+            '.jsonl': "JSON Lines Files (*.jsonl)", '.parquet': "Parquet Files (*.parquet)"
+        }
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
-            "Save Excel File",
+            "Save Export File",
             "",
-            "Excel Files (*.xlsx)"
+            ";;".join(filters[extension] for extension in export_formats())
         )
         
-        if file_path:
-            self.write_to_excel(file_path, export_data)
-            QMessageBox.information(self, "Success", f"Data exported to {file_path}")
-    
-    def extract_section(self, content, section_name):
-        """Extract a predefined section from the content"""
-        content_lower = content.lower()
-        section_lower = section_name.lower()
-        
-        # Try to find the section using its aliases
-        start_idx = -1
-        aliases = self.section_aliases.get(section_name, [section_lower])
-        for alias in aliases:
-            start_idx = content_lower.find(alias.lower())
-            if start_idx != -1:
-                break
-        
-        if start_idx == -1:
-            return None
-        
-        # Find the line after the heading
-        heading_end = content.find('\n', start_idx)
-        if heading_end == -1:
-            heading_end = len(content)
-        
-        # Start looking for actual content after the heading line
-        content_start = heading_end + 1
-        
-        # Skip blank lines and metadata lines (lines with colons that look like key: value)
-        while content_start < len(content):
-            # Find next non-whitespace character
-            while content_start < len(content) and content[content_start] in '\n\r\t ':
-                content_start += 1
-            
-            if content_start >= len(content):
-                return None
-            
-            # Check if this line is a metadata line (contains 'something:' format)
-            line_end = content.find('\n', content_start)
-            if line_end == -1:
-                line_end = len(content)
-            
-            line_text = content[content_start:line_end].strip()
-            
-            # Skip metadata lines like "Prerequisites: ...", "Credit Hours: ..."
-            # These are short lines with colons that contain metadata, not actual content
-            if ':' in line_text:
-                parts = line_text.split(':', 1)
-                # If the part before colon is short (like "Prerequisites", "Credit Hours", "Semester")
-                # and doesn't seem like regular prose, skip it
-                if len(parts[0].strip()) < 25:
-                    metadata_keywords = ['prerequisites', 'credit hours', 'semester', 'meeting time', 'modality', 'location']
-                    if any(keyword in parts[0].lower() for keyword in metadata_keywords):
-                        content_start = line_end + 1
-                        continue
-            
-            # Found actual content
-            break
-        
-        # Find the next section heading
-        next_section_idx = len(content)
-        
-        # Check for common section markers
-        section_markers = [
-            'Instructor Information',
-            'Course Description',
-            'Prerequisites',
-            'Credit Hours',
-            'Learning Outcomes',
-            'Course Materials',
-            'Required Text',
-            'Course Requirements',
-            'Grading Policy',
-            'Grading Scale',
-            'Attendance Policy',
-            'Late Work Policy',
-            'Academic Integrity',
-            'Disability Services',
-            'Course Schedule',
-            'Evaluation and Grading',
-            'Course Policies',
-            'Institutional Policies',
-            'Federal, BOR',
-            'Discussion Boards',
-            'Module Quizzes',
-            'Section I',
-            'Section II',
-            'Section III',
-            'Section IV',
-            'Section V'
-        ]
-        
-        for marker in section_markers:
-            if marker.lower() != section_lower:
-                idx = content_lower.find(marker.lower(), content_start)
-                if idx != -1 and idx < next_section_idx:
-                    next_section_idx = idx
-        
-        # Extract content between start and next section
-        extracted = content[content_start:next_section_idx].strip()
-        
-        # Clean up excessive whitespace while preserving structure
-        lines = extracted.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped:  # Keep non-empty lines
-                cleaned_lines.append(stripped)
-        
-        result = '\n'.join(cleaned_lines)
-        
-        # Format Learning Outcomes with numbering
-        if section_name.lower() == 'learning outcomes' or any(alias in section_name.lower() for alias in ['learning objectives', 'course objectives']):
-            if result and result != "[Not Found]":
-                outcome_lines = result.split('\n')
-                formatted_outcomes = []
-                for idx, outcome in enumerate(outcome_lines, 1):
-                    # Only add numbering if the line doesn't already have a number/bullet
-                    if outcome and not outcome[0].isdigit() and outcome[0] not in ['•', '-', '*']:
-                        formatted_outcomes.append(f"{idx}. {outcome}")
-                    else:
-                        formatted_outcomes.append(outcome)
-                result = '\n'.join(formatted_outcomes)
-        
-        return result if result else None
-    
-    def extract_course_info(self, content):
-        """Extract course code and title from the document"""
-        import re
-        
-        lines = content.split('\n')
-        
-        # Look for pattern like "SM 2200: COURSE TITLE"
-        course_code = None
-        course_title = None
-        
-        for line in lines[:20]:  # Check first 20 lines
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Pattern: Letter(s) + Space + Numbers + Optional Colon/Dash + Title
-            match = re.search(r'^([A-Z]{1,4})\s+(\d{3,4})[:\-\s]+(.+?)$', line)
-            if match:
-                course_code = f"{match.group(1)} {match.group(2)}"
-                course_title = match.group(3).strip()
-                break
+        if not file_path:
+            return
         
-        return course_code, course_title
+        # A name typed without a known extension gets the chosen format's
+        if Path(file_path).suffix.lower() not in filters:
+            file_path += next(
+                (extension for extension, name in filters.items() if name == selected_filter), '.xlsx'
+            )
+        
+        # Extract and write on a worker thread from a snapshot of the loaded files
+        documents = list(self.loaded_files.items())
+        progress = QProgressDialog("Extracting sections...", "Cancel", 0, len(documents), self)
+        progress.setWindowTitle("Exporting")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)  # stay open while the workbook is written
+        progress.setAutoReset(False)
+        
+        self.export_thread = ExportThread(
+            file_path, documents, checked_sections, self.selected_text, self.current_file,
+            self.recording_profiler(), self.metadata_checkbox.isChecked(), self
+        )
+        self.export_thread.progress.connect(progress.setValue)
+        self.export_thread.finished.connect(progress.close)
+        self.export_thread.finished.connect(self.update_performance_report)
+        self.export_thread.exported.connect(
+            lambda path: QMessageBox.information(self, "Success", f"Data exported to {path}")
+        )
+        self.export_thread.failed.connect(
+            lambda error: QMessageBox.critical(self, "Error", f"Failed to export: {error}")
+        )
+        progress.canceled.connect(self.export_thread.requestInterruption)
+        self.export_thread.start()
     
-    def sort_by_course_number(self, data):
-        """Sort courses by course number extracted from course code"""
-        import re
-        
-        def get_course_number(row_data):
-            course_code = row_data.get('Course Code', 'Unknown')
-            if course_code == 'Unknown':
-                return (float('inf'), '')  # Put unknowns at the end
-            
-            match = re.search(r'(\d+)', course_code)
-            if match:
-                return (int(match.group(1)), course_code)
-            return (float('inf'), course_code)
-        
-        return sorted(data, key=get_course_number)
-    
-    def extract_prerequisites(self, content):
-        """Search for prerequisites in the entire document"""
-        import re
-        
-        # Patterns to search for prerequisite information
-        # These patterns capture the prerequisite text after the keyword
-        prereq_patterns = [
-            r'(?:prerequisite|pre-requisite|pre requisite|prerequisite\(s\))[:\s]+([^\n]+)',
-            r'(?:student must have)[:\s]+([^\n]+)',
-        ]
-        
-        prerequisites = []
-        for pattern in prereq_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for match in matches:
-                prereq_text = match.strip()
-                if prereq_text and prereq_text not in prerequisites:
-                    prerequisites.append(prereq_text)
-        
-        return '\n'.join(prerequisites) if prerequisites else None
+    def export_running(self):
+        """Whether an export is already running, warning the user if so (one runs at a time)"""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "An export is already running.")
+            return True
+        return False
+    
+    def start_workbook_thread(self, label, total, file_path, task, *args):
+        """Run a WorkbookThread with a cancellable progress dialog (busy while total is 0)"""
+        progress = QProgressDialog(label, "Cancel", 0, total, self)
+        progress.setWindowTitle("Exporting")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)  # stay open while the workbook is written
+        progress.setAutoReset(False)
+        
+        self.export_thread = WorkbookThread(file_path, task, *args, profiler=self.recording_profiler(), parent=self)
+        self.export_thread.progress.connect(progress.setValue)
+        self.export_thread.finished.connect(progress.close)
+        self.export_thread.finished.connect(self.update_performance_report)
+        self.export_thread.exported.connect(lambda message: QMessageBox.information(self, "Success", message))
+        self.export_thread.failed.connect(
+            lambda error: QMessageBox.critical(self, "Error", f"Failed to export: {error}")
+        )
+        progress.canceled.connect(self.export_thread.requestInterruption)
+        self.export_thread.start()
     
     def update_comparison_combos(self):
         """Update the comparison combo boxes with loaded files"""
@@ -570,42 +732,38 @@ class SyllabiExtractorApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please check at least one section to compare.")
             return
         
-        # Extract content from both files
-        original_content = self.loaded_files.get(original_path, "")
-        new_content = self.loaded_files.get(new_path, "")
-        
-        original_code, original_title = self.extract_course_info(original_content)
-        new_code, new_title = self.extract_course_info(new_content)
+        # The same comparison the workbook export writes, prerequisites fallback included
+        comparison_data = build_comparison(self.loaded_files[original_path], self.loaded_files[new_path], checked_sections)
         
         # Build comparison report
         report = f"SYLLABUS COMPARISON REPORT\n"
         report += f"{'='*80}\n\n"
-        report += f"Original: {original_code} - {original_title}\n"
-        report += f"New:      {new_code} - {new_title}\n"
+        report += f"Original: {comparison_data['original_code']} - {comparison_data['original_title']}\n"
+        report += f"New:      {comparison_data['new_code']} - {comparison_data['new_title']}\n"
         report += f"{'='*80}\n\n"
         
-        # Compare each checked section
-        differences_found = False
-        for section in checked_sections:
-            original_section = self.extract_section(original_content, section)
-            new_section = self.extract_section(new_content, section)
+        # Report each checked section
+        for section, section_data in comparison_data['sections'].items():
+            original_missing = section_data['original'] == '[NOT FOUND]'
+            new_missing = section_data['new'] == '[NOT FOUND]'
             
             report += f"\n{'─'*80}\n"
             report += f"SECTION: {section}\n"
             report += f"{'─'*80}\n"
             
-            if original_section == new_section:
-                if original_section is None:
-                    report += "[NOT FOUND IN EITHER SYLLABUS]\n"
-                else:
-                    report += "[NO CHANGES]\n"
+            diff = section_data['diff']
+            if original_missing and new_missing:
+                report += "[NOT FOUND IN EITHER SYLLABUS]\n"
+            elif not diff['changed']:
+                report += "[NO CHANGES]\n"
             else:
-                differences_found = True
-                report += f"\n[ORIGINAL]\n{'-'*40}\n"
-                report += (original_section if original_section else "[NOT FOUND]") + "\n"
-                
-                report += f"\n[NEW]\n{'-'*40}\n"
-                report += (new_section if new_section else "[NOT FOUND]") + "\n"
+                if original_missing:
+                    report += "[NOT FOUND IN ORIGINAL]\n"
+                elif new_missing:
+                    report += "[NOT FOUND IN NEW]\n"
+                report += f"[CHANGED - {diff['similarity']:.0%} similar]\n"
+                report += "(- removed, + added, ~ edited with [-old-] {+new+} words, > moved)\n\n"
+                report += "\n".join(format_diff(diff)) + "\n"
         
         # Display report
         comparison_dialog = QMessageBox(self)
@@ -637,32 +795,8 @@ class SyllabiExtractorApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please check at least one section to compare.")
             return
         
-        # Extract content from both files
-        original_content = self.loaded_files.get(original_path, "")
-        new_content = self.loaded_files.get(new_path, "")
-        
-        original_code, original_title = self.extract_course_info(original_content)
-        new_code, new_title = self.extract_course_info(new_content)
-        
-        # Prepare comparison data
-        comparison_data = {
-            'original_code': original_code or 'Unknown',
-            'original_title': original_title or 'Unknown',
-            'new_code': new_code or 'Unknown',
-            'new_title': new_title or 'Unknown',
-            'sections': {}
-        }
-        
-        # Gather section comparisons
-        for section in checked_sections:
-            original_section = self.extract_section(original_content, section)
-            new_section = self.extract_section(new_content, section)
-            
-            comparison_data['sections'][section] = {
-                'original': original_section or '[NOT FOUND]',
-                'new': new_section or '[NOT FOUND]',
-                'changed': original_section != new_section
-            }
+        if self.export_running():
+            return
         
         # Save to Excel
         file_path, _ = QFileDialog.getSaveFileName(
@@ -673,261 +807,142 @@ class SyllabiExtractorApp(QMainWindow):
         )
         
         if file_path:
-            self.write_comparison_to_excel(file_path, comparison_data)
-            QMessageBox.information(self, "Success", f"Comparison exported to {file_path}")
-    
-    def write_comparison_to_excel(self, file_path, comparison_data):
-        """Write comparison data to Excel file with original and new content side by side"""
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Comparison"
-        
-        # Define styles
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        subheader_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-        subheader_font = Font(bold=True, size=10)
-        original_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-        new_fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
-        changed_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
+            # Compare both parsed syllabi and write on a worker thread
+            self.start_workbook_thread(
+                "Comparing sections...", 0, file_path, write_comparison,
+                self.loaded_files[original_path], self.loaded_files[new_path], checked_sections
+            )
+    
+    def export_all_comparisons_to_excel(self):
+        """Export the original syllabus compared against every other loaded syllabus, one sheet each"""
+        if self.original_syllabus_combo.currentIndex() == -1 or len(self.loaded_files) < 2:
+            QMessageBox.warning(self, "Warning", "Please load at least two files and select the original syllabus.")
+            return
+        
+        checked_sections = [section for section, checkbox in self.sections_checkboxes.items() if checkbox.isChecked()]
+        
+        if not checked_sections:
+            QMessageBox.warning(self, "Warning", "Please check at least one section to compare.")
+            return
+        
+        if self.export_running():
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Comparisons to Excel",
+            "",
+            "Excel Files (*.xlsx)"
         )
-        wrap_alignment = Alignment(wrap_text=True, vertical="top")
-        
-        current_row = 1
-        
-        # Write title
-        ws.merge_cells(f'A{current_row}:D{current_row}')
-        title_cell = ws[f'A{current_row}']
-        title_cell.value = f"Syllabus Comparison - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        title_cell.font = Font(bold=True, size=12, color="FFFFFF")
-        title_cell.fill = PatternFill(start_color="203864", end_color="203864", fill_type="solid")
-        title_cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.row_dimensions[current_row].height = 25
-        current_row += 1
-        
-        # Write original syllabus info
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        cell = ws[f'A{current_row}']
-        cell.value = "ORIGINAL SYLLABUS"
-        cell.font = subheader_font
-        cell.fill = subheader_fill
-        cell.border = border
-        
-        ws.merge_cells(f'C{current_row}:D{current_row}')
-        cell = ws[f'C{current_row}']
-        cell.value = "NEW SYLLABUS"
-        cell.font = subheader_font
-        cell.fill = subheader_fill
-        cell.border = border
-        current_row += 1
-        
-        # Write course info
-        cell = ws[f'A{current_row}']
-        cell.value = f"{comparison_data['original_code']} - {comparison_data['original_title']}"
-        cell.font = Font(bold=True, size=10)
-        cell.fill = original_fill
-        cell.border = border
-        cell.alignment = wrap_alignment
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        
-        cell = ws[f'C{current_row}']
-        cell.value = f"{comparison_data['new_code']} - {comparison_data['new_title']}"
-        cell.font = Font(bold=True, size=10)
-        cell.fill = new_fill
-        cell.border = border
-        cell.alignment = wrap_alignment
-        ws.merge_cells(f'C{current_row}:D{current_row}')
-        current_row += 2
-        
-        # Write each section comparison
-        for section_name, section_data in comparison_data['sections'].items():
-            # Section header
-            header_fill_color = changed_fill if section_data['changed'] else header_fill
-            ws.merge_cells(f'A{current_row}:D{current_row}')
-            cell = ws[f'A{current_row}']
-            cell.value = f"SECTION: {section_name}" + (" [CHANGED]" if section_data['changed'] else " [NO CHANGES]")
-            cell.font = Font(bold=True, size=10, color="FFFFFF" if not section_data['changed'] else "000000")
-            cell.fill = header_fill_color
-            cell.border = border
-            cell.alignment = Alignment(horizontal="left", vertical="center")
-            ws.row_dimensions[current_row].height = 20
-            current_row += 1
-            
-            # Original and New headers
-            cell = ws[f'A{current_row}']
-            cell.value = "ORIGINAL"
-            cell.font = Font(bold=True, size=9)
-            cell.fill = original_fill
-            cell.border = border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            ws.merge_cells(f'A{current_row}:B{current_row}')
-            
-            cell = ws[f'C{current_row}']
-            cell.value = "NEW"
-            cell.font = Font(bold=True, size=9)
-            cell.fill = new_fill
-            cell.border = border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            ws.merge_cells(f'C{current_row}:D{current_row}')
-            current_row += 1
-            
-            # Content rows
-            original_text = section_data['original']
-            new_text = section_data['new']
-            
-            # Split into lines for better readability
-            original_lines = original_text.split('\n') if original_text else ['[NOT FOUND]']
-            new_lines = new_text.split('\n') if new_text else ['[NOT FOUND]']
-            
-            max_lines = max(len(original_lines), len(new_lines))
-            
-            for i in range(max_lines):
-                orig_line = original_lines[i] if i < len(original_lines) else ''
-                new_line = new_lines[i] if i < len(new_lines) else ''
-                
-                cell_orig = ws[f'A{current_row}']
-                cell_orig.value = orig_line
-                cell_orig.fill = original_fill
-                cell_orig.border = border
-                cell_orig.alignment = wrap_alignment
-                cell_orig.font = Font(size=9)
-                
-                ws.merge_cells(f'A{current_row}:B{current_row}')
-                
-                cell_new = ws[f'C{current_row}']
-                cell_new.value = new_line
-                cell_new.fill = new_fill
-                cell_new.border = border
-                cell_new.alignment = wrap_alignment
-                cell_new.font = Font(size=9)
-                
-                ws.merge_cells(f'C{current_row}:D{current_row}')
-                
-                ws.row_dimensions[current_row].height = 30
-                current_row += 1
-            
-            current_row += 1  # Space between sections
-        
-        # Set column widths
-        ws.column_dimensions['A'].width = 40
-        ws.column_dimensions['B'].width = 40
-        ws.column_dimensions['C'].width = 40
-        ws.column_dimensions['D'].width = 40
-        
-        wb.save(file_path)
-    
-    def write_to_excel(self, file_path, data):
-        """Write extracted data to Excel file with each syllabus as a row"""
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Syllabus Extraction"
-        
-        # Define styles
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
+        
+        if not file_path:
+            return
+        
+        original_path = self.original_syllabus_combo.currentData()
+        others = [syllabus for path, syllabus in self.loaded_files.items() if path != original_path]
+        self.start_workbook_thread(
+            "Comparing syllabi...", len(others), file_path, write_all_comparisons,
+            self.loaded_files[original_path], others, checked_sections
         )
-        wrap_alignment = Alignment(wrap_text=True, vertical="top")
-        
-        if not data:
-            wb.save(file_path)
-            return
-        
-        # Get all unique column names from all rows
-        all_columns = set()
-        all_columns.add('Source File')
-        all_columns.add('Course Code')
-        all_columns.add('Course Title')
-        
-        for row_data in data:
-            all_columns.update(row_data.keys())
-        
-        all_columns = ['Source File', 'Course Code', 'Course Title'] + sorted([col for col in all_columns if col not in ['Source File', 'Course Code', 'Course Title']])
-        
-        # Write title
-        ws.merge_cells(f'A1:{chr(64 + len(all_columns))}1')
-        title_cell = ws['A1']
-        title_cell.value = f"Course Syllabus Data Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        title_cell.font = Font(bold=True, size=12, color="FFFFFF")
-        title_cell.fill = PatternFill(start_color="203864", end_color="203864", fill_type="solid")
-        title_cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.row_dimensions[1].height = 25
-        
-        # Write headers
-        for col, header in enumerate(all_columns, 1):
-            cell = ws.cell(row=3, column=col)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.border = border
-            cell.alignment = wrap_alignment
-        
-        ws.row_dimensions[3].height = 35
-        
-        # Write data rows
-        for row_idx, row_data in enumerate(data, 4):
-            for col_idx, column_name in enumerate(all_columns, 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell_value = row_data.get(column_name, "")
-                
-                # Format learning outcomes/objectives as bullet points
-                if any(keyword in column_name.lower() for keyword in ['learning', 'outcome', 'objective', 'goal']):
-                    cell_value = self.format_as_bullets(cell_value)
-                
-                cell.value = cell_value
-                cell.border = border
-                cell.alignment = wrap_alignment
-            
-            ws.row_dimensions[row_idx].height = 150
+    
+    def export_similarity_matrix(self):
+        """Compare checked sections across every loaded syllabus and export the clusters and matrices"""
+        if len(self.loaded_files) < 2:
+            QMessageBox.warning(self, "Warning", "Please load at least two files to compare.")
+            return
         
-        # Set column widths
-        for col_idx, column_name in enumerate(all_columns, 1):
-            col_letter = openpyxl.utils.get_column_letter(col_idx)
-            
-            # Special widths for key columns
-            if column_name in ['Source File', 'Course Code']:
-                width = 20
-            elif column_name == 'Course Title':
-                width = 35
-            else:
-                width = 50
-            
-            ws.column_dimensions[col_letter].width = width
+        checked_sections = [section for section, checkbox in self.sections_checkboxes.items() if checkbox.isChecked()]
+        
+        if not checked_sections:
+            QMessageBox.warning(self, "Warning", "Please check at least one section to compare.")
+            return
+        
+        if self.export_running():
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Similarity Matrix to Excel",
+            "",
+            "Excel Files (*.xlsx)"
+        )
         
-        # Freeze the header row
-        ws.freeze_panes = 'A4'
+        if not file_path:
+            return
         
-        wb.save(file_path)
+        self.start_workbook_thread(
+            "Comparing sections across syllabi...", 0, file_path, write_similarity,
+            list(self.loaded_files.values()), checked_sections
+        )
     
-    def format_as_bullets(self, text):
-        """Convert multi-line text to bullet point format"""
-        if not text or text == "[Not Found]":
-            return text
+    def export_boilerplate_check(self):
+        """Flag loaded syllabi whose boilerplate sections deviate from the canonical wording"""
+        if len(self.loaded_files) < 2:
+            QMessageBox.warning(self, "Warning", "Please load at least two files to compare.")
+            return
         
-        lines = text.split('\n')
-        bullet_lines = []
+        if self.export_running():
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Boilerplate Check to Excel",
+            "",
+            "Excel Files (*.xlsx)"
+        )
         
-        for line in lines:
-            line = line.strip()
-            # Skip empty lines
-            if not line:
-                continue
-            # Remove existing bullet points if any
-            if line.startswith('•') or line.startswith('-'):
-                line = line.lstrip('•-').strip()
-            # Add bullet point
-            bullet_lines.append(f"• {line}")
+        if not file_path:
+            return
         
-        return '\n'.join(bullet_lines) if bullet_lines else text
+        self.start_workbook_thread(
+            "Checking boilerplate sections...", 0, file_path, write_boilerplate, list(self.loaded_files.values())
+        )
+    
+    def recording_profiler(self):
+        """The profiler background work should record into, or None while timings are off"""
+        return self.profiler if self.profiling_checkbox.isChecked() else None
+    
+    def on_profiling_toggled(self, checked):
+        """Start or stop recording stage timings (work on this thread, e.g. previews, included)"""
+        activate(self.recording_profiler())
+        self.update_performance_report()
+    
+    def update_performance_report(self):
+        """Show stage totals and the slowest files recorded so far"""
+        report = self.profiler.report()
+        if not report['stages']:
+            self.performance_report.clear()
+            return
+        lines = format_report(report)
+        slowest = slowest_files(report, 5)
+        if slowest:
+            lines.append("")
+            lines.append("Slowest files:")
+            lines.extend(f"{seconds:>9.3f} s  {Path(file_path).name}" for file_path, seconds in slowest)
+        self.performance_report.setPlainText("\n".join(lines))
+    
+    def save_performance_report(self):
+        """Write the recorded stage timings to a JSON file"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Performance Report", "", "JSON Files (*.json)")
+        if not file_path:
+            return
+        try:
+            self.profiler.write_json(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save report: {e}")
+    
+    def clear_performance_report(self):
+        """Forget every recorded timing"""
+        self.profiler.clear()
+        self.update_performance_report()
+    
+    def closeEvent(self, event):
+        """Stop background work before the window closes"""
+        for thread in (self.load_thread, self.export_thread):
+            if thread is not None and thread.isRunning():
+                thread.requestInterruption()
+                thread.wait()
+        super().closeEvent(event)
 
 
 def main():
@@ -0,0 +1,1342 @@
+"""Document reading, section extraction and Excel export shared by every front-end
+
+Nothing in this module imports PyQt6 or Streamlit, so it can be used from the
+command line and from background workers.
+"""
+import hashlib
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from docx import Document
+import PyPDF2
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from datetime import datetime
+from extraction_store import open_store
+from profiling import Profiler, activate, active, stage
+from section_index import SectionIndex
+from section_schema import configured_schema_path, load_schema
+from syllabus_diff import diff_sections
+from syllabus_similarity import pair_similarity
+from text_cache import content_key, open_cache
+
+# File extensions read_file understands
+SUPPORTED_EXTENSIONS = ('.txt', '.pdf', '.docx')
+
+# Bump whenever read_file would produce different text (or PDF page offsets)
+# for the same bytes, so cached text from older parsers is never reused
+PARSER_VERSION = '2'
+
+# Sections, aliases and boundary markers, compiled once per process from the
+# bundled section_schema.json or the file named by SYLLABI_SECTION_SCHEMA
+section_schema = load_schema(configured_schema_path())
+
+# .txt files at least this large are memory-mapped (see MappedText) rather than read whole
+MAPPED_TEXT_BYTES = 8 * 1024 * 1024
+
+# Characters of a mapped document decoded at a time when it is hashed or indexed for search
+MAPPED_CHUNK_CHARS = 1024 * 1024
+
+# Characters of a document shown at once by the previews; shorter documents show in full
+PREVIEW_PAGE_CHARS = 100000
+
+# Bump the number whenever section, course info or prerequisite extraction
+# changes, so memoized extraction results are recomputed; the schema
+# fingerprint does the same when another section schema is loaded
+EXTRACTOR_VERSION = f"1:{section_schema.fingerprint}"
+
+# Per-section columns added to export rows on request: whether the section
+# was found, its length in characters and the PDF page its heading is on
+SECTION_METADATA_FIELDS = ('Found', 'Characters', 'Page')
+
+# Define predefined sections commonly found in syllabi
+predefined_sections = {name: [] for name in section_schema.sections}
+
+# Map section names to alternative keywords for searching
+section_aliases = section_schema.sections
+
+# Headings that mark where a section ends
+section_markers = section_schema.markers
+
+# Every alias and marker, indexed once per loaded document
+index_patterns = section_schema.index_patterns
+
+# Course heading such as "SM 2200: COURSE TITLE"
+_course_heading = re.compile(r'^([A-Z]{1,4})\s+(\d{3,4})[:\-\s]+(.+?)$')
+_course_number = re.compile(r'(\d+)')
+
+# Old Mac line ending, which universal newlines turn into a line break but a byte scan would not
+_lone_carriage_return = re.compile(rb'\r(?!\n)')
+
+
+class LazyPdfDocument:
+    """PDF whose page text is extracted on demand and joined only when asked for"""
+
+    def __init__(self, source):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        self.reader = PyPDF2.PdfReader(source)
+        self.page_count = len(self.reader.pages)
+        self.pages = []
+
+    @classmethod
+    def resume(cls, source, text, page_offsets):
+        """Reopen a partially extracted PDF with the pages already in text, so only the rest are extracted"""
+        document = cls(source)
+        ends = page_offsets[1:] + [len(text)]
+        document.pages = [text[start:end] for start, end in zip(page_offsets, ends)]
+        return document
+
+    @property
+    def complete(self):
+        return len(self.pages) >= self.page_count
+
+    def page_text(self, number):
+        """Return the text of a page (0-based), extracting any earlier pages first"""
+        while len(self.pages) <= number:
+            self.pages.append(self.reader.pages[len(self.pages)].extract_text())
+        return self.pages[number]
+
+    def text(self):
+        """Return the text of the pages extracted so far"""
+        return "".join(self.pages)
+
+    def page_offsets(self):
+        """Return the offset in text() at which each extracted page starts"""
+        offsets = []
+        position = 0
+        for page in self.pages:
+            offsets.append(position)
+            position += len(page)
+        return offsets
+
+    def full_text(self):
+        """Extract every remaining page and return the whole document text"""
+        if self.page_count:
+            self.page_text(self.page_count - 1)
+        return self.text()
+
+    def text_for_sections(self, sections, index=None):
+        """Extract pages until every requested section is settled and return the text so far
+
+        index, a SectionIndex of the pages extracted so far, is extended with
+        each new page rather than rebuilt; one is built if not given.
+        """
+        text = self.text()
+        if index is None:
+            index = SectionIndex(text, index_patterns)
+        while not self.complete and not sections_resolved(text, sections, index):
+            self.page_text(len(self.pages))
+            text = self.text()
+            index.extend(text)
+        return text
+
+
+class MappedText:
+    """Large .txt file read through a memory map instead of being loaded as one string
+
+    Headings are indexed a chunk at a time (SectionIndex.from_buffer) and
+    only the bytes of each extracted section are decoded, so memory follows
+    the size of the sections asked for rather than the size of the file.
+    Pickles as its path and maps the file again on first use. The map stays
+    open until the object is dropped, so threads sharing it never see it
+    closed under them.
+
+    Lines are split on b'\n' only, which matches read_file's universal
+    newlines for LF and CRLF files; files with lone CR line endings must be
+    read as text instead (see can_map).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = None
+        self._buffer = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def can_map(path):
+        """Whether a .txt file is large enough to map and extracts exactly as its decoded text would"""
+        size = os.path.getsize(path)
+        # An empty file cannot be mapped
+        if not size or size < MAPPED_TEXT_BYTES:
+            return False
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _lone_carriage_return.search(buffer) is None
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    @property
+    def buffer(self):
+        with self._lock:
+            if self._buffer is None:
+                self._file = open(self.path, 'rb')
+                size = os.fstat(self._file.fileno()).st_size
+                # An empty file cannot be mapped
+                self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            return self._buffer
+
+    @property
+    def index(self):
+        if self._index is None:
+            buffer = self.buffer
+            with stage('index', self.path, len(buffer)):
+                index = SectionIndex.from_buffer(buffer, index_patterns)
+            with self._lock:
+                if self._index is None:
+                    self._index = index
+        return self._index
+
+    def head(self, lines=20):
+        """Decoded text of the first lines, enough for the course heading"""
+        end = -1
+        for _ in range(lines):
+            end = self.buffer.find(b'\n', end + 1)
+            if end == -1:
+                end = len(self.buffer)
+                break
+        return self.buffer[:end].decode('utf-8', errors='ignore')
+
+    def section(self, section_name):
+        return extract_section(self.buffer, section_name, self.index)
+
+    def prerequisites(self):
+        return extract_prerequisites(self.buffer)
+
+    def read_text(self):
+        """The whole document, decoded exactly as read_file would"""
+        return _parse_document(self.path)[0]
+
+    def text_chunks(self, size=MAPPED_CHUNK_CHARS):
+        """The document decoded exactly as read_text would, but streamed in pieces of about size characters"""
+        with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
+            for chunk in iter(lambda: f.read(size), ''):
+                yield chunk
+
+    def close(self):
+        if self._file is not None:
+            if self._buffer:
+                self._buffer.close()
+            self._file.close()
+        self._file = None
+        self._buffer = None
+        self._index = None
+
+
+def read_file(file_path, file_bytes=None, cache=None, sections=None):
+    """Read file content based on extension, from disk or from an in-memory upload
+
+    When a TextCache is given, text previously extracted from identical bytes
+    is returned without parsing the document again. When sections is given,
+    a PDF's pages are only extracted until every one of those sections is
+    settled, so the text may stop short of the end of the document while
+    still yielding exactly the same sections and course heading.
+    """
+    return read_document(file_path, file_bytes, cache, sections)[0]
+
+
+def read_document(file_path, file_bytes=None, cache=None, sections=None):
+    """Like read_file, but return (text, PDF page offsets or None, whether the text is the whole document)"""
+    key = None
+    if cache is not None and str(file_path).endswith(SUPPORTED_EXTENSIONS):
+        with stage('cache lookup', str(file_path)) as timing:
+            data = file_bytes.getvalue() if file_bytes is not None else Path(file_path).read_bytes()
+            timing.size = len(data)
+            key = content_key(data, PARSER_VERSION)
+            cached = cache.get(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+    complete = True
+    # The file size is only looked up when someone is recording it
+    size = _source_size(file_path, file_bytes) if active() is not None else None
+    with stage('parse ' + Path(file_path).suffix.lstrip('.').lower(), str(file_path), size):
+        if sections is not None and str(file_path).endswith('.pdf'):
+            document = LazyPdfDocument(file_bytes if file_bytes is not None else str(file_path))
+            text = document.text_for_sections(sections)
+            page_offsets = document.page_offsets()
+            complete = document.complete
+        else:
+            text, page_offsets = _parse_document(file_path, file_bytes)
+
+    # Only whole documents are cached
+    if key is not None and text and complete:
+        with stage('cache store', str(file_path)):
+            cache.put(key, text, page_offsets)
+    return text, page_offsets, complete
+
+
+def _source_size(file_path, file_bytes=None):
+    """Bytes in an upload or file on disk, or None if it cannot be read"""
+    if file_bytes is not None:
+        return file_bytes.getbuffer().nbytes
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
+
+
+def _parse_document(file_path, file_bytes=None):
+    """Parse document text based on extension, returning (text, PDF page offsets or None)"""
+    file_path = str(file_path)
+
+    if file_path.endswith('.txt'):
+        if file_bytes is not None:
+            return file_bytes.getvalue().decode('utf-8', errors='ignore'), None
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read(), None
+
+    elif file_path.endswith('.pdf'):
+        document = LazyPdfDocument(file_bytes if file_bytes is not None else file_path)
+        text = document.full_text()
+        return text, document.page_offsets()
+
+    elif file_path.endswith('.docx'):
+        if file_bytes is not None:
+            file_bytes.seek(0)
+        doc = Document(file_bytes if file_bytes is not None else file_path)
+        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        return text, None
+
+    return None, None
+
+
+def _load_document(job):
+    """Read one document and optionally extract its export row, capturing any failure"""
+    file_path, data, sections, metadata, cache_path, store_path, profile = job
+    result = {'path': file_path, 'syllabus': None, 'row': None, 'error': None}
+    if profile:
+        # Recorded separately and handed back, as a worker process cannot reach
+        # the caller's profiler; the caller merges it in
+        caller = active()
+        profiler = Profiler()
+        activate(profiler)
+        try:
+            result = _load_document(job[:-1] + (False,))
+        finally:
+            activate(caller)
+        result['profile'] = profiler.records()
+        return result
+    try:
+        if data is None and file_path.endswith('.txt') and MappedText.can_map(file_path):
+            # Too large to hold as text just to pick sections out of it
+            syllabus = Syllabus.from_mapped(file_path)
+        else:
+            cache = open_cache(cache_path) if cache_path else None
+            text, page_offsets, complete = read_document(
+                file_path, BytesIO(data) if data is not None else None, cache, sections
+            )
+            if not text:
+                return result
+            syllabus = Syllabus(file_path, text, page_offsets, complete, cache_path=cache_path)
+        result['syllabus'] = syllabus
+
+        # Reuse stored extraction results, or store them for next time; partially
+        # read PDFs are neither, as their text is not the document's, and mapped
+        # files are not, as that would mean decoding their whole text
+        store = open_store(store_path) if store_path and syllabus.complete and syllabus.mapped is None else None
+        if store is not None:
+            with stage('store lookup', file_path):
+                stored = store.hydrate(syllabus, EXTRACTOR_VERSION)
+            if not stored:
+                with stage('store save', file_path):
+                    store.save(syllabus, predefined_sections, EXTRACTOR_VERSION)
+            if data is None:
+                store.record_source(file_path, syllabus)
+        if sections is not None:
+            result['row'] = syllabus.export_row(sections, metadata=metadata)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def process_pool(workers):
+    """ProcessPoolExecutor whose workers are started by a forkserver where available
+
+    Callers such as the desktop app's loader thread and the web server have
+    other threads running; forking them would copy locks those threads hold
+    into the workers.
+    """
+    context = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(context))
+
+
+def load_documents(sources, sections=None, workers=None, cache_path=None, store_path=None, metadata=False,
+                   executor=None):
+    """Read many documents, fanning parsing out across a process pool
+
+    sources holds file paths or (file name, bytes) pairs for in-memory uploads.
+    Results are yielded in input order as dicts with 'path', 'syllabus' (a
+    parsed Syllabus), 'row' (only when sections is given) and 'error'. When
+    sections is given, a PDF's syllabus may hold only the pages needed for
+    those sections (see read_file). A file that fails to parse reports its
+    error instead of aborting the batch, and a file with no text has neither
+    syllabus nor error. workers defaults to the CPU count,
+    and 1 reads everything in the calling process. With cache_path, each
+    worker consults the persistent text cache at that path before parsing.
+    With store_path, sections already extracted from the same text are taken
+    from the extraction store at that path, and new results are added to it.
+    With metadata, rows also hold each section's metadata columns (see
+    Syllabus.export_row). While a profiler is active on the calling thread (see profiling), the
+    stages run for each document are recorded into it, whichever process
+    ran them. With executor, documents are parsed on that long-lived pool
+    (e.g. the web app's shared JobQueue pool) instead of a new one.
+    """
+    profiler = active()
+    jobs = []
+    for source in sources:
+        if isinstance(source, tuple):
+            jobs.append((source[0], source[1], sections, metadata, cache_path, store_path, profiler is not None))
+        else:
+            jobs.append((str(source), None, sections, metadata, cache_path, store_path, profiler is not None))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+
+    # Small chunks keep results flowing back in order while amortizing IPC
+    chunksize = max(1, min(8, len(jobs) // (max(workers, 1) * 4)))
+    owned = None
+    if executor is None and workers > 1:
+        owned = executor = process_pool(workers)
+    if executor is None:
+        results = map(_load_document, jobs)
+    else:
+        results = executor.map(_load_document, jobs, chunksize=chunksize)
+
+    try:
+        for result in results:
+            if profiler is not None:
+                profiler.merge(result.pop('profile', ()))
+            yield result
+    finally:
+        # A caller that stops early (e.g. a cancelled load) drops queued files
+        if owned is not None:
+            owned.shutdown(wait=True, cancel_futures=True)
+        elif executor is not None:
+            # A shared pool keeps running; closing the results cancels this call's queued files
+            results.close()
+
+
+def find_section_span(content, section_name, index=None):
+    """Locate a predefined section, returning (heading, content start, content end) offsets or None
+
+    content may also be a bytes-like buffer (see MappedText), with an index
+    built by SectionIndex.from_buffer; offsets are then byte positions.
+    """
+    aliases = section_schema.aliases(section_name)
+    if isinstance(content, str):
+        newline, colon, blank, metadata_keywords = '\n', ':', '\n\r\t ', section_schema.metadata_keywords
+    else:
+        newline, colon, blank, metadata_keywords = b'\n', b':', b'\n\r\t ', section_schema.metadata_keyword_bytes
+
+    # Heading offsets come from the document's index, built once per file
+    if index is None:
+        index = SectionIndex(content, index_patterns + aliases)
+
+    # Try to find the section using its aliases
+    start_idx = -1
+    for alias in aliases:
+        start_idx = index.find(alias)
+        if start_idx != -1:
+            break
+
+    if start_idx == -1:
+        return None
+
+    # Find the line after the heading
+    heading_end = content.find(newline, start_idx)
+    if heading_end == -1:
+        heading_end = len(content)
+
+    # Start looking for actual content after the heading line
+    content_start = heading_end + 1
+
+    # Skip blank lines and metadata lines (lines with colons that look like key: value)
+    while content_start < len(content):
+        # Find next non-whitespace character
+        while content_start < len(content) and content[content_start:content_start + 1] in blank:
+            content_start += 1
+
+        if content_start >= len(content):
+            return None
+
+        # Check if this line is a metadata line (contains 'something:' format)
+        line_end = content.find(newline, content_start)
+        if line_end == -1:
+            line_end = len(content)
+
+        line_text = content[content_start:line_end].strip()
+
+        # Skip metadata lines like "Prerequisites: ...", "Credit Hours: ..."
+        # These are short lines with colons that contain metadata, not actual content
+        if colon in line_text:
+            parts = line_text.split(colon, 1)
+            # If the part before colon is short (like "Prerequisites", "Credit Hours", "Semester")
+            # and doesn't seem like regular prose, skip it
+            if len(parts[0].strip()) < 25:
+                if any(keyword in parts[0].lower() for keyword in metadata_keywords):
+                    content_start = line_end + 1
+                    continue
+
+        # Found actual content
+        break
+
+    # Find the next section heading
+    next_section_idx = len(content)
+
+    for marker in section_schema.boundaries_for(section_name):
+        idx = index.find(marker, content_start)
+        if idx != -1 and idx < next_section_idx:
+            next_section_idx = idx
+
+    return start_idx, content_start, next_section_idx
+
+
+def sections_resolved(text, sections, index=None):
+    """Whether text, a prefix of some document, already extracts sections exactly as the full document would
+
+    Each section needs its preferred alias present (a later page cannot hold
+    an earlier occurrence) and a closing marker that is safely inside the
+    text and followed by a line break. The first 20 lines must be complete
+    for the course heading search.
+    """
+    if text.count('\n') < 20:
+        return False
+    if index is None:
+        index = SectionIndex(text, index_patterns)
+
+    for section in sections:
+        if index.find(section_schema.aliases(section)[0]) == -1:
+            return False
+        span = find_section_span(text, section, index)
+        if span is None:
+            return False
+        next_section_idx = span[2]
+        if next_section_idx > len(text) - section_schema.max_marker_length or text.find('\n', next_section_idx) == -1:
+            return False
+    return True
+
+
+def extract_section(content, section_name, index=None):
+    """Extract a predefined section from the content"""
+    span = find_section_span(content, section_name, index)
+    if span is None:
+        return None
+    _, content_start, next_section_idx = span
+
+    # Extract content between start and next section (decoding only this span of a mapped document)
+    extracted = content[content_start:next_section_idx]
+    if not isinstance(extracted, str):
+        extracted = extracted.decode('utf-8', errors='ignore')
+    extracted = extracted.strip()
+
+    # Clean up excessive whitespace while preserving structure
+    lines = extracted.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped:  # Keep non-empty lines
+            cleaned_lines.append(stripped)
+
+    result = '\n'.join(cleaned_lines)
+
+    # Number the lines of sections such as Learning Outcomes
+    if section_schema.is_numbered(section_name):
+        if result and result != "[Not Found]":
+            outcome_lines = result.split('\n')
+            formatted_outcomes = []
+            for idx, outcome in enumerate(outcome_lines, 1):
+                # Only add numbering if the line doesn't already have a number/bullet
+                if outcome and not outcome[0].isdigit() and outcome[0] not in ['•', '-', '*']:
+                    formatted_outcomes.append(f"{idx}. {outcome}")
+                else:
+                    formatted_outcomes.append(outcome)
+            result = '\n'.join(formatted_outcomes)
+
+    return result if result else None
+
+
+def extract_course_info(content):
+    """Extract course code and title from the document"""
+    lines = content.split('\n', 20)
+
+    # Look for pattern like "SM 2200: COURSE TITLE"
+    course_code = None
+    course_title = None
+
+    for line in lines[:20]:  # Check first 20 lines
+        line = line.strip()
+        if not line:
+            continue
+
+        # Pattern: Letter(s) + Space + Numbers + Optional Colon/Dash + Title
+        match = _course_heading.search(line)
+        if match:
+            course_code = f"{match.group(1)} {match.group(2)}"
+            course_title = match.group(3).strip()
+            break
+
+    return course_code, course_title
+
+
+def sort_by_course_number(data):
+    """Sort courses by course number extracted from course code"""
+    def get_course_number(row_data):
+        course_code = row_data.get('Course Code', 'Unknown')
+        if course_code == 'Unknown':
+            return (float('inf'), '')  # Put unknowns at the end
+
+        match = _course_number.search(course_code)
+        if match:
+            return (int(match.group(1)), course_code)
+        return (float('inf'), course_code)
+
+    return sorted(data, key=get_course_number)
+
+
+def extract_prerequisites(content):
+    """Search for prerequisites in the entire document (or a bytes-like mapped document)"""
+    # The schema's patterns capture the prerequisite text after the keyword
+    if isinstance(content, str):
+        patterns = section_schema.prerequisite_patterns
+    else:
+        patterns = section_schema.prerequisite_byte_patterns
+
+    prerequisites = []
+    for pattern in patterns:
+        matches = pattern.findall(content)
+        for match in matches:
+            if not isinstance(match, str):
+                match = match.decode('utf-8', errors='ignore')
+            prereq_text = match.strip()
+            if prereq_text and prereq_text not in prerequisites:
+                prerequisites.append(prereq_text)
+
+    return '\n'.join(prerequisites) if prerequisites else None
+
+
+def format_as_bullets(text):
+    """Convert multi-line text to bullet point format"""
+    if not text or text == "[Not Found]":
+        return text
+
+    lines = text.split('\n')
+    bullet_lines = []
+
+    for line in lines:
+        line = line.strip()
+        # Skip empty lines
+        if not line:
+            continue
+        # Remove existing bullet points if any
+        if line.startswith('•') or line.startswith('-'):
+            line = line.lstrip('•-').strip()
+        # Add bullet point
+        bullet_lines.append(f"• {line}")
+
+    return '\n'.join(bullet_lines) if bullet_lines else text
+
+
+def metadata_column(section_name, field):
+    """Name of one of a section's metadata columns, e.g. 'Course Description - Characters'"""
+    return f"{section_name} - {field}"
+
+
+_metadata_suffixes = tuple(metadata_column('', field) for field in SECTION_METADATA_FIELDS)
+
+
+def _is_metadata_column(column_name):
+    return column_name.endswith(_metadata_suffixes)
+
+
+def export_columns(data):
+    """Return the export column order: file and course info first, then sections alphabetically"""
+    all_columns = set()
+    for row_data in data:
+        all_columns.update(row_data.keys())
+
+    leading = ['Source File', 'Course Code', 'Course Title']
+    return leading + sorted([col for col in all_columns if col not in leading])
+
+
+def _register_export_styles(wb):
+    """Add the shared named styles used by write_to_excel to a workbook"""
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    wrap_alignment = Alignment(wrap_text=True, vertical="top")
+
+    wb.add_named_style(NamedStyle(
+        name='Export Title',
+        font=Font(bold=True, size=12, color="FFFFFF"),
+        fill=PatternFill(start_color="203864", end_color="203864", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center")
+    ))
+    wb.add_named_style(NamedStyle(
+        name='Export Header',
+        font=Font(bold=True, color="FFFFFF", size=11),
+        fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+        border=border,
+        alignment=wrap_alignment
+    ))
+    wb.add_named_style(NamedStyle(name='Export Cell', font=DEFAULT_FONT, border=border, alignment=wrap_alignment))
+
+
+def _styled_cell(ws, value, style):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _styled_row(ws, *cells):
+    """Append a row of (value, named style) cells"""
+    ws.append([_styled_cell(ws, value, style) for value, style in cells])
+
+
+def write_to_excel(file_path, data, columns=None):
+    """Write extracted data to Excel file with each syllabus as a row
+
+    The workbook is written in openpyxl's write-only mode with shared named
+    styles, so each row is streamed out as it is produced instead of being
+    held as styled cells until save. data may be any iterable of row dicts;
+    when columns is given the rows are consumed one at a time, otherwise they
+    are collected first to work out the column set. file_path may also be a
+    writable binary file object.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Syllabus Extraction")
+    _register_export_styles(wb)
+
+    if columns is None:
+        data = list(data)
+        if not data:
+            wb.save(file_path)
+            return
+        columns = export_columns(data)
+
+    # Column letters are worked out once; get_column_letter goes past Z (AA, AB, ...)
+    column_letters = [openpyxl.utils.get_column_letter(col_idx) for col_idx in range(1, len(columns) + 1)]
+
+    # Set column widths (must precede the first row in write-only mode)
+    for col_letter, column_name in zip(column_letters, columns):
+        # Special widths for key columns
+        if column_name in ['Source File', 'Course Code']:
+            width = 20
+        elif column_name == 'Course Title':
+            width = 35
+        elif _is_metadata_column(column_name):
+            width = 14
+        else:
+            width = 50
+
+        ws.column_dimensions[col_letter].width = width
+
+    # Freeze the header row
+    ws.freeze_panes = 'A4'
+
+    # Write title
+    ws.merged_cells.add(f'A1:{column_letters[-1]}1')
+    ws.row_dimensions[1].height = 25
+    title = f"Course Syllabus Data Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    ws.append([_styled_cell(ws, title, 'Export Title')])
+    ws.append([])
+
+    # Write headers
+    ws.row_dimensions[3].height = 35
+    ws.append([_styled_cell(ws, header, 'Export Header') for header in columns])
+
+    # Format learning outcomes/objectives as bullet points
+    bullet_columns = {
+        column_name for column_name in columns
+        if any(keyword in column_name.lower() for keyword in ['learning', 'outcome', 'objective', 'goal'])
+        and not _is_metadata_column(column_name)
+    }
+
+    # Write data rows; each row's height entry is dropped once written so memory stays flat
+    for row_idx, row_data in enumerate(data, 4):
+        row = []
+        for column_name in columns:
+            cell_value = row_data.get(column_name, "")
+            if column_name in bullet_columns:
+                with stage('format_as_bullets'):
+                    cell_value = format_as_bullets(cell_value)
+            row.append(_styled_cell(ws, cell_value, 'Export Cell'))
+
+        with stage('excel rows'):
+            ws.row_dimensions[row_idx].height = 150
+            ws.append(row)
+            del ws.row_dimensions[row_idx]
+
+    with stage('excel save'):
+        wb.save(file_path)
+
+
+def build_comparison(original, new, sections):
+    """comparison_data for write_comparison_to_excel: course info and a diff of each section of two Syllabus objects"""
+    comparison_data = {
+        'original_code': original.course_code or 'Unknown',
+        'original_title': original.course_title or 'Unknown',
+        'new_code': new.course_code or 'Unknown',
+        'new_title': new.course_title or 'Unknown',
+        'sections': {}
+    }
+
+    for section in sections:
+        original_section = original.section(section)
+        new_section = new.section(section)
+
+        # Search for prerequisites anywhere in the document if not found
+        if section == 'Prerequisites':
+            original_section = original_section or original.prerequisites()
+            new_section = new_section or new.prerequisites()
+
+        diff = diff_sections(original_section, new_section)
+        comparison_data['sections'][section] = {
+            'original': original_section or '[NOT FOUND]',
+            'new': new_section or '[NOT FOUND]',
+            'changed': diff['changed'],
+            'diff': diff
+        }
+    return comparison_data
+
+
+def _register_comparison_styles(wb):
+    """Add the shared named styles used by write_comparisons_to_excel to a workbook"""
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    wrap_alignment = Alignment(wrap_text=True, vertical="top")
+    center_alignment = Alignment(horizontal="center", vertical="center")
+
+    def fill(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    wb.add_named_style(NamedStyle(
+        name='Comparison Title', font=Font(bold=True, size=12, color="FFFFFF"), fill=fill("203864"),
+        alignment=center_alignment
+    ))
+    wb.add_named_style(NamedStyle(
+        name='Comparison Subheader', font=Font(bold=True, size=10), fill=fill("D9E1F2"), border=border
+    ))
+    wb.add_named_style(NamedStyle(
+        name='Comparison Section', font=Font(bold=True, size=10, color="FFFFFF"), fill=fill("4472C4"), border=border,
+        alignment=Alignment(horizontal="left", vertical="center")
+    ))
+    wb.add_named_style(NamedStyle(
+        name='Comparison Changed Section', font=Font(bold=True, size=10), fill=fill("FFC7CE"), border=border,
+        alignment=Alignment(horizontal="left", vertical="center")
+    ))
+    # Course info, column headings and lines of each side, by the fill of the original layout
+    for name, color in (('Original', "E2EFDA"), ('New', "FCE4D6")):
+        wb.add_named_style(NamedStyle(
+            name=f'Comparison {name} Info', font=Font(bold=True, size=10), fill=fill(color), border=border,
+            alignment=wrap_alignment
+        ))
+        wb.add_named_style(NamedStyle(
+            name=f'Comparison {name} Heading', font=Font(bold=True, size=9), fill=fill(color), border=border,
+            alignment=center_alignment
+        ))
+    for name, color in (('Original', "E2EFDA"), ('New', "FCE4D6"), ('Changed', "FFC7CE"),
+                        ('Inserted', "C6EFCE"), ('Moved', "FFEB9C")):
+        wb.add_named_style(NamedStyle(
+            name=f'Comparison {name} Line', font=Font(size=9), fill=fill(color), border=border,
+            alignment=wrap_alignment
+        ))
+
+
+def write_comparison_to_excel(file_path, comparison_data):
+    """Write comparison data to Excel file with original and new content side by side"""
+    write_comparisons_to_excel(file_path, [("Comparison", comparison_data)])
+
+
+def write_comparisons_to_excel(file_path, comparisons):
+    """Write (sheet name, comparison data) pairs to one workbook, one side-by-side comparison per sheet
+
+    Each sheet is a two-column grid, original on the left and new on the
+    right, one row per aligned line. The workbook is streamed in write-only
+    mode with shared named styles and no merged cells, so its size and write
+    time grow with the number of lines rather than with per-cell formatting.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    _register_comparison_styles(wb)
+    used_titles = set()
+
+    for sheet_name, comparison_data in comparisons:
+        ws = wb.create_sheet(_sheet_title(sheet_name, used_titles))
+        ws.column_dimensions['A'].width = 80
+        ws.column_dimensions['B'].width = 80
+
+        # Title
+        ws.row_dimensions[1].height = 25
+        title = f"Syllabus Comparison - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        _styled_row(ws, (title, 'Comparison Title'), (None, 'Comparison Title'))
+        _styled_row(ws, ("ORIGINAL SYLLABUS", 'Comparison Subheader'), ("NEW SYLLABUS", 'Comparison Subheader'))
+        _styled_row(
+            ws,
+            (f"{comparison_data['original_code']} - {comparison_data['original_title']}", 'Comparison Original Info'),
+            (f"{comparison_data['new_code']} - {comparison_data['new_title']}", 'Comparison New Info')
+        )
+        ws.append([])
+
+        # Write each section comparison
+        for section_name, section_data in comparison_data['sections'].items():
+            if section_data['changed'] and 'diff' in section_data:
+                status = f" [CHANGED - {section_data['diff']['similarity']:.0%} similar]"
+            else:
+                status = " [CHANGED]" if section_data['changed'] else " [NO CHANGES]"
+            header_style = 'Comparison Changed Section' if section_data['changed'] else 'Comparison Section'
+            _styled_row(ws, (f"SECTION: {section_name}" + status, header_style), (None, header_style))
+            _styled_row(ws, ("ORIGINAL", 'Comparison Original Heading'), ("NEW", 'Comparison New Heading'))
+
+            # Content rows, aligned line by line when a diff is available
+            if 'diff' in section_data and section_data['diff']['lines']:
+                rows = _comparison_rows(section_data['diff'])
+            else:
+                original_text = section_data['original']
+                new_text = section_data['new']
+
+                # Split into lines for better readability
+                original_lines = original_text.split('\n') if original_text else ['[NOT FOUND]']
+                new_lines = new_text.split('\n') if new_text else ['[NOT FOUND]']
+
+                max_lines = max(len(original_lines), len(new_lines))
+                rows = [
+                    (original_lines[i] if i < len(original_lines) else '', 'Comparison Original Line',
+                     new_lines[i] if i < len(new_lines) else '', 'Comparison New Line')
+                    for i in range(max_lines)
+                ]
+
+            for orig_line, orig_style, new_line, new_style in rows:
+                _styled_row(ws, (orig_line, orig_style), (new_line, new_style))
+
+            ws.append([])  # Space between sections
+
+    with stage('excel save'):
+        wb.save(file_path)
+
+
+def _sheet_title(name, used):
+    """A unique worksheet title for name within Excel's 31-character, restricted-character limit"""
+    title = ''.join('_' if char in '[]:*?/\\' else char for char in name)[:31]
+    candidate = title
+    suffix = 2
+    while candidate in used:
+        candidate = f"{title[:31 - len(str(suffix)) - 1]} {suffix}"
+        suffix += 1
+    used.add(candidate)
+    return candidate
+
+
+# Files up to which similarity exports write a full matrix per section, and Excel's sheet row limit
+SIMILARITY_MATRIX_MAX_FILES = 250
+EXCEL_MAX_ROWS = 1048576
+
+
+def write_similarity_to_excel(file_path, file_names, results):
+    """Write an N-way section comparison: a cluster summary sheet plus a similarity sheet per section
+
+    results maps each section name to the syllabus_similarity.compare_many
+    result for that section, with documents in file_names order. Up to
+    SIMILARITY_MATRIX_MAX_FILES files, each section gets a matrix of every
+    syllabus against every other; beyond that, a list of its scored pairs.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    _register_export_styles(wb)
+    used_titles = set()
+
+    ws = wb.create_sheet(_sheet_title("Clusters", used_titles))
+    for col_letter, width in zip('ABCD', (30, 12, 12, 80)):
+        ws.column_dimensions[col_letter].width = width
+    ws.freeze_panes = 'A4'
+    ws.merged_cells.add('A1:D1')
+    ws.row_dimensions[1].height = 25
+    title = f"Syllabus Similarity - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    ws.append([_styled_cell(ws, title, 'Export Title')])
+    ws.append([])
+    ws.append([_styled_cell(ws, header, 'Export Header') for header in ('Section', 'Cluster', 'Syllabi', 'Files')])
+
+    # One row per cluster of identical or near-identical texts, largest first
+    for section, result in results.items():
+        for number, docs in enumerate(result['clusters'], 1):
+            ws.append([
+                _styled_cell(ws, section, 'Export Cell'),
+                _styled_cell(ws, number, 'Export Cell'),
+                _styled_cell(ws, len(docs), 'Export Cell'),
+                _styled_cell(ws, '\n'.join(file_names[doc] for doc in docs), 'Export Cell'),
+            ])
+        if result['missing']:
+            ws.append([
+                _styled_cell(ws, section, 'Export Cell'),
+                _styled_cell(ws, '[Not Found]', 'Export Cell'),
+                _styled_cell(ws, len(result['missing']), 'Export Cell'),
+                _styled_cell(ws, '\n'.join(file_names[doc] for doc in result['missing']), 'Export Cell'),
+            ])
+
+    for section, result in results.items():
+        ws = wb.create_sheet(_sheet_title(section, used_titles))
+        if len(file_names) <= SIMILARITY_MATRIX_MAX_FILES:
+            # Matrix sheet: every syllabus against every other, built a row at a time
+            ws.column_dimensions['A'].width = 35
+            ws.freeze_panes = 'B2'
+            ws.append([_styled_cell(ws, section, 'Export Header')] +
+                      [_styled_cell(ws, name, 'Export Header') for name in file_names])
+            # Scores are plain rounded values; styling N x N cells one by one dominates the write time
+            for doc_a, name in enumerate(file_names):
+                scores = (pair_similarity(result, doc_a, doc_b) for doc_b in range(len(file_names)))
+                ws.append([_styled_cell(ws, name, 'Export Header')] +
+                          [round(score, 3) if score is not None else None for score in scores])
+            continue
+
+        # Too many files for a matrix: one row per pair of distinct texts sharing any wording,
+        # each named by the first syllabus holding it (identical copies are listed under Clusters)
+        for col_letter, width in zip('ABC', (35, 35, 12)):
+            ws.column_dimensions[col_letter].width = width
+        ws.freeze_panes = 'A2'
+        ws.append([_styled_cell(ws, header, 'Export Header') for header in (section, 'Similar Syllabus', 'Similarity')])
+        first_doc = {}
+        for doc, variant in enumerate(result['variant_of']):
+            if variant is not None:
+                first_doc.setdefault(variant, doc)
+        pairs = sorted(result['similarity'].items(), key=lambda pair: -pair[1])
+        for (a, b), score in pairs[:EXCEL_MAX_ROWS - 1]:
+            ws.append([file_names[first_doc[a]], file_names[first_doc[b]], round(score, 3)])
+
+    wb.save(file_path)
+
+
+def write_boilerplate_to_excel(file_path, file_names, reports):
+    """Write boilerplate checks: every syllabus's deviation from each section's canonical wording
+
+    reports maps each section name to its syllabus_similarity
+    find_boilerplate_outliers result, with documents in file_names order.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    _register_export_styles(wb)
+
+    ws = wb.create_sheet("Boilerplate")
+    for col_letter, width in zip('ABCD', (25, 40, 15, 15)):
+        ws.column_dimensions[col_letter].width = width
+    ws.freeze_panes = 'A4'
+    ws.merged_cells.add('A1:D1')
+    ws.row_dimensions[1].height = 25
+    title = f"Boilerplate Check - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    ws.append([_styled_cell(ws, title, 'Export Title')])
+    ws.append([])
+    ws.append([_styled_cell(ws, header, 'Export Header') for header in ('Section', 'Source File', 'Status', 'Similarity')])
+
+    # Least similar first, so outliers lead each section; missing sections go last
+    for section, report in reports.items():
+        order = sorted(
+            range(len(report['documents'])),
+            key=lambda doc: (report['documents'][doc]['similarity'] is None, report['documents'][doc]['similarity'] or 0, doc)
+        )
+        for doc in order:
+            document = report['documents'][doc]
+            similarity = _styled_cell(ws, document['similarity'], 'Export Cell')
+            similarity.number_format = '0%'
+            ws.append([
+                _styled_cell(ws, section, 'Export Cell'),
+                _styled_cell(ws, file_names[doc], 'Export Cell'),
+                _styled_cell(ws, document['status'], 'Export Cell'),
+                similarity,
+            ])
+
+    ws = wb.create_sheet("Canonical Wording")
+    for col_letter, width in zip('ABC', (25, 40, 100)):
+        ws.column_dimensions[col_letter].width = width
+    ws.append([_styled_cell(ws, header, 'Export Header') for header in ('Section', 'Source File', 'Text')])
+    for section, report in reports.items():
+        if report['canonical'] is not None:
+            ws.append([
+                _styled_cell(ws, section, 'Export Cell'),
+                _styled_cell(ws, file_names[report['canonical']], 'Export Cell'),
+                _styled_cell(ws, report['canonical_text'], 'Export Cell'),
+            ])
+
+    wb.save(file_path)
+
+
+# Word highlighting inside changed lines of a comparison workbook
+_deleted_word_font = InlineFont(sz=9, color="9C0006", strike=True)
+_inserted_word_font = InlineFont(sz=9, color="006100", b=True)
+_equal_word_font = InlineFont(sz=9)
+
+
+def _highlighted_words(words, keep):
+    """Rich text of a word-level diff, showing the equal words and the words of op keep, spelled as on that side"""
+    font = _deleted_word_font if keep == 'delete' else _inserted_word_font
+    blocks = []
+    for op, original, new in words:
+        if op != 'equal' and op != keep:
+            continue
+        word = original if keep == 'delete' else new
+        text = word if not blocks else ' ' + word
+        blocks.append(TextBlock(_equal_word_font if op == 'equal' else font, text))
+    return CellRichText(blocks) if blocks else ''
+
+
+def _comparison_rows(diff):
+    """(original value, style, new value, style) for each aligned line of a section diff"""
+    rows = []
+    for line in diff['lines']:
+        op = line['op']
+        if op == 'equal':
+            rows.append((line['original'], 'Comparison Original Line', line['new'], 'Comparison New Line'))
+        elif op == 'replace':
+            rows.append((_highlighted_words(line['words'], 'delete'), 'Comparison Changed Line',
+                         _highlighted_words(line['words'], 'insert'), 'Comparison Inserted Line'))
+        elif op == 'delete':
+            rows.append((line['original'], 'Comparison Changed Line', '', 'Comparison New Line'))
+        elif op == 'insert':
+            rows.append(('', 'Comparison Original Line', line['new'], 'Comparison Inserted Line'))
+        elif line['original'] is not None:
+            rows.append((f"(moved) {line['original']}", 'Comparison Moved Line', '', 'Comparison New Line'))
+        else:
+            rows.append(('', 'Comparison Original Line', f"(moved) {line['new']}", 'Comparison Moved Line'))
+    return rows
+
+
+def preview_window_end(text, start, page_chars=PREVIEW_PAGE_CHARS):
+    """End of a preview window starting at start: just past the first line break after page_chars"""
+    end = text.find('\n', start + page_chars)
+    return len(text) if end == -1 else end + 1
+
+
+def preview_pages(text, page_chars=PREVIEW_PAGE_CHARS):
+    """Offsets at which each preview page starts"""
+    starts = [0]
+    while True:
+        end = preview_window_end(text, starts[-1], page_chars)
+        if end >= len(text):
+            return starts
+        starts.append(end)
+
+
+class Syllabus:
+    """A document parsed once and shared by preview, export and comparison
+
+    Holds the raw text with its heading index, course code and title, and
+    memoizes every section span, extracted section and prerequisite search,
+    so each is computed at most once per document however many views ask
+    for it. Instances pickle, so worker processes can build them.
+
+    A document built from_mapped has no text until something asks for it:
+    sections and prerequisites are read straight from the memory-mapped
+    file (which stays mapped for the object's lifetime, so threads can
+    share it), its hash and search rows come from streamed text_chunks, and
+    the text (with its index) is only decoded on first access, e.g. by a
+    preview.
+    """
+
+    def __init__(self, source, text, page_offsets=None, complete=True, index=None, mapped=None, cache_path=None):
+        self.source = str(source)
+        self.name = Path(self.source).name
+        self._text = text
+        self.mapped = mapped
+        self.page_offsets = page_offsets
+        self.complete = complete
+        # Text cache a partial document's full text is stored in once it is read to the end
+        self.cache_path = cache_path
+        if mapped is not None:
+            self.index = None
+            self.course_code, self.course_title = extract_course_info(mapped.head())
+        else:
+            if index is None:
+                with stage('index', self.source, len(text)):
+                    index = SectionIndex(text, index_patterns)
+            self.index = index
+            self.course_code, self.course_title = extract_course_info(text)
+        self._spans = {}
+        self._sections = {}
+        self._prerequisites = None
+        self._line_offsets = None
+        self._content_hash = None
+
+    @classmethod
+    def from_file(cls, file_path, file_bytes=None, cache=None, sections=None):
+        """Read and parse a document from disk or from an in-memory upload"""
+        text, page_offsets, complete = read_document(file_path, file_bytes, cache, sections)
+        return cls(file_path, text or "", page_offsets, complete, cache_path=cache.path if cache is not None else None)
+
+    @classmethod
+    def from_mapped(cls, file_path):
+        """Open a large .txt file memory-mapped, decoding only what is asked for"""
+        return cls(file_path, None, mapped=MappedText(file_path))
+
+    @property
+    def text(self):
+        """The document text, decoded from a mapped file on first access"""
+        if self._text is None:
+            text = self.mapped.read_text() or ""
+            with stage('index', self.source, len(text)):
+                self.index = SectionIndex(text, index_patterns)
+            # Set last, so a thread that sees the text also sees its index
+            self._text = text
+        return self._text
+
+    def text_chunks(self):
+        """The text in pieces, streamed from a mapped file without decoding it whole"""
+        if self._text is None and self.mapped is not None:
+            return self.mapped.text_chunks()
+        return iter((self.text,))
+
+    @property
+    def content_hash(self):
+        """SHA-256 of the text, identifying identical documents across uploads"""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for chunk in self.text_chunks():
+                digest.update(chunk.encode('utf-8'))
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def _require(self, section_name=None):
+        """Read further into a partially loaded document when its text so far cannot settle section_name
+
+        Pages are read only until section_name is settled; without
+        section_name the whole text is required (e.g. for a search of the
+        entire document). Sections and spans already found are unaffected,
+        since a settled section is the same in the full text.
+        """
+        if self.complete or not os.path.isfile(self.source):
+            return
+        if section_name is not None and sections_resolved(self.text, [section_name], self.index):
+            return
+        # Only a lazily read PDF is partial: extract its remaining pages, growing the index with them
+        document = LazyPdfDocument.resume(self.source, self.text, self.page_offsets or [])
+        if section_name is None:
+            text = document.full_text()
+            self.index.extend(text)
+        else:
+            text = document.text_for_sections([section_name], self.index)
+        self._text = text
+        self.page_offsets = document.page_offsets()
+        self.complete = document.complete
+        self._line_offsets = None
+        self._content_hash = None
+
+        # Whole now, so store it for the next reader of the same file
+        if self.complete and self.cache_path:
+            cache = open_cache(self.cache_path)
+            if cache is not None:
+                with stage('cache store', self.source):
+                    cache.put(content_key(Path(self.source).read_bytes(), PARSER_VERSION), text, self.page_offsets)
+
+    def span(self, section_name):
+        """Return the section's (heading, content start, content end) offsets or None"""
+        if section_name not in self._spans:
+            self._require(section_name)
+            self._spans[section_name] = find_section_span(self.text, section_name, self.index)
+        return self._spans[section_name]
+
+    def section(self, section_name):
+        """Return the extracted text of a predefined section or None"""
+        if section_name not in self._sections:
+            mapped = self.mapped
+            if mapped is not None:
+                with stage('extract_section', self.source):
+                    self._sections[section_name] = mapped.section(section_name)
+            else:
+                self._require(section_name)
+                with stage('extract_section', self.source):
+                    self._sections[section_name] = extract_section(self.text, section_name, self.index)
+        return self._sections[section_name]
+
+    def prerequisites(self):
+        """Return prerequisites found anywhere in the document or None"""
+        if self._prerequisites is None:
+            # Empty string marks a search that found nothing
+            mapped = self.mapped
+            if mapped is not None:
+                with stage('prerequisites', self.source):
+                    self._prerequisites = mapped.prerequisites() or ''
+            else:
+                self._require()
+                with stage('prerequisites', self.source):
+                    self._prerequisites = extract_prerequisites(self.text) or ''
+        return self._prerequisites or None
+
+    def line_number(self, offset):
+        """Return the 1-based line holding a text offset"""
+        if self._line_offsets is None:
+            offsets = [0]
+            pos = self.text.find('\n')
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = self.text.find('\n', pos + 1)
+            self._line_offsets = offsets
+        return bisect_right(self._line_offsets, offset)
+
+    def page_number(self, offset):
+        """Return the 1-based PDF page holding a text offset, or None for other formats"""
+        if not self.page_offsets:
+            return None
+        return bisect_right(self.page_offsets, offset)
+
+    def export_row(self, checked_sections, selected_text=None, metadata=False):
+        """Build one export row with course info and every checked section
+
+        With metadata, each section is followed by its section_metadata
+        columns (see SECTION_METADATA_FIELDS).
+        """
+        row_data = {
+            'Source File': self.name,
+            'Course Code': self.course_code or 'Unknown',
+            'Course Title': self.course_title or 'Unknown'
+        }
+
+        # Add selected text if it's from this file
+        if selected_text:
+            row_data['Selected Text'] = selected_text
+
+        for section in checked_sections:
+            section_content = self.section(section)
+            row_data[section] = section_content if section_content else "[Not Found]"
+
+        # Search for prerequisites anywhere in the document
+        if 'Prerequisites' in checked_sections and row_data.get('Prerequisites') == "[Not Found]":
+            extracted_prereqs = self.prerequisites()
+            if extracted_prereqs:
+                row_data['Prerequisites'] = extracted_prereqs
+
+        if metadata:
+            for section in checked_sections:
+                row_data.update(self.section_metadata(section, row_data[section]))
+
+        return row_data
+
+    def section_metadata(self, section_name, content=None):
+        """Found flag, character count and heading page (PDFs only) of a section, keyed by metadata column
+
+        content is the exported text, when it differs from the section's own
+        (e.g. prerequisites found outside a Prerequisites section).
+        """
+        if content is None or content == "[Not Found]":
+            content = self.section(section_name)
+        page = None
+        if content and self.page_offsets and self.mapped is None:
+            span = self.span(section_name)
+            page = self.page_number(span[0]) if span else None
+        values = (bool(content), len(content) if content else 0, page)
+        return {metadata_column(section_name, field): value for field, value in zip(SECTION_METADATA_FIELDS, values)}
@@ -0,0 +1,284 @@
+"""Deterministic generator of synthetic syllabi for benchmarking
+
+Every document is built from a seeded random.Random, so the same seed, count
+and formats always produce the same text. Documents vary in length, section
+order and heading spelling (e.g. "Learning Objectives" vs "Course
+Objectives"), and are written as TXT, DOCX or PDF. PDFs are written directly,
+so nothing beyond the app's own dependencies is needed. Boilerplate sections
+carry one institution-wide text, which a fraction of documents edit slightly
+or replace with their own wording, as in a real archive.
+
+Example:
+    python syllabus_corpus.py corpus/ -n 1000 --formats txt,docx,pdf
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+from docx import Document
+
+# Course prefixes and title words for the heading line
+course_prefixes = ['SM', 'ES', 'HPS', 'PE', 'KIN', 'ACCT', 'MGT']
+title_words = [
+    'HISTORY', 'CONTEMPORARY', 'ASPECTS', 'SPORT', 'MANAGEMENT', 'FINANCE', 'MARKETING',
+    'ETHICS', 'LAW', 'FACILITY', 'OPERATIONS', 'LEADERSHIP', 'GOVERNANCE', 'EVENT',
+    'ANALYTICS', 'COMMUNICATION', 'PSYCHOLOGY', 'RECREATION', 'COACHING', 'POLICY'
+]
+
+# Heading spellings used for each section; the first is the canonical one
+section_headings = {
+    'Course Description': ['Course Description', 'COURSE DESCRIPTION'],
+    'Course Materials': ['Course Materials', 'Course Materials and Resources'],
+    'Required Text': ['Required Text', 'Required Texts', 'Textbook'],
+    'Learning Outcomes': ['Learning Outcomes', 'Learning Objectives', 'Course Objectives'],
+    'Course Requirements': ['Course Requirements and Assignments', 'Course Requirements'],
+    'Grading Policy': ['Grading Policy', 'Evaluation and Grading Policies'],
+    'Grading Scale': ['Grading Scale', 'GRADING SCALE'],
+    'Attendance Policy': ['Attendance Policy', 'Absences'],
+    'Late Work Policy': ['Late Work Policy', 'Late Submission'],
+    'Academic Integrity': ['Academic Integrity', 'Honor Code'],
+    'Disability Services': ['Disability Services', 'Accommodations'],
+    'Course Schedule': ['Course Schedule', 'Course Calendar'],
+}
+
+# Vocabulary for filler prose; kept free of section headings
+prose_words = [
+    'students', 'will', 'examine', 'the', 'role', 'of', 'sport', 'in', 'society', 'and', 'its',
+    'organizations', 'through', 'readings', 'cases', 'discussion', 'projects', 'course', 'topics',
+    'include', 'youth', 'collegiate', 'professional', 'leagues', 'international', 'competition',
+    'culture', 'race', 'gender', 'media', 'revenue', 'governing', 'bodies', 'venues', 'fans',
+    'each', 'week', 'module', 'quiz', 'chapter', 'presentation', 'review', 'submit', 'work',
+    'by', 'due', 'date', 'with', 'a', 'for', 'to', 'on', 'all', 'are', 'is', 'be', 'from'
+]
+outcome_verbs = ['Identify', 'Describe', 'Discuss', 'Explain', 'Analyze', 'Evaluate', 'Compare', 'Apply']
+
+# Institution-wide wording of the boilerplate sections; kept free of section headings and markers
+institution_boilerplate = {
+    'Academic Integrity': (
+        "All members of the university community are expected to uphold the highest standards of honesty "
+        "in their academic work. Cheating, fabrication, unauthorized collaboration and presenting the work "
+        "of others as one's own violate the university's standards of conduct. Suspected violations are "
+        "reported to the Office of Student Conduct and may result in a failing grade for the assignment or "
+        "the course, and in further sanctions up to dismissal from the university. Students who are unsure "
+        "whether a form of collaboration or citation is permitted should ask before submitting their work."
+    ),
+    'Disability Services': (
+        "The university is committed to providing equal access to its programs for students with "
+        "disabilities. Students who need reasonable adjustments in this course should register with the "
+        "Office of Disability Resources and provide their letter of approval at the start of the semester. "
+        "Adjustments are not applied retroactively, so students are encouraged to register as early as "
+        "possible. All information about a student's disability is kept confidential."
+    ),
+}
+
+# Fractions of documents whose boilerplate has a few words edited, or is their own wording entirely
+BOILERPLATE_EDITED = 0.2
+BOILERPLATE_REWRITTEN = 0.05
+
+# Characters per line and lines per page in generated PDFs
+PDF_LINE_WIDTH = 90
+PDF_PAGE_LINES = 60
+
+
+def _sentence(rng, min_words=8, max_words=22):
+    words = [rng.choice(prose_words) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng, min_sentences=2, max_sentences=6):
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(min_sentences, max_sentences)))
+
+
+def _boilerplate_body(rng, section):
+    """The institution's text for a boilerplate section, lightly edited or replaced in some documents"""
+    draw = rng.random()
+    if draw < BOILERPLATE_REWRITTEN:
+        return [_paragraph(rng)]
+    words = institution_boilerplate[section].split()
+    if draw < BOILERPLATE_REWRITTEN + BOILERPLATE_EDITED:
+        # A word or two changed, dropped or added, as when a department adapts the text
+        for _ in range(rng.randint(1, 2)):
+            position = rng.randrange(len(words))
+            edit = rng.choice(['replace', 'delete', 'insert'])
+            if edit == 'replace':
+                words[position] = rng.choice(prose_words)
+            elif edit == 'delete':
+                del words[position]
+            else:
+                words.insert(position, rng.choice(prose_words))
+    return [' '.join(words)]
+
+
+def _section_body(rng, section, length):
+    """Lines of body text for one section, scaled by the document's length factor"""
+    if section in institution_boilerplate:
+        return _boilerplate_body(rng, section)
+    if section == 'Learning Outcomes':
+        count = rng.randint(3, 6 + 4 * length)
+        return [f"{chr(65 + i % 26)}. {rng.choice(outcome_verbs)} {_sentence(rng, 6, 14).lower()}" for i in range(count)]
+    if section == 'Grading Scale':
+        return ['89.50% - 100% A', '79.50% - 89.49% B', '69.50% - 79.49% C', '59.50% - 69.49% D', '0% - 59.49% F']
+    if section == 'Course Schedule':
+        return [f"Week {week}: {_sentence(rng, 4, 10)}" for week in range(1, rng.randint(8, 16) + 1)]
+    if section == 'Required Text':
+        return [f"{_sentence(rng, 6, 12)[:-1]}, {rng.randint(2, 9)}th edition", f"ISBN: 978-1-{rng.randint(100, 999)}-{rng.randint(10000, 99999)}-{rng.randint(0, 9)}"]
+    return [_paragraph(rng) for _ in range(rng.randint(1, 1 + 2 * length))]
+
+
+def generate_syllabus(seed):
+    """Return the text of one synthetic syllabus, fully determined by seed"""
+    rng = random.Random(seed)
+    length = rng.choice([1, 1, 2, 3, 5])  # most documents are short, a few are long
+
+    prefix = rng.choice(course_prefixes)
+    number = rng.randint(1000, 4999)
+    title = ' '.join(rng.sample(title_words, rng.randint(2, 5)))
+    separator = rng.choice([': ', ':  ', ' - ', ' '])
+
+    lines = [
+        'SYLLABUS',
+        'COLLEGE OF HEALTH AND HUMAN SERVICES',
+        f"{prefix} {number}{separator}{title}",
+        f"{rng.choice(['FALL', 'SPRING', 'SUMMER'])} {rng.randint(2018, 2026)}",
+        '',
+        'Course Information',
+        '',
+        'Class meeting time: ',
+        'Modality and Location: ',
+        '',
+        'Instructor Information',
+        '',
+        'Name: ',
+        'Email: ',
+        'Office Hours: ',
+        '',
+    ]
+
+    # Description comes first as in most syllabi; everything after it is shuffled
+    sections = [section for section in section_headings if section != 'Course Description']
+    rng.shuffle(sections)
+    sections = ['Course Description'] + [section for section in sections if rng.random() < 0.85]
+
+    for section in sections:
+        lines.append(rng.choice(section_headings[section]))
+        lines.append('')
+        if section == 'Course Description':
+            if rng.random() < 0.7:
+                lines.append(f"Prerequisites: {prefix} {number - rng.randint(100, 900)}")
+            lines.append(f"Credit Hours: {rng.choice(['1.0', '2.0', '3.0', '4.0'])}")
+            lines.append('')
+        lines.extend(_section_body(rng, section, length))
+        lines.append('')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_txt(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def write_docx(path, text):
+    doc = Document()
+    for line in text.split('\n'):
+        doc.add_paragraph(line)
+    doc.save(str(path))
+
+
+def _pdf_lines(text):
+    """Wrap text to PDF_LINE_WIDTH characters, keeping blank lines"""
+    lines = []
+    for line in text.split('\n'):
+        while len(line) > PDF_LINE_WIDTH:
+            cut = line.rfind(' ', 0, PDF_LINE_WIDTH)
+            if cut <= 0:
+                cut = PDF_LINE_WIDTH
+            lines.append(line[:cut])
+            line = line[cut:].lstrip()
+        lines.append(line)
+    return lines
+
+
+def write_pdf(path, text):
+    """Write text as a minimal multi-page PDF using the built-in Helvetica font"""
+    lines = _pdf_lines(text)
+    pages = [lines[i:i + PDF_PAGE_LINES] for i in range(0, len(lines), PDF_PAGE_LINES)] or [[]]
+
+    def escape(line):
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    kids = ' '.join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i, page in enumerate(pages):
+        operations = ['BT', '/F1 10 Tf', '12 TL', '50 770 Td']
+        operations.extend(f"({escape(line)}) Tj T*" for line in page)
+        operations.append('ET')
+        stream = '\n'.join(operations).encode('latin-1', errors='replace')
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b'\nendstream')
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b'\nendobj\n'
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    with open(path, 'wb') as f:
+        f.write(bytes(output))
+
+
+writers = {'.txt': write_txt, '.docx': write_docx, '.pdf': write_pdf}
+
+
+def generate_corpus(directory, count, formats=('.txt', '.docx', '.pdf'), seed=0):
+    """Write count synthetic syllabi into directory, cycling through formats, and return their paths"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    width = len(str(count))
+    paths = []
+    for i in range(count):
+        extension = formats[i % len(formats)]
+        path = directory / f"syllabus_{i:0{width}d}{extension}"
+        writers[extension](path, generate_syllabus(seed * 1000003 + i))
+        paths.append(path)
+    return paths
+
+
+def parse_formats(value):
+    """Turn 'txt,pdf' into ('.txt', '.pdf'), rejecting unknown formats"""
+    formats = tuple('.' + name.strip().lstrip('.').lower() for name in value.split(',') if name.strip())
+    unknown = [extension for extension in formats if extension not in writers]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(f"formats must be drawn from txt, docx, pdf (got {value!r})")
+    return formats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic corpus of synthetic syllabi.")
+    parser.add_argument('directory', help="Directory to write the documents into")
+    parser.add_argument('-n', '--count', type=int, default=100, help="Number of documents (default: %(default)s)")
+    parser.add_argument('--formats', type=parse_formats, default=('.txt', '.docx', '.pdf'),
+                        help="Comma-separated formats to cycle through (default: txt,docx,pdf)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed; the same seed gives the same corpus")
+    args = parser.parse_args(argv)
+
+    paths = generate_corpus(args.directory, args.count, args.formats, args.seed)
+    print(f"Wrote {len(paths)} syllabi to {args.directory}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Line- and word-level differences between two versions of a syllabus section
+
+Lines are compared after normalization (whitespace collapsed, the numbering
+and bullets added by extract_section dropped, case folded), so reformatting
+alone never counts as a change. Both levels use Myers' O((N+M)D) algorithm,
+which stays close to linear for the mostly-similar sections being compared;
+sections too far apart for it are diffed with difflib instead.
+Changed lines are paired and diffed word by word; a line deleted in one place
+and inserted unchanged in another is reported as moved.
+"""
+import difflib
+import re
+from collections import Counter
+
+# Edits beyond which myers_diff hands over to difflib; Myers costs O((N+M)D)
+# time and O(D^2) memory, which only suits mostly-similar sections
+MAX_EDIT_DISTANCE = 1000
+
+# Word overlap at which a deleted and an inserted line count as one edited line
+PAIR_THRESHOLD = 0.5
+
+# Inserted lines searched for an edited counterpart of each deleted line
+PAIR_WINDOW = 20
+
+# Leading numbering or bullet, e.g. "1. ", "• ", "- "
+_list_marker = re.compile(r'^(?:\d+[.)]|[•\-*])\s+')
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_line(line):
+    """Comparison key of a line: marker-free, whitespace-collapsed and case-folded"""
+    line = _whitespace.sub(' ', line).strip()
+    return _list_marker.sub('', line).casefold()
+
+
+def myers_diff(a, b):
+    """Shortest edit script turning sequence a into b as ('equal'|'delete'|'insert', item) pairs
+
+    Falls back to difflib once more than MAX_EDIT_DISTANCE edits are needed,
+    where Myers' quadratic cost in the edit distance stops paying off.
+    """
+    n, m = len(a), len(b)
+    offset = n + m + 1
+    v = [0] * (2 * offset + 1)
+    trace = []
+
+    # Forward pass: furthest-reaching path on each diagonal for d = 0, 1, ...
+    for d in range(min(n + m, MAX_EDIT_DISTANCE) + 1):
+        # Step d only reads diagonals -d..d, so that is all backtracking needs
+        trace.append(v[offset - d:offset + d + 1])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(a, b, trace, d)
+    return _difflib_diff(a, b)
+
+
+def _backtrack(a, b, trace, d):
+    """Recover the edit script from the saved diagonal frontiers"""
+    script = []
+    x, y = len(a), len(b)
+    for depth in range(d, 0, -1):
+        # trace[depth] holds diagonals -depth..depth, so diagonal k sits at index k + depth
+        v = trace[depth]
+        k = x - y
+        if k == -depth or (k != depth and v[depth + k - 1] < v[depth + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[depth + prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            script.append(('equal', a[x]))
+        if x == prev_x:
+            y -= 1
+            script.append(('insert', b[y]))
+        else:
+            x -= 1
+            script.append(('delete', a[x]))
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        script.append(('equal', a[x]))
+    script.reverse()
+    return script
+
+
+def _difflib_diff(a, b):
+    """Edit script from difflib's matching blocks, for inputs too far apart for myers_diff"""
+    script = []
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            script.extend(('equal', item) for item in a[i1:i2])
+            continue
+        script.extend(('delete', item) for item in a[i1:i2])
+        script.extend(('insert', item) for item in b[j1:j2])
+    return script
+
+
+def diff_words(original, new):
+    """Word-level edit script between two lines, plus the number of matching words
+
+    The script holds (op, original word, new word) triples: deleted words
+    have no new word, inserted words no original word, and equal words
+    carry both spellings, as words are matched case-insensitively.
+    """
+    original_words = original.split()
+    new_words = new.split()
+    original_keys = [word.casefold() for word in original_words]
+    new_keys = [word.casefold() for word in new_words]
+
+    words = []
+    matched = 0
+    i = j = 0
+    for op, _ in myers_diff(original_keys, new_keys):
+        if op == 'equal':
+            words.append(('equal', original_words[i], new_words[j]))
+            matched += 1
+            i += 1
+            j += 1
+        elif op == 'delete':
+            words.append(('delete', original_words[i], None))
+            i += 1
+        else:
+            words.append(('insert', None, new_words[j]))
+            j += 1
+    return words, matched
+
+
+def _overlap(original, new):
+    """Share of words two lines have in common, from 0 to 1"""
+    original_words = set(original.casefold().split())
+    new_words = set(new.casefold().split())
+    if not original_words and not new_words:
+        return 1.0
+    return 2 * len(original_words & new_words) / (len(original_words) + len(new_words))
+
+
+def diff_sections(original, new):
+    """Compare two section texts, either of which may be None
+
+    Returns a dict with 'changed' (whether the normalized texts differ),
+    'similarity' (0 to 1, from matching words) and 'lines': aligned
+    {'op', 'original', 'new', 'words'} rows where op is 'equal', 'delete',
+    'insert', 'replace' (with a word-level 'words' script) or 'move'.
+    """
+    original_lines = [line for line in (original or '').split('\n') if line.strip()]
+    new_lines = [line for line in (new or '').split('\n') if line.strip()]
+    original_keys = [normalize_line(line) for line in original_lines]
+    new_keys = [normalize_line(line) for line in new_lines]
+
+    script = myers_diff(original_keys, new_keys)
+
+    # Lines deleted here and inserted unchanged elsewhere were moved; a key deleted
+    # twice and inserted once is one move plus one deletion
+    deleted_counts = Counter(key for op, key in script if op == 'delete')
+    inserted_counts = Counter(key for op, key in script if op == 'insert')
+    moves_left = {key: min(count, inserted_counts[key]) for key, count in deleted_counts.items() if key in inserted_counts}
+    inserts_moved = dict(moves_left)
+
+    lines = []
+    matched_words = 0
+    # Current hunk as (line, is_move) pairs, emitted in source order by flush()
+    deleted = []
+    inserted = []
+
+    def emit_inserts(pending):
+        for new_line, is_move in pending:
+            op = 'move' if is_move else 'insert'
+            lines.append({'op': op, 'original': None, 'new': new_line, 'words': None})
+
+    def flush():
+        # Pair each deleted line of a hunk with the next similar inserted line, keeping order;
+        # lines left unpaired are pure deletions/insertions, moves stay where they occur
+        nonlocal matched_words
+        j = 0
+        for old_line, is_move in deleted:
+            if is_move:
+                lines.append({'op': 'move', 'original': old_line, 'new': None, 'words': None})
+                matched_words += len(old_line.split())
+                continue
+            match = None
+            for k in range(j, min(j + PAIR_WINDOW, len(inserted))):
+                new_line, new_is_move = inserted[k]
+                if not new_is_move and _overlap(old_line, new_line) >= PAIR_THRESHOLD:
+                    match = k
+                    break
+            if match is None:
+                lines.append({'op': 'delete', 'original': old_line, 'new': None, 'words': None})
+                continue
+            emit_inserts(inserted[j:match])
+            words, matched = diff_words(old_line, inserted[match][0])
+            matched_words += matched
+            lines.append({'op': 'replace', 'original': old_line, 'new': inserted[match][0], 'words': words})
+            j = match + 1
+        emit_inserts(inserted[j:])
+        deleted.clear()
+        inserted.clear()
+
+    i = j = 0
+    for op, key in script:
+        if op == 'equal':
+            flush()
+            lines.append({'op': 'equal', 'original': original_lines[i], 'new': new_lines[j], 'words': None})
+            matched_words += len(new_lines[j].split())
+            i += 1
+            j += 1
+        elif op == 'delete':
+            is_move = moves_left.get(key, 0) > 0
+            if is_move:
+                moves_left[key] -= 1
+            deleted.append((original_lines[i], is_move))
+            i += 1
+        else:
+            is_move = inserts_moved.get(key, 0) > 0
+            if is_move:
+                inserts_moved[key] -= 1
+            inserted.append((new_lines[j], is_move))
+            j += 1
+    flush()
+
+    total_words = sum(len(line.split()) for line in original_lines) + sum(len(line.split()) for line in new_lines)
+    similarity = 2 * matched_words / total_words if total_words else 1.0
+    changed = original_keys != new_keys
+
+    return {'changed': changed, 'similarity': similarity if changed else 1.0, 'lines': lines}
+
+
+def format_words(words):
+    """Render a word-level script with [-deleted-] and {+inserted+} markers
+
+    An equal word whose case changed shows both spellings, so neither side
+    is misquoted.
+    """
+    parts = []
+    for op, original, new in words:
+        if op == 'delete':
+            parts.append(f"[-{original}-]")
+        elif op == 'insert':
+            parts.append(f"{{+{new}+}}")
+        elif original != new:
+            parts.append(f"[-{original}-] {{+{new}+}}")
+        else:
+            parts.append(original)
+    return ' '.join(parts)
+
+
+def format_diff(diff):
+    """Render a section diff as unified-style text lines ('  ', '- ', '+ ', '~ ', '> ' prefixes)"""
+    output = []
+    for line in diff['lines']:
+        if line['op'] == 'equal':
+            output.append(f"  {line['new']}")
+        elif line['op'] == 'delete':
+            output.append(f"- {line['original']}")
+        elif line['op'] == 'insert':
+            output.append(f"+ {line['new']}")
+        elif line['op'] == 'replace':
+            output.append(f"~ {format_words(line['words'])}")
+        elif line['original'] is not None:
+            output.append(f"> (moved from here) {line['original']}")
+        else:
+            output.append(f"> (moved here) {line['new']}")
+    return output
@@ -0,0 +1,314 @@
+"""Similarity of one section across many syllabi at once
+
+Section texts are normalized (see syllabus_diff.normalize_line) and reduced
+to sets of hashed word shingles. Identical texts are grouped by hash first,
+so a section copied into a hundred syllabi is compared once. The remaining
+distinct texts are paired up through an inverted index of shingles, so only
+texts sharing at least one shingle are ever compared; every other pair has
+similarity 0. Near-identical texts are then clustered with union-find.
+
+Boilerplate checks (find_boilerplate_outliers) instead fingerprint each
+distinct text with MinHash and find near-duplicates through LSH buckets, so
+the work grows with the number of distinct texts rather than their pairs.
+"""
+import random
+import zlib
+from syllabus_diff import normalize_line
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Jaccard similarity at which two texts fall in the same cluster
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+
+def normalize_text(text):
+    """Whitespace-, case- and numbering-insensitive form of a section"""
+    return '\n'.join(key for key in (normalize_line(line) for line in (text or '').split('\n')) if key)
+
+
+def shingles(normalized, size=SHINGLE_SIZE):
+    """Set of CRC-32 hashes of every run of size consecutive words"""
+    words = normalized.split()
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def compare_many(texts, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Compare one section across many documents
+
+    texts holds each document's section text, or None where the section was
+    not found. Identical texts share a variant, and only distinct texts that
+    share a shingle are scored, so the result grows with those pairs rather
+    than with len(texts) squared. Returns a dict with:
+      'variant_of': each document's variant index (None when missing),
+      'similarity': {(a, b): Jaccard similarity} for variants a < b sharing a
+                    shingle; every other pair of distinct variants scores 0
+                    (see pair_similarity),
+      'clusters': lists of document indexes whose texts are identical or
+                  near-identical, largest first (missing sections excluded),
+      'missing': indexes of documents without the section.
+    """
+    # Group identical texts so each distinct text is shingled and compared once
+    variant_of = [None] * len(texts)
+    variants = {}
+    for doc, text in enumerate(texts):
+        if text is None:
+            continue
+        normalized = normalize_text(text)
+        variant_of[doc] = variants.setdefault(normalized, len(variants))
+
+    variant_shingles = [shingles(normalized) for normalized in variants]
+
+    # Candidate pairs are distinct texts sharing a shingle, found through an inverted index
+    postings = {}
+    for variant, shingle_set in enumerate(variant_shingles):
+        for shingle in shingle_set:
+            postings.setdefault(shingle, []).append(variant)
+
+    similarity = {}
+    clusters = _UnionFind(len(variants))
+    for a, shingle_set in enumerate(variant_shingles):
+        candidates = set()
+        for shingle in shingle_set:
+            candidates.update(postings[shingle])
+        for b in candidates:
+            if b <= a:
+                continue
+            shared = len(shingle_set & variant_shingles[b])
+            score = shared / (len(shingle_set) + len(variant_shingles[b]) - shared)
+            similarity[(a, b)] = score
+            if score >= threshold:
+                clusters.union(a, b)
+
+    groups = {}
+    for doc, variant in enumerate(variant_of):
+        if variant is not None:
+            groups.setdefault(clusters.find(variant), []).append(doc)
+
+    return {
+        'variant_of': variant_of,
+        'similarity': similarity,
+        'clusters': sorted(groups.values(), key=lambda docs: (-len(docs), docs[0])),
+        'missing': [doc for doc, variant in enumerate(variant_of) if variant is None],
+    }
+
+
+def pair_similarity(result, doc_a, doc_b):
+    """Jaccard similarity of two documents in a compare_many result, None when either lacks the section"""
+    a, b = result['variant_of'][doc_a], result['variant_of'][doc_b]
+    if a is None or b is None:
+        return None
+    if a == b:
+        return 1.0
+    return result['similarity'].get((min(a, b), max(a, b)), 0.0)
+
+
+def compare_syllabi(syllabi, sections, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """compare_many for each section across a list of Syllabus objects, keyed by section"""
+    return {
+        section: compare_many([syllabus.section(section) for syllabus in syllabi], threshold)
+        for section in sections
+    }
+
+
+def cluster_summary(results):
+    """One line per section: how many distinct clusters and how many syllabi lack it"""
+    lines = []
+    for section, result in results.items():
+        sizes = [len(docs) for docs in result['clusters']]
+        line = f"{section}: {len(sizes)} cluster(s)"
+        if sizes:
+            line += f", largest holds {sizes[0]} syllabi"
+        if result['missing']:
+            line += f", not found in {len(result['missing'])}"
+        lines.append(line)
+    return lines
+
+
+# Sections expected to carry institution-standard wording
+boilerplate_sections = ['Academic Integrity', 'Disability Services']
+
+# MinHash signature length (one-permutation bins), split into LSH bands of LSH_ROWS values each.
+# 16 bands of 4 rows make texts of about 50% Jaccard similarity or more
+# likely candidates, comfortably below NEAR_DUPLICATE_THRESHOLD
+MINHASH_PERMUTATIONS = 64
+LSH_ROWS = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class MinHasher:
+    """One-permutation MinHash: a single hash pass per shingle set fills every signature position
+
+    Each shingle is hashed once and falls into one of `permutations` bins,
+    each bin keeping its minimum; empty bins borrow from the next filled bin
+    to the right (rotation densification). Equal positions estimate Jaccard
+    similarity like classic MinHash, at the cost of one hash per shingle
+    instead of one per shingle and permutation.
+    """
+
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, seed=1):
+        rng = random.Random(seed)
+        self.permutations = permutations
+        self.a = rng.randrange(1, _MERSENNE_PRIME)
+        self.b = rng.randrange(_MERSENNE_PRIME)
+
+    def signature(self, shingle_set):
+        """Tuple of (rotation distance, minimum) per bin"""
+        k = self.permutations
+        bins = [None] * k
+        for shingle in shingle_set:
+            value, slot = divmod((self.a * shingle + self.b) % _MERSENNE_PRIME, k)
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+        if not shingle_set:
+            return tuple((0, 0) for _ in range(k))
+
+        # Walk right to left twice so every empty bin sees the nearest filled bin to its right
+        signature = [None] * k
+        nearest = None
+        for position in range(2 * k - 1, -1, -1):
+            slot = position % k
+            if bins[slot] is not None:
+                nearest = (position, bins[slot])
+            elif nearest is not None and position < k:
+                signature[slot] = (nearest[0] - position, nearest[1])
+            if position < k and bins[slot] is not None:
+                signature[slot] = (0, bins[slot])
+        return tuple(signature)
+
+
+class LshIndex:
+    """Locality-sensitive hashing over MinHash signatures split into bands"""
+
+    def __init__(self, rows=LSH_ROWS):
+        self.rows = rows
+        self.buckets = {}
+
+    def _bands(self, signature):
+        for start in range(0, len(signature), self.rows):
+            yield start, signature[start:start + self.rows]
+
+    def add(self, key, signature):
+        for band in self._bands(signature):
+            self.buckets.setdefault(band, []).append(key)
+
+    def candidates(self, signature):
+        """Keys sharing at least one band with signature"""
+        found = set()
+        for band in self._bands(signature):
+            found.update(self.buckets.get(band, ()))
+        return found
+
+
+def find_boilerplate_outliers(texts, threshold=NEAR_DUPLICATE_THRESHOLD, hasher=None):
+    """Flag texts of one section that deviate from its canonical wording
+
+    Distinct texts are fingerprinted with shingled MinHash and indexed with
+    LSH; candidate pairs are confirmed with their exact shingle Jaccard and
+    clustered. The cluster covering the most documents is canonical, and its
+    most common text is the canonical wording. Returns a dict with
+    'canonical' (a document index holding the canonical wording, or None),
+    'canonical_text' and 'documents': per document {'status', 'similarity'}, where status is
+    'canonical', 'variant' (at least threshold similar), 'outlier' or
+    'missing', and similarity is the Jaccard similarity to the canonical text.
+    """
+    hasher = hasher or MinHasher()
+
+    variant_of = [None] * len(texts)
+    variants = {}
+    for doc, text in enumerate(texts):
+        if text is None:
+            continue
+        variant_of[doc] = variants.setdefault(normalize_text(text), len(variants))
+
+    variant_shingles = [shingles(normalized) for normalized in variants]
+    counts = [0] * len(variants)
+    for variant in variant_of:
+        if variant is not None:
+            counts[variant] += 1
+
+    # Fingerprint and index each distinct text once, clustering confirmed near-duplicates
+    lsh = LshIndex()
+    clusters = _UnionFind(len(variants))
+    for variant, shingle_set in enumerate(variant_shingles):
+        signature = hasher.signature(shingle_set)
+        for other in lsh.candidates(signature):
+            # Already clustered together through another text; in a mostly-boilerplate
+            # archive that is nearly every candidate, so confirming it again would be quadratic
+            if clusters.find(other) == clusters.find(variant):
+                continue
+            shared = len(shingle_set & variant_shingles[other])
+            union = len(shingle_set) + len(variant_shingles[other]) - shared
+            if union and shared / union >= threshold:
+                clusters.union(variant, other)
+        lsh.add(variant, signature)
+
+    documents = [{'status': 'missing', 'similarity': None} for _ in texts]
+    if not variants:
+        return {'canonical': None, 'canonical_text': None, 'documents': documents}
+
+    cluster_sizes = {}
+    for variant, count in enumerate(counts):
+        root = clusters.find(variant)
+        cluster_sizes[root] = cluster_sizes.get(root, 0) + count
+    canonical_cluster = max(cluster_sizes, key=lambda root: (cluster_sizes[root], -root))
+    canonical = max(
+        (variant for variant in range(len(variants)) if clusters.find(variant) == canonical_cluster),
+        key=lambda variant: (counts[variant], -variant)
+    )
+
+    canonical_shingles = variant_shingles[canonical]
+    for doc, variant in enumerate(variant_of):
+        if variant is None:
+            continue
+        if variant == canonical:
+            documents[doc] = {'status': 'canonical', 'similarity': 1.0}
+            continue
+        shingle_set = variant_shingles[variant]
+        shared = len(shingle_set & canonical_shingles)
+        union = len(shingle_set) + len(canonical_shingles) - shared
+        similarity = shared / union if union else 1.0
+        documents[doc] = {'status': 'variant' if similarity >= threshold else 'outlier', 'similarity': similarity}
+
+    first = variant_of.index(canonical)
+    return {'canonical': first, 'canonical_text': texts[first], 'documents': documents}
+
+
+def check_boilerplate(syllabi, sections=None, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """find_boilerplate_outliers for each boilerplate section across a list of Syllabus objects"""
+    hasher = MinHasher()
+    return {
+        section: find_boilerplate_outliers([syllabus.section(section) for syllabus in syllabi], threshold, hasher)
+        for section in (sections or boilerplate_sections)
+    }
+
+
+def boilerplate_summary(reports):
+    """One line per section: how many syllabi match, vary from or deviate from the canonical wording"""
+    lines = []
+    for section, report in reports.items():
+        statuses = [document['status'] for document in report['documents']]
+        lines.append(
+            f"{section}: {statuses.count('canonical')} canonical, {statuses.count('variant')} close variant(s), "
+            f"{statuses.count('outlier')} outlier(s), {statuses.count('missing')} missing"
+        )
+    return lines
@@ -0,0 +1,53 @@
+"""Line- and word-level section diffs"""
+from io import BytesIO
+
+import openpyxl
+
+import syllabus_diff
+from syllabus_core import write_comparison_to_excel
+from syllabus_diff import diff_sections, diff_words, format_diff, myers_diff
+
+
+def test_case_only_word_change_keeps_each_side_spelling():
+    words, matched = diff_words("Topics include ethics and law", "Topics INCLUDE ethics and sport law")
+    assert matched == 5
+    assert ('equal', 'include', 'INCLUDE') in words
+
+    diff = diff_sections("Topics include ethics and law", "Topics INCLUDE ethics and sport law")
+    [line] = diff['lines']
+    assert line['op'] == 'replace'
+    assert format_diff(diff) == ["~ Topics [-include-] {+INCLUDE+} ethics and {+sport+} law"]
+
+    output = BytesIO()
+    write_comparison_to_excel(output, {
+        'original_code': 'SM 1', 'original_title': 'A', 'new_code': 'SM 1', 'new_title': 'B',
+        'sections': {'Course Description': {
+            'original': "Topics include ethics and law", 'new': "Topics INCLUDE ethics and sport law",
+            'changed': True, 'diff': diff
+        }}
+    })
+    output.seek(0)
+    cells = [str(cell) for row in openpyxl.load_workbook(output, rich_text=True).active.iter_rows(values_only=True)
+             for cell in row if cell is not None]
+    assert any(cell == "Topics include ethics and law" for cell in cells)
+    assert any(cell == "Topics INCLUDE ethics and sport law" for cell in cells)
+
+
+def test_columns_follow_their_sources_around_moves():
+    original = "Exam 1 covers chapters one to three\nQuiz on ethics\nFinal project due\nSemester wrap up"
+    new = "Exam 1 covers chapters one to four\nFinal project due\nSemester wrap up\nQuiz on ethics"
+    diff = diff_sections(original, new)
+
+    assert [line['original'] for line in diff['lines'] if line['original'] is not None] == original.split('\n')
+    assert [line['new'] for line in diff['lines'] if line['new'] is not None] == new.split('\n')
+    assert [line['op'] for line in diff['lines']] == ['replace', 'move', 'equal', 'equal', 'move']
+
+
+def test_distant_inputs_fall_back_to_difflib(monkeypatch):
+    monkeypatch.setattr(syllabus_diff, 'MAX_EDIT_DISTANCE', 10)
+    a = [f"a{i}" for i in range(50)] + ['shared']
+    b = [f"b{i}" for i in range(50)] + ['shared']
+    script = myers_diff(a, b)
+    assert [item for op, item in script if op != 'insert'] == a
+    assert [item for op, item in script if op != 'delete'] == b
+    assert ('equal', 'shared') in script
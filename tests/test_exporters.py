@@ -0,0 +1,54 @@
+"""CSV, JSON Lines and Parquet exports must hold the same rows as the Excel export"""
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from exporters import exporter_for, write_csv, write_jsonl, write_parquet
+from syllabus_core import Syllabus, export_columns, metadata_column
+
+BUNDLED = Path(__file__).resolve().parent.parent / "Generic SM 2200 Syllabus.txt"
+SECTIONS = ['Course Description', 'Prerequisites', 'Late Work Policy']
+
+
+def _rows():
+    text = BUNDLED.read_text(encoding='utf-8', errors='ignore')
+    return [
+        Syllabus("first.txt", text).export_row(SECTIONS, metadata=True),
+        Syllabus("second.txt", "SM 1000 - Empty\nNothing to see.\n").export_row(SECTIONS, metadata=True),
+    ]
+
+
+def test_csv_and_jsonl_hold_every_row(tmp_path):
+    rows = _rows()
+    columns = export_columns(rows)
+
+    write_csv(tmp_path / "export.csv", iter(rows), columns)
+    with open(tmp_path / "export.csv", newline='', encoding='utf-8') as f:
+        written = list(csv.DictReader(f))
+    assert list(written[0]) == columns
+    assert [row['Course Description'] for row in written] == [row['Course Description'] for row in rows]
+
+    # Without columns, each object keeps the row's own keys
+    buffer = io.BytesIO()
+    write_jsonl(buffer, iter(rows))
+    assert [json.loads(line) for line in buffer.getvalue().decode('utf-8').splitlines()] == rows
+    assert not buffer.closed
+
+
+def test_exporter_for_picks_by_extension():
+    assert exporter_for("out.CSV") is write_csv
+    assert exporter_for("out.jsonl") is write_jsonl
+    with pytest.raises(ValueError):
+        exporter_for("out.txt")
+
+
+def test_parquet_keeps_metadata_types(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    rows = _rows()
+    write_parquet(tmp_path / "export.parquet", rows)
+    table = pyarrow_parquet.read_table(tmp_path / "export.parquet")
+    assert table.to_pylist() == [{column: row.get(column) for column in table.column_names} for row in rows]
+    assert str(table.schema.field(metadata_column(SECTIONS[0], "Found")).type) == 'bool'
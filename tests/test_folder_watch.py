@@ -0,0 +1,37 @@
+"""Incremental re-extraction of a watched folder"""
+import os
+
+from folder_watch import FolderWatcher
+
+SECTIONS = ['Course Description']
+
+
+def _write(path, number, description):
+    path.write_text(f"SM {number} - Course\nCourse Description\n{description}\n")
+
+
+def test_watcher_parses_only_what_changed(tmp_path):
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    _write(first, 2000, "Second course.")
+    _write(second, 1000, "First course.")
+    watcher = FolderWatcher(lambda: sorted(tmp_path.glob('*.txt')), SECTIONS, workers=1, settle=0)
+
+    assert watcher.update() == ([str(first), str(second)], [])
+    # Rows come sorted by course number
+    assert [row['Course Description'] for row in watcher.rows()] == ["First course.", "Second course."]
+
+    # Touched but identical: nothing to re-extract
+    stat = os.stat(first)
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert watcher.update() == ([], [])
+
+    _write(first, 2000, "Second course, revised.")
+    assert watcher.update() == ([str(first)], [])
+    assert watcher.rows()[1]['Course Description'] == "Second course, revised."
+
+    second.unlink()
+    (tmp_path / "empty.txt").write_text("")
+    changed, removed = watcher.update()
+    assert (changed, removed) == ([str(tmp_path / "empty.txt")], [str(second)])
+    assert [syllabus.name for syllabus in watcher.syllabi()] == ["first.txt"]
+    assert watcher.failures() == [(str(tmp_path / "empty.txt"), "no text extracted")]
@@ -0,0 +1,73 @@
+"""Background jobs on the shared process pool"""
+import os
+import threading
+import time
+
+from job_queue import JobQueue
+
+
+def _wait(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while queue.status(job_id)['status'] in ('queued', 'running'):
+        assert time.time() < deadline
+        time.sleep(0.01)
+    return queue.status(job_id)
+
+
+def test_job_runs_steps_on_the_pool_and_keeps_its_file_until_discarded():
+    queue = JobQueue(workers=2)
+    try:
+        def job_function(queue, job, numbers):
+            job['total'] = len(numbers)
+            path = queue.output_path(job, '.txt')
+            with open(path, 'w') as f:
+                f.write(' '.join(str(square) for square in queue.map(pow, [(number, 2) for number in numbers])))
+            job['done'] = len(numbers)
+            return path
+
+        job_id = queue.submit("Squares", job_function, [1, 2, 3])
+        job = _wait(queue, job_id)
+        assert job['status'] == 'done' and job['done'] == 3
+        with open(job['result']) as f:
+            assert f.read() == "1 4 9"
+
+        queue.discard(job_id)
+        assert queue.status(job_id) is None
+        assert not os.path.exists(job['result'])
+
+        failed = _wait(queue, queue.submit("Fails", lambda queue, job: queue.run(int, "x")))
+        assert failed['status'] == 'failed' and "invalid literal" in failed['error']
+    finally:
+        queue.shutdown()
+
+
+def test_discard_waits_for_a_running_job():
+    queue = JobQueue(workers=1)
+    release = threading.Event()
+    cleaned = []
+    try:
+        def job_function(queue, job):
+            queue.on_discard(job, lambda: cleaned.append(job['id']))
+            path = queue.output_path(job, '.txt')
+            release.wait(10)
+            with open(path, 'w') as f:
+                f.write("late")
+            return path
+
+        job_id = queue.submit("Slow", job_function)
+        while queue.status(job_id)['status'] != 'running':
+            time.sleep(0.01)
+        queue.discard(job_id)
+        # Still running, so it is only marked for discarding
+        assert queue.status(job_id)['status'] == 'running' and not cleaned
+
+        release.set()
+        deadline = time.time() + 10
+        while queue.status(job_id) is not None:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert cleaned == [job_id]
+        assert os.listdir(queue.directory) == []
+    finally:
+        queue.shutdown()
+    assert not os.path.exists(queue.directory)
@@ -0,0 +1,55 @@
+"""A PDF read only as far as some sections must read on from where it stopped"""
+import PyPDF2
+
+from section_index import SectionIndex
+from syllabus_core import LazyPdfDocument, Syllabus, index_patterns, predefined_sections
+from syllabus_corpus import PDF_PAGE_LINES, _pdf_lines, generate_syllabus, write_pdf
+from text_cache import TextCache
+
+
+def _long_pdf(tmp_path):
+    """A generated syllabus spanning several pages"""
+    for seed in range(100):
+        text = generate_syllabus(seed)
+        if len(_pdf_lines(text)) > 5 * PDF_PAGE_LINES:
+            path = tmp_path / "syllabus.pdf"
+            write_pdf(path, text)
+            return path
+    raise AssertionError("no long syllabus generated")
+
+
+def test_index_extend_matches_a_fresh_index():
+    text = "Intro\nCOURSE DESCRIPTION\nabc\nGrading Scale\nxyz\nCourse Schedule\n" * 3
+    for cut in range(len(text)):
+        index = SectionIndex(text[:cut], index_patterns)
+        index.extend(text)
+        assert index.offsets == SectionIndex(text, index_patterns).offsets
+
+
+def test_partial_pdf_reads_only_remaining_pages(tmp_path, monkeypatch):
+    path = _long_pdf(tmp_path)
+    full = Syllabus.from_file(path)
+    cache = TextCache(tmp_path / "cache.sqlite3")
+    partial = Syllabus.from_file(path, cache=cache, sections=['Course Description'])
+    assert not partial.complete
+    pages_read = len(partial.page_offsets)
+
+    extracted = []
+    extract_text = PyPDF2.PageObject.extract_text
+
+    def counted(page, *args, **kwargs):
+        extracted.append(page)
+        return extract_text(page, *args, **kwargs)
+
+    monkeypatch.setattr(PyPDF2.PageObject, 'extract_text', counted)
+
+    assert [partial.section(section) for section in predefined_sections] == [full.section(section) for section in predefined_sections]
+    assert partial.prerequisites() == full.prerequisites()
+    assert partial.complete and partial.text == full.text
+    assert partial.page_offsets == full.page_offsets
+    # Pages already extracted are kept, and the index grew with the rest
+    assert len(extracted) == LazyPdfDocument(str(path)).page_count - pages_read
+    assert partial.index.offsets == full.index.offsets
+
+    # The whole text now comes from the cache
+    assert Syllabus.from_file(path, cache=cache, sections=['Course Description']).complete
@@ -0,0 +1,66 @@
+"""Memory-mapped .txt files must extract exactly what their decoded text does"""
+from pathlib import Path
+
+import pytest
+
+import syllabus_core
+from syllabus_core import load_documents, predefined_sections
+
+BUNDLED = Path(__file__).resolve().parent.parent / "Generic SM 2200 Syllabus.txt"
+
+
+def _rows(path, mapped_bytes, monkeypatch):
+    monkeypatch.setattr(syllabus_core, 'MAPPED_TEXT_BYTES', mapped_bytes)
+    sections = list(predefined_sections)
+    [result] = load_documents([path], sections, workers=1, metadata=True)
+    assert result['error'] is None
+    return result['syllabus'], result['row']
+
+
+@pytest.mark.parametrize('newline', [None, '\n', '\r\n', '\r'])
+def test_mapped_matches_text(tmp_path, monkeypatch, newline):
+    data = BUNDLED.read_bytes()
+    if newline is not None:
+        lines = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n').split(b'\n')
+        data = newline.encode().join(lines)
+    path = tmp_path / "syllabus.txt"
+    path.write_bytes(data)
+
+    text_syllabus, text_row = _rows(path, 1 << 40, monkeypatch)
+    mapped_syllabus, mapped_row = _rows(path, 1, monkeypatch)
+
+    assert text_syllabus.mapped is None
+    # Lone CRs are only split by universal newlines, so those files are read as text
+    assert (mapped_syllabus.mapped is None) == (b'\r' in data.replace(b'\r\n', b''))
+    assert mapped_row == text_row
+
+
+def test_mapped_search_indexing_streams_text(tmp_path, monkeypatch):
+    from search_index import SearchIndex
+
+    path = tmp_path / "syllabus.txt"
+    path.write_bytes(BUNDLED.read_bytes().replace(b'\r\n', b'\n').replace(b'\r', b'\n'))
+    monkeypatch.setattr(syllabus_core, 'MAPPED_CHUNK_CHARS', 1000)
+    text_syllabus, _ = _rows(path, 1 << 40, monkeypatch)
+    mapped_syllabus, _ = _rows(path, 1, monkeypatch)
+
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    try:
+        index.add(str(path), mapped_syllabus)
+        assert index.search("sport", keys=[str(path)])
+    finally:
+        index.close()
+    # Hashed and indexed without decoding the whole file, yet hashed exactly like the text
+    assert mapped_syllabus._text is None
+    assert mapped_syllabus.content_hash == text_syllabus.content_hash
+
+
+def test_mapped_sections_after_text_is_decoded(tmp_path, monkeypatch):
+    path = tmp_path / "syllabus.txt"
+    path.write_bytes(BUNDLED.read_bytes().replace(b'\r', b''))
+    mapped_syllabus, _ = _rows(path, 1, monkeypatch)
+
+    assert mapped_syllabus.text
+    # The map stays usable, so a thread already reading sections from it is unaffected
+    assert mapped_syllabus.mapped is not None
+    assert mapped_syllabus.mapped.section('Course Description') == mapped_syllabus.section('Course Description')
@@ -0,0 +1,42 @@
+"""Search over the shared index must stay within the given documents and drop evicted ones"""
+from search_index import FULL_TEXT, SearchIndex
+from syllabus_core import Syllabus
+from upload_store import UploadStore
+
+
+def _syllabus(name, words):
+    return Syllabus(name, f"Course Description\n{words}\n\nGrading\nPapers and exams.\n")
+
+
+def test_search_filters_keys_before_limit(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    try:
+        # Many better-ranked matches outside keys must not crowd out the one inside them
+        index.add_many((f"other{i}", _syllabus(f"other{i}", "rowing " * 20)) for i in range(30))
+        index.add("wanted", _syllabus("wanted", "rowing and sailing"))
+
+        results = index.search("rowing", keys=["wanted", "unknown"], limit=2)
+        assert [result['key'] for result in results] == ["wanted", "wanted"]
+        assert results[0]['section'] != FULL_TEXT
+        assert "[rowing]" in results[0]['snippet']
+        assert len(index.search("rowing", limit=5)) == 5
+        assert index.indexed(["wanted", "other3", "unknown"]) == {"wanted", "other3"}
+    finally:
+        index.close()
+
+
+def test_evicted_uploads_leave_the_index(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    store = UploadStore(max_bytes=1, on_evict=lambda key, syllabus: index.remove(syllabus.content_hash))
+    try:
+        first, second = _syllabus("a.txt", "rowing"), _syllabus("b.txt", "sailing")
+        for syllabus in (first, second):
+            store.put(syllabus.content_hash, syllabus)
+            index.add(syllabus.content_hash, syllabus)
+
+        # Over budget, so adding the second document evicted the first
+        assert store.stats()['documents'] == 1
+        assert index.indexed([first.content_hash, second.content_hash]) == {second.content_hash}
+        assert index.search("rowing") == []
+    finally:
+        index.close()
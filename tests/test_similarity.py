@@ -0,0 +1,92 @@
+"""Clustering of one section across many syllabi and boilerplate outlier detection"""
+import random
+import time
+
+import openpyxl
+
+import syllabus_core
+from syllabus_core import Syllabus, write_similarity_to_excel
+from syllabus_corpus import generate_syllabus, institution_boilerplate
+from syllabus_similarity import check_boilerplate, compare_many, find_boilerplate_outliers, pair_similarity
+
+
+def _boilerplate_archive(documents, seed=0):
+    """Texts of one section: a fifth verbatim, most lightly edited, a tenth unrelated"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    standard = [rng.choice(vocabulary) for _ in range(150)]
+    texts = []
+    for _ in range(documents):
+        draw = rng.random()
+        if draw < 0.2:
+            words = standard
+        elif draw < 0.9:
+            words = list(standard)
+            for _ in range(rng.randint(1, 3)):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        else:
+            words = [rng.choice(vocabulary) for _ in range(150)]
+        texts.append(" ".join(words))
+    return texts, " ".join(standard)
+
+
+def test_boilerplate_flags_variants_and_outliers():
+    texts, standard = _boilerplate_archive(200)
+    texts.append(None)
+    report = find_boilerplate_outliers(texts)
+
+    assert report['canonical_text'] == standard
+    statuses = [document['status'] for document in report['documents']]
+    assert statuses[-1] == 'missing'
+    for text, status in zip(texts, statuses):
+        if text == standard:
+            assert status == 'canonical'
+    assert statuses.count('variant') > statuses.count('outlier') > 0
+
+
+def test_boilerplate_5000_documents_is_fast():
+    # check_boilerplate runs two sections; 5,000 syllabi should take well under a minute
+    texts, standard = _boilerplate_archive(5000)
+    start = time.perf_counter()
+    report = find_boilerplate_outliers(texts)
+    assert time.perf_counter() - start < 20
+    assert report['canonical_text'] == standard
+
+
+def test_generated_corpus_shares_institution_boilerplate():
+    syllabi = [Syllabus(f"{seed}.txt", generate_syllabus(seed)) for seed in range(200)]
+    reports = check_boilerplate(syllabi)
+
+    for section, report in reports.items():
+        assert report['canonical_text'] == institution_boilerplate[section]
+        statuses = [document['status'] for document in report['documents']]
+        assert statuses.count('canonical') > len(syllabi) / 3
+        assert statuses.count('variant') > 0
+
+
+def test_compare_many_is_sparse(tmp_path, monkeypatch):
+    shared = "students will examine the role of sport in society and its organizations"
+    texts = [shared, shared.upper(), shared + " through readings", "unrelated words about tennis courts", None]
+    result = compare_many(texts)
+
+    assert result['variant_of'] == [0, 0, 1, 2, None]
+    # Only distinct texts sharing a shingle are scored
+    assert set(result['similarity']) == {(0, 1)}
+    assert result['clusters'] == [[0, 1, 2], [3]]
+    assert result['missing'] == [4]
+    assert pair_similarity(result, 0, 1) == 1.0
+    assert 0.8 <= pair_similarity(result, 1, 2) < 1.0
+    assert pair_similarity(result, 0, 3) == 0.0
+    assert pair_similarity(result, 3, 4) is None
+
+    names = [f"{doc}.txt" for doc in range(len(texts))]
+    path = tmp_path / "matrix.xlsx"
+    write_similarity_to_excel(path, names, {'Course Description': result})
+    rows = list(openpyxl.load_workbook(path)['Course Description'].values)
+    assert rows[1][1:] == (1.0, 1.0, round(pair_similarity(result, 0, 2), 3), 0.0, None)
+
+    # Beyond the matrix limit the sheet lists scored pairs instead
+    monkeypatch.setattr(syllabus_core, 'SIMILARITY_MATRIX_MAX_FILES', 2)
+    write_similarity_to_excel(path, names, {'Course Description': result})
+    rows = list(openpyxl.load_workbook(path)['Course Description'].values)
+    assert rows[1:] == [("0.txt", "2.txt", round(pair_similarity(result, 0, 2), 3))]
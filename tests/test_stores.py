@@ -0,0 +1,48 @@
+"""Extraction store and text cache shared by threads of one process"""
+from concurrent.futures import ThreadPoolExecutor
+
+from extraction_store import ExtractionStore
+from syllabus_core import EXTRACTOR_VERSION, Syllabus
+from text_cache import TextCache
+
+SECTIONS = ['Course Description', 'Grading Policy']
+
+
+def _syllabus(path, number):
+    path.write_text(f"SM {number} - Course\nCourse Description\nAbout {number}.\n\nGrading Policy\nExams.\n")
+    return Syllabus(str(path), path.read_text())
+
+
+def test_store_reads_are_safe_alongside_writes(tmp_path):
+    store = ExtractionStore(tmp_path / "store.sqlite3")
+    cache = TextCache(tmp_path / "cache.sqlite3")
+    syllabi = [_syllabus(tmp_path / f"{number}.txt", number) for number in range(1000, 1040)]
+
+    def write(syllabus):
+        store.save(syllabus, SECTIONS, EXTRACTOR_VERSION)
+        store.record_source(syllabus.source, syllabus)
+        cache.put(syllabus.content_hash, syllabus.text)
+
+    def read(_):
+        store.export_rows(SECTIONS, EXTRACTOR_VERSION)
+        store.find(EXTRACTOR_VERSION, contains='about')
+        store.stats()
+        cache.stats()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, syllabi))
+        list(pool.map(read, range(40)))
+
+    assert store.stats() == {'documents': 40, 'sources': 40}
+    assert cache.stats()['entries'] == 40
+    rows = store.export_rows(SECTIONS, EXTRACTOR_VERSION, course_code='SM 100%')
+    assert [row['Course Code'] for row in rows] == [f"SM {number}" for number in range(1000, 1010)]
+    assert rows[0]['Course Description'] == "About 1000."
+
+    # Files gone from disk are left out and forgotten
+    (tmp_path / "1000.txt").unlink()
+    assert len(store.find(EXTRACTOR_VERSION, section='Grading Policy')) == 39
+    assert store.stats()['sources'] == 39
+
+    store.clear()
+    assert store.stats() == {'documents': 0, 'sources': 0}
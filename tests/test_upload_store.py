@@ -0,0 +1,52 @@
+"""Parsed uploads shared across sessions within a memory budget"""
+from extraction_store import ExtractionStore
+from syllabus_core import EXTRACTOR_VERSION, Syllabus
+from text_cache import TextCache
+from upload_store import UploadStore, document_size, upload_key
+
+
+def _upload(number):
+    data = f"SM {number} - Course\nCourse Description\nAbout {number}.\n".encode()
+    return upload_key(data), Syllabus(f"{number}.txt", data.decode())
+
+
+def test_store_keeps_one_copy_per_upload_and_evicts_least_recent():
+    key, syllabus = _upload(1000)
+    budget = document_size(syllabus) * 2
+    store = UploadStore(max_bytes=budget)
+
+    assert store.put(key, syllabus) is syllabus
+    # Another session uploading the same bytes gets the copy already held
+    assert store.put(key, _upload(1000)[1]) is syllabus
+
+    second_key, second = _upload(2000)
+    store.put(second_key, second)
+    assert store.get(key, "1000.txt") is syllabus
+    third_key, third = _upload(3000)
+    store.put(third_key, third)
+
+    # The second was least recently used, and there is no text cache to rebuild it from
+    assert store.get(second_key, "2000.txt") is None
+    assert store.stats()['documents'] == 2
+    assert store.stats()['bytes'] <= budget
+
+
+def test_evicted_upload_is_rebuilt_from_the_caches(tmp_path):
+    cache = TextCache(tmp_path / "cache.sqlite3")
+    extraction_store = ExtractionStore(tmp_path / "store.sqlite3")
+    key, syllabus = _upload(1000)
+    cache.put(key, syllabus.text)
+    extraction_store.save(syllabus, ['Course Description'], EXTRACTOR_VERSION)
+
+    evicted = []
+    store = UploadStore(max_bytes=1, cache_path=tmp_path / "cache.sqlite3", store_path=tmp_path / "store.sqlite3",
+                        on_evict=lambda key, syllabus: evicted.append(key))
+    store.put(key, syllabus)
+    store.put(*_upload(2000))
+    assert evicted == [key]
+
+    rebuilt = store.get(key, "renamed.txt")
+    assert rebuilt is not syllabus and rebuilt.name == "renamed.txt"
+    assert rebuilt.text == syllabus.text
+    # Sections come back from the extraction store without being extracted again
+    assert rebuilt._sections['Course Description'] == "About 1000."
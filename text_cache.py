@@ -0,0 +1,119 @@
+"""Persistent cache of extracted document text keyed by file content"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# Override the cache location with SYLLABI_CACHE_DIR
+DEFAULT_CACHE_DIR = Path(os.environ.get('SYLLABI_CACHE_DIR', Path.home() / '.cache' / 'syllabi_extractor'))
+DEFAULT_CACHE_PATH = DEFAULT_CACHE_DIR / 'text_cache.sqlite3'
+
+# Compressed bytes kept before least-recently-used entries are evicted
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_key(data, parser_version):
+    """Key a document by the SHA-256 of its bytes plus the parser version that read it"""
+    return f"{hashlib.sha256(data).hexdigest()}:{parser_version}"
+
+
+class TextCache:
+    """SQLite store of zlib-compressed document text with size-bounded LRU eviction
+
+    Cache failures never break extraction: lookups that hit a database error
+    behave as misses and failed writes are dropped.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The connection is shared by every thread of the process (e.g. the web app's sessions)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "key TEXT PRIMARY KEY, text BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, pages TEXT)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(documents)")]
+        if 'pages' not in columns:
+            self.conn.execute("ALTER TABLE documents ADD COLUMN pages TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS documents_last_used ON documents (last_used)")
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached (text, page offsets or None) for key and mark it recently used, or None"""
+        try:
+            with self.lock:
+                row = self.conn.execute("SELECT text, pages FROM documents WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self.conn.execute("UPDATE documents SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+            page_offsets = [int(offset) for offset in row[1].split(',')] if row[1] else None
+            return zlib.decompress(row[0]).decode('utf-8'), page_offsets
+        except (sqlite3.Error, zlib.error):
+            return None
+
+    def put(self, key, text, page_offsets=None):
+        """Store text (and PDF page offsets) under key, evicting the least recently used entries if over budget"""
+        blob = zlib.compress(text.encode('utf-8'))
+        pages = ','.join(str(offset) for offset in page_offsets) if page_offsets else None
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO documents (key, text, size, last_used, pages) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), time.time(), pages)
+                )
+                self.evict()
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self.conn.execute("SELECT key, size FROM documents ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM documents WHERE key = ?", stale)
+
+    def clear(self):
+        """Remove every cached document"""
+        with self.lock:
+            self.conn.execute("DELETE FROM documents")
+            self.conn.commit()
+            self.conn.execute("VACUUM")
+
+    def stats(self):
+        """Return the number of cached documents and their compressed size in bytes"""
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM documents").fetchone()
+        return {'entries': entries, 'bytes': size}
+
+    def close(self):
+        self.conn.close()
+
+
+_open_caches = {}
+
+
+def open_cache(path):
+    """Return this process's TextCache for path, or None if it cannot be opened"""
+    path = str(path)
+    if path not in _open_caches:
+        try:
+            _open_caches[path] = TextCache(path)
+        except (OSError, sqlite3.Error):
+            _open_caches[path] = None
+    return _open_caches[path]
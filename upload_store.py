@@ -0,0 +1,112 @@
+"""Parsed uploads shared by every session of the web app, within a memory budget
+
+Each upload is keyed by the SHA-256 of its bytes (the same key as the text
+cache), so a file uploaded by several reviewers, or uploaded again, is parsed
+once and held once. Sessions keep only these keys. Least recently used
+documents are dropped once the store exceeds its budget; asking for one again
+rebuilds it from the persistent text cache (and its sections from the
+extraction store) instead of parsing the upload again.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from extraction_store import open_store
+from syllabus_core import EXTRACTOR_VERSION, PARSER_VERSION, Syllabus
+from text_cache import content_key, open_cache
+
+# Approximate bytes of parsed documents kept in memory; override with SYLLABI_UPLOAD_STORE_MB
+DEFAULT_MAX_BYTES = int(os.environ.get('SYLLABI_UPLOAD_STORE_MB', 512)) * 1024 * 1024
+
+
+def upload_key(data):
+    """Key of an upload's bytes in the store and in the text cache"""
+    return content_key(data, PARSER_VERSION)
+
+
+def document_size(syllabus):
+    """Approximate bytes held by a parsed Syllabus: its text, the heading index's offset lists and extracted sections
+
+    Reads the text only if it is already decoded, so sizing never decodes a mapped document.
+    """
+    size = sys.getsizeof(syllabus._text) if syllabus._text is not None else 0
+    if syllabus.index is not None:
+        size += sys.getsizeof(syllabus.index.offsets)
+        for positions in syllabus.index.offsets.values():
+            size += sys.getsizeof(positions) + sum(sys.getsizeof(position) for position in positions)
+    for section in syllabus._sections.values():
+        if section:
+            size += sys.getsizeof(section)
+    return size
+
+
+class UploadStore:
+    """Thread-safe, size-bounded LRU map of upload key -> parsed Syllabus"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache_path=None, store_path=None, on_evict=None):
+        """on_evict, if given, is called as on_evict(key, syllabus) for each document dropped from memory"""
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.cache_path = cache_path
+        self.store_path = store_path
+        self.lock = threading.Lock()
+        self.documents = OrderedDict()  # key -> (Syllabus, size when added)
+        self.total = 0
+
+    def get(self, key, name):
+        """The Syllabus for key, rebuilt from the text cache if it was evicted; None if it is gone from both
+
+        name is the upload's file name, used when the document is rebuilt.
+        """
+        with self.lock:
+            entry = self.documents.get(key)
+            if entry is not None:
+                self.documents.move_to_end(key)
+                return entry[0]
+
+        cache = open_cache(self.cache_path) if self.cache_path else None
+        cached = cache.get(key) if cache is not None else None
+        if cached is None:
+            return None
+        syllabus = Syllabus(name, cached[0], cached[1])
+        store = open_store(self.store_path) if self.store_path else None
+        if store is not None:
+            store.hydrate(syllabus, EXTRACTOR_VERSION)
+        return self.put(key, syllabus)
+
+    def put(self, key, syllabus):
+        """Add a parsed upload, returning the Syllabus already stored under key if another session got there first"""
+        # Sized once, outside the lock, as it is added; a lookup only reorders the entries
+        size = document_size(syllabus)
+        with self.lock:
+            entry = self.documents.get(key)
+            if entry is not None:
+                self.documents.move_to_end(key)
+                return entry[0]
+            self.documents[key] = (syllabus, size)
+            self.total += size
+            evicted = self._evict()
+        self._evicted(evicted)
+        return syllabus
+
+    def _evict(self):
+        """Drop least recently used documents until within budget (the most recent one always stays)
+
+        Returns the dropped (key, Syllabus) pairs for _evicted, which callers run once the lock is released.
+        """
+        evicted = []
+        while self.total > self.max_bytes and len(self.documents) > 1:
+            key, (syllabus, size) = self.documents.popitem(last=False)
+            self.total -= size
+            evicted.append((key, syllabus))
+        return evicted
+
+    def _evicted(self, evicted):
+        if self.on_evict is not None:
+            for key, syllabus in evicted:
+                self.on_evict(key, syllabus)
+
+    def stats(self):
+        """Return the number of documents held and their approximate size in bytes"""
+        with self.lock:
+            return {'documents': len(self.documents), 'bytes': self.total}
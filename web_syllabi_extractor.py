@@ -1,437 +1,282 @@
+import json
 import streamlit as st
-from pathlib import Path
-from io import BytesIO
-import PyPDF2
-from docx import Document
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from datetime import datetime
-import re
+from syllabus_core import (
+    Syllabus, predefined_sections, load_documents, preview_pages, preview_window_end, build_comparison,
+    write_comparison_to_excel, write_comparisons_to_excel, write_similarity_to_excel,
+    write_boilerplate_to_excel
+)
+from syllabus_diff import format_diff
+from syllabus_similarity import (
+    compare_syllabi, cluster_summary, check_boilerplate, boilerplate_summary
+)
+from exporters import EXPORTERS, EXPORT_MIME_TYPES, export_formats
+from extraction_store import DEFAULT_STORE_PATH
+from job_queue import JobQueue
+from profiling import Profiler, activate, active, slowest_files, stage
+from search_index import open_search_index
+from text_cache import DEFAULT_CACHE_PATH
+from upload_store import UploadStore, upload_key
 
 # Page configuration
 st.set_page_config(page_title="Syllabus Text Extractor", layout="wide")
 st.title("Syllabus Text Extractor")
 
-# Initialize session state
+# Initialize session state; loaded_files maps each file name to its key in the
+# shared upload store and its text's content hash, never to the document itself
 if 'loaded_files' not in st.session_state:
     st.session_state.loaded_files = {}
+if 'upload_generation' not in st.session_state:
+    st.session_state.upload_generation = 0
+if 'load_errors' not in st.session_state:
+    st.session_state.load_errors = []
+# Background jobs this session submitted: {'id', 'kind'} with kind 'upload' or 'file'
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = []
 if 'current_file' not in st.session_state:
     st.session_state.current_file = None
 if 'selected_text' not in st.session_state:
     st.session_state.selected_text = ""
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = Profiler()
 
-# Define predefined sections
-predefined_sections = {
-    'Course Information': [],
-    'Instructor Information': [],
-    'Course Description': [],
-    'Prerequisites': [],
-    'Credit Hours': [],
-    'Learning Outcomes': [],
-    'Course Materials': [],
-    'Required Text': [],
-    'Course Requirements': [],
-    'Grading Policy': [],
-    'Grading Scale': [],
-    'Attendance Policy': [],
-    'Late Work Policy': [],
-    'Academic Integrity': [],
-    'Disability Services': [],
-    'Course Schedule': [],
-}
-
-# Map section names to alternative keywords for searching
-section_aliases = {
-    'Learning Outcomes': ['learning outcomes', 'learning objectives', 'course objectives'],
-    'Prerequisites': ['prerequisites', 'pre-requisites', 'pre requisites'],
-    'Course Information': ['course information'],
-    'Instructor Information': ['instructor information', 'instructor'],
-    'Course Description': ['course description'],
-    'Credit Hours': ['credit hours'],
-    'Course Materials': ['course materials'],
-    'Required Text': ['required text', 'required texts', 'textbook', 'textbooks'],
-    'Course Requirements': ['course requirements'],
-    'Grading Policy': ['grading policy'],
-    'Grading Scale': ['grading scale'],
-    'Attendance Policy': ['attendance policy', 'absences'],
-    'Late Work Policy': ['late work policy', 'late submission'],
-    'Academic Integrity': ['academic integrity', 'plagiarism', 'honor code'],
-    'Disability Services': ['disability services', 'accommodations', 'ada'],
-    'Course Schedule': ['course schedule', 'course calendar'],
-}
-
-def read_file(file_path, file_bytes):
-    """Read file content based on extension"""
-    file_name = file_path.name
-    
-    try:
-        if file_name.endswith('.txt'):
-            return file_bytes.getvalue().decode('utf-8', errors='ignore')
-        
-        elif file_name.endswith('.pdf'):
-            text = ""
-            file_bytes.seek(0)
-            pdf_reader = PyPDF2.PdfReader(file_bytes)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
-        
-        elif file_name.endswith('.docx'):
-            file_bytes.seek(0)
-            doc = Document(file_bytes)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text
-    except Exception as e:
-        st.error(f"Error reading {file_name}: {str(e)}")
-        return None
-    
-    return None
+# Record this run's stages while "Record stage timings" is checked; activation
+# is per thread, so other sessions' runs are not recorded here
+activate(st.session_state.profiler if st.session_state.get('record_timings') else None)
 
-def extract_course_info(content):
-    """Extract course code and title from the document"""
-    lines = content.split('\n')
-    
-    course_code = None
-    course_title = None
-    
-    for line in lines[:20]:
-        line = line.strip()
-        if not line:
-            continue
-        
-        match = re.search(r'^([A-Z]{1,4})\s+(\d{3,4})[:\-\s]+(.+?)$', line)
-        if match:
-            course_code = f"{match.group(1)} {match.group(2)}"
-            course_title = match.group(3).strip()
-            break
-    
-    return course_code, course_title
-
-def extract_prerequisites(content):
-    """Search for prerequisites in the entire document"""
-    # Patterns to search for prerequisite information
-    # These patterns capture the prerequisite text after the keyword
-    prereq_patterns = [
-        r'(?:prerequisite|pre-requisite|pre requisite|prerequisite\(s\))[:\s]+([^\n]+)',
-        r'(?:student must have)[:\s]+([^\n]+)',
-    ]
-    
-    prerequisites = []
-    for pattern in prereq_patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        for match in matches:
-            prereq_text = match.strip()
-            if prereq_text and prereq_text not in prerequisites:
-                prerequisites.append(prereq_text)
-    
-    return '\n'.join(prerequisites) if prerequisites else None
+# Parsed documents are shared across reruns and sessions, keyed by the upload's
+# content hash, so an identical upload is parsed and held once and each of its
+# sections extracted at most once; least recently used documents are dropped
+# beyond the store's memory budget (along with their search index rows) and
+# rebuilt from the text cache when needed
+@st.cache_resource(show_spinner=False)
+def shared_upload_store():
+    return UploadStore(cache_path=DEFAULT_CACHE_PATH, store_path=DEFAULT_STORE_PATH, on_evict=unindex)
 
-def extract_section(content, section_name):
-    """Extract a predefined section from the content"""
-    content_lower = content.lower()
-    section_lower = section_name.lower()
-    
-    # Try to find the section using its aliases
-    start_idx = -1
-    aliases = section_aliases.get(section_name, [section_lower])
-    for alias in aliases:
-        start_idx = content_lower.find(alias.lower())
-        if start_idx != -1:
-            break
-    
-    if start_idx == -1:
-        return None
-    
-    heading_end = content.find('\n', start_idx)
-    if heading_end == -1:
-        heading_end = len(content)
-    
-    content_start = heading_end + 1
-    
-    while content_start < len(content):
-        while content_start < len(content) and content[content_start] in '\n\r\t ':
-            content_start += 1
-        
-        if content_start >= len(content):
-            return None
-        
-        line_end = content.find('\n', content_start)
-        if line_end == -1:
-            line_end = len(content)
-        
-        line_text = content[content_start:line_end].strip()
-        
-        if ':' in line_text:
-            parts = line_text.split(':', 1)
-            if len(parts[0].strip()) < 25:
-                metadata_keywords = ['prerequisites', 'credit hours', 'semester', 'meeting time', 'modality', 'location']
-                if any(keyword in parts[0].lower() for keyword in metadata_keywords):
-                    content_start = line_end + 1
-                    continue
-        
-        break
-    
-    next_section_idx = len(content)
-    
-    section_markers = [
-        'Instructor Information',
-        'Course Description',
-        'Prerequisites',
-        'Credit Hours',
-        'Learning Outcomes',
-        'Course Materials',
-        'Required Text',
-        'Course Requirements',
-        'Grading Policy',
-        'Grading Scale',
-        'Attendance Policy',
-        'Late Work Policy',
-        'Academic Integrity',
-        'Disability Services',
-        'Course Schedule',
-        'Evaluation and Grading',
-        'Course Policies',
-        'Institutional Policies',
-    ]
-    
-    for marker in section_markers:
-        if marker.lower() != section_lower:
-            idx = content_lower.find(marker.lower(), content_start)
-            if idx != -1 and idx < next_section_idx:
-                next_section_idx = idx
-    
-    extracted = content[content_start:next_section_idx].strip()
-    
-    lines = extracted.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if stripped:
-            cleaned_lines.append(stripped)
-    
-    result = '\n'.join(cleaned_lines)
-    
-    # Format Learning Outcomes with numbering
-    if section_name.lower() == 'learning outcomes' or any(alias in section_name.lower() for alias in ['learning objectives', 'course objectives']):
-        if result and result != "[Not Found]":
-            outcome_lines = result.split('\n')
-            formatted_outcomes = []
-            for idx, outcome in enumerate(outcome_lines, 1):
-                # Only add numbering if the line doesn't already have a number/bullet
-                if outcome and not outcome[0].isdigit() and outcome[0] not in ['•', '-', '*']:
-                    formatted_outcomes.append(f"{idx}. {outcome}")
-                else:
-                    formatted_outcomes.append(outcome)
-            result = '\n'.join(formatted_outcomes)
-    
-    return result if result else None
 
-def write_to_excel(data):
-    """Write extracted data to Excel file"""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Syllabus Extraction"
-    
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    wrap_alignment = Alignment(wrap_text=True, vertical="top")
-    
-    if not data:
-        return wb
-    
-    all_columns = set()
-    all_columns.add('Source File')
-    all_columns.add('Course Code')
-    all_columns.add('Course Title')
-    
-    for row_data in data:
-        all_columns.update(row_data.keys())
-    
-    all_columns = ['Source File', 'Course Code', 'Course Title'] + sorted([col for col in all_columns if col not in ['Source File', 'Course Code', 'Course Title']])
-    
-    ws.merge_cells(f'A1:{chr(64 + len(all_columns))}1')
-    title_cell = ws['A1']
-    title_cell.value = f"Course Syllabus Data Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    title_cell.font = Font(bold=True, size=12, color="FFFFFF")
-    title_cell.fill = PatternFill(start_color="203864", end_color="203864", fill_type="solid")
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    ws.row_dimensions[1].height = 25
-    
-    for col, header in enumerate(all_columns, 1):
-        cell = ws.cell(row=3, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = wrap_alignment
-    
-    ws.row_dimensions[3].height = 35
+def unindex(key, syllabus):
+    """Drop an evicted document's rows from the search index; searching re-indexes it if a session still has it"""
+    search_index = shared_search_index()
+    if search_index is not None:
+        search_index.remove(syllabus.content_hash)
+
+
+def loaded_syllabus(file_name):
+    """The parsed Syllabus of one of this session's files, or None (dropping the file) if the server no longer has it"""
+    syllabus = shared_upload_store().get(st.session_state.loaded_files[file_name]['key'], file_name)
+    if syllabus is None:
+        del st.session_state.loaded_files[file_name]
+        st.warning(f"{file_name} is no longer held on the server; please upload it again.")
+    return syllabus
+
+
+# Parsing, extraction and workbook generation run as background jobs on one
+# process pool shared by every session, so they scale with cores rather than
+# with open tabs and a long job never blocks its session's reruns
+@st.cache_resource(show_spinner=False)
+def shared_job_queue():
+    return JobQueue()
+
+
+# Seconds between refreshes of the job progress while this session has jobs in progress
+JOB_POLL_SECONDS = 1.0
+
+
+def session_jobs(kind):
+    """(entry, status) of this session's jobs of one kind, forgetting any the queue has expired"""
+    queue = shared_job_queue()
+    jobs = []
+    for entry in list(st.session_state.jobs):
+        status = queue.status(entry['id'])
+        if status is None:
+            st.session_state.jobs.remove(entry)
+        elif entry['kind'] == kind:
+            jobs.append((entry, status))
+    return jobs
+
+
+def dismiss_job(entry, cleanup=True):
+    shared_job_queue().discard(entry['id'], cleanup)
+    st.session_state.jobs.remove(entry)
+
+
+def jobs_pending(jobs):
+    return any(job['status'] in ('queued', 'running') for _, job in jobs)
+
+
+def polled(render, kind):
+    """Call render(jobs) for this session's jobs of one kind, refreshing it alone while any is in progress
+
+    Only the fragment reruns each JOB_POLL_SECONDS, not the whole page; once
+    the last job finishes the page reruns once, so it picks up the results.
+    """
+    if not jobs_pending(session_jobs(kind)):
+        render(session_jobs(kind))
+        return
+    
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def poll():
+        jobs = session_jobs(kind)
+        render(jobs)
+        if not jobs_pending(jobs):
+            st.rerun()
     
-    for row_idx, row_data in enumerate(data, 4):
-        for col_idx, column_name in enumerate(all_columns, 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            cell.value = row_data.get(column_name, "")
-            cell.border = border
-            cell.alignment = wrap_alignment
+    poll()
+
+
+def parse_uploads_job(queue, job, uploads, upload_store, search_index):
+    """Parse (file name, key, bytes) uploads on the pool into the upload store; returns the loaded_files entries"""
+    job['total'] = len(uploads)
+    keys = {file_name: key for file_name, key, _ in uploads}
+    loaded = {}
+    syllabi = []
+    for result in load_documents(
+        [(file_name, data) for file_name, _, data in uploads],
+        cache_path=DEFAULT_CACHE_PATH, store_path=DEFAULT_STORE_PATH, executor=queue.pool
+    ):
+        job['done'] += 1
+        if result['error']:
+            job['warnings'].append(f"Error reading {result['path']}: {result['error']}")
+        elif result['syllabus']:
+            syllabus = upload_store.put(keys[result['path']], result['syllabus'])
+            loaded[result['path']] = {'key': keys[result['path']], 'content_hash': syllabus.content_hash}
+            syllabi.append(syllabus)
+    
+    # Texts already indexed by any session are skipped
+    if syllabi and search_index is not None:
+        with stage('search index'):
+            search_index.add_many((syllabus.content_hash, syllabus) for syllabus in syllabi)
+        # Unless a session takes the files, their rows go when the job is discarded or expires
+        content_hashes = [syllabus.content_hash for syllabus in syllabi]
         
-        ws.row_dimensions[row_idx].height = 150
-    
-    for col_idx, column_name in enumerate(all_columns, 1):
-        col_letter = openpyxl.utils.get_column_letter(col_idx)
+        def unindex_unclaimed():
+            for content_hash in content_hashes:
+                search_index.remove(content_hash)
         
-        if column_name in ['Source File', 'Course Code']:
-            width = 20
-        elif column_name == 'Course Title':
-            width = 35
+        queue.on_discard(job, unindex_unclaimed)
+    return loaded
+
+
+def held_documents(job, documents, upload_store):
+    """(file name, Syllabus) of each (file name, key) the upload store still has, warning about the rest"""
+    syllabi = []
+    for file_name, key in documents:
+        syllabus = upload_store.get(key, file_name)
+        if syllabus is None:
+            job['warnings'].append(f"{file_name} is no longer held on the server and was left out; please upload it again.")
         else:
-            width = 50
-        
-        ws.column_dimensions[col_letter].width = width
-    
-    ws.freeze_panes = 'A4'
-    
-    return wb
+            syllabi.append((file_name, syllabus))
+    return syllabi
 
-def write_comparison_to_excel(comparison_data):
-    """Write comparison data to Excel file"""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Comparison"
-    
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    subheader_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-    subheader_font = Font(bold=True, size=10)
-    original_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-    new_fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
-    changed_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
+
+def export_job(queue, job, documents, sections, selected_text, current_file, metadata, export_format, upload_store):
+    """Build export rows from the stored documents and write the file, both on the pool"""
+    job['total'] = len(documents)
+    syllabi = held_documents(job, documents, upload_store)
+    
+    # Sections are extracted across the pool rather than in this coordinator thread
+    export_data = []
+    rows = queue.map(
+        Syllabus.export_row,
+        [
+            (syllabus, sections, selected_text if file_name == current_file else None, metadata)
+            for file_name, syllabus in syllabi
+        ],
+        chunksize=max(1, min(8, len(syllabi) // (queue.workers * 4)))
     )
-    wrap_alignment = Alignment(wrap_text=True, vertical="top")
-    
-    current_row = 1
-    
-    ws.merge_cells(f'A{current_row}:D{current_row}')
-    title_cell = ws[f'A{current_row}']
-    title_cell.value = f"Syllabus Comparison - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    title_cell.font = Font(bold=True, size=12, color="FFFFFF")
-    title_cell.fill = PatternFill(start_color="203864", end_color="203864", fill_type="solid")
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    ws.row_dimensions[current_row].height = 25
-    current_row += 1
-    
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    cell = ws[f'A{current_row}']
-    cell.value = "ORIGINAL SYLLABUS"
-    cell.font = subheader_font
-    cell.fill = subheader_fill
-    cell.border = border
-    
-    ws.merge_cells(f'C{current_row}:D{current_row}')
-    cell = ws[f'C{current_row}']
-    cell.value = "NEW SYLLABUS"
-    cell.font = subheader_font
-    cell.fill = subheader_fill
-    cell.border = border
-    current_row += 1
-    
-    cell = ws[f'A{current_row}']
-    cell.value = f"{comparison_data['original_code']} - {comparison_data['original_title']}"
-    cell.font = Font(bold=True, size=10)
-    cell.fill = original_fill
-    cell.border = border
-    cell.alignment = wrap_alignment
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    
-    cell = ws[f'C{current_row}']
-    cell.value = f"{comparison_data['new_code']} - {comparison_data['new_title']}"
-    cell.font = Font(bold=True, size=10)
-    cell.fill = new_fill
-    cell.border = border
-    cell.alignment = wrap_alignment
-    ws.merge_cells(f'C{current_row}:D{current_row}')
-    current_row += 2
-    
-    for section_name, section_data in comparison_data['sections'].items():
-        header_fill_color = changed_fill if section_data['changed'] else header_fill
-        ws.merge_cells(f'A{current_row}:D{current_row}')
-        cell = ws[f'A{current_row}']
-        cell.value = f"SECTION: {section_name}" + (" [CHANGED]" if section_data['changed'] else " [NO CHANGES]")
-        cell.font = Font(bold=True, size=10, color="FFFFFF" if not section_data['changed'] else "000000")
-        cell.fill = header_fill_color
-        cell.border = border
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-        ws.row_dimensions[current_row].height = 20
-        current_row += 1
-        
-        cell = ws[f'A{current_row}']
-        cell.value = "ORIGINAL"
-        cell.font = Font(bold=True, size=9)
-        cell.fill = original_fill
-        cell.border = border
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        
-        cell = ws[f'C{current_row}']
-        cell.value = "NEW"
-        cell.font = Font(bold=True, size=9)
-        cell.fill = new_fill
-        cell.border = border
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.merge_cells(f'C{current_row}:D{current_row}')
-        current_row += 1
-        
-        original_text = section_data['original']
-        new_text = section_data['new']
-        
-        original_lines = original_text.split('\n') if original_text else ['[NOT FOUND]']
-        new_lines = new_text.split('\n') if new_text else ['[NOT FOUND]']
-        
-        max_lines = max(len(original_lines), len(new_lines))
-        
-        for i in range(max_lines):
-            orig_line = original_lines[i] if i < len(original_lines) else ''
-            new_line = new_lines[i] if i < len(new_lines) else ''
-            
-            cell_orig = ws[f'A{current_row}']
-            cell_orig.value = orig_line
-            cell_orig.fill = original_fill
-            cell_orig.border = border
-            cell_orig.alignment = wrap_alignment
-            cell_orig.font = Font(size=9)
-            
-            ws.merge_cells(f'A{current_row}:B{current_row}')
-            
-            cell_new = ws[f'C{current_row}']
-            cell_new.value = new_line
-            cell_new.fill = new_fill
-            cell_new.border = border
-            cell_new.alignment = wrap_alignment
-            cell_new.font = Font(size=9)
-            
-            ws.merge_cells(f'C{current_row}:D{current_row}')
-            
-            ws.row_dimensions[current_row].height = 30
-            current_row += 1
-        
-        current_row += 1
-    
-    ws.column_dimensions['A'].width = 40
-    ws.column_dimensions['B'].width = 40
-    ws.column_dimensions['C'].width = 40
-    ws.column_dimensions['D'].width = 40
+    for (file_name, _), row_data in zip(syllabi, rows):
+        # Uploads are listed under their upload name
+        row_data['Source File'] = file_name
+        export_data.append(row_data)
+        job['done'] += 1
+    
+    path = queue.output_path(job, export_format)
+    queue.run(EXPORTERS[export_format], path, export_data)
+    return {
+        'path': path,
+        'file_name': f"syllabus_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{export_format}",
+        'mime': EXPORT_MIME_TYPES[export_format]
+    }
+
+
+def comparisons_job(queue, job, original_file, documents, sections, upload_store):
+    """Compare the original against every other document across the pool and write one workbook"""
+    syllabi = dict(held_documents(job, documents, upload_store))
+    original = syllabi.pop(original_file, None)
+    if original is None:
+        raise ValueError(f"{original_file} is no longer held on the server; please upload it again.")
+    job['total'] = len(syllabi)
+    
+    # Each worker diffs a chunk of documents against its own copy of the original
+    comparisons = []
+    results = queue.map(
+        build_comparison, [(original, syllabus, sections) for syllabus in syllabi.values()],
+        chunksize=max(1, min(8, len(syllabi) // (queue.workers * 4)))
+    )
+    for file_name, comparison in zip(syllabi, results):
+        comparisons.append((file_name, comparison))
+        job['done'] += 1
     
-    return wb
+    path = queue.output_path(job, '.xlsx')
+    queue.run(write_comparisons_to_excel, path, comparisons)
+    return workbook_result(path, 'comparisons')
+
+
+def comparison_job(queue, job, documents, sections, upload_store):
+    """Diff the original and new documents' sections on the pool and write the comparison workbook"""
+    syllabi = held_documents(job, documents, upload_store)
+    if len(syllabi) < 2:
+        raise ValueError("Both syllabi must still be held on the server; please upload them again.")
+    job['total'] = 1
+    (_, original), (_, new) = syllabi
+    comparison_data = queue.run(build_comparison, original, new, sections)
+    
+    path = queue.output_path(job, '.xlsx')
+    queue.run(write_comparison_to_excel, path, comparison_data)
+    job['done'] = 1
+    return workbook_result(path, 'comparison')
+
+
+def similarity_job(queue, job, documents, sections, upload_store):
+    """Similarity matrix and clusters of every stored document per section, computed and written on the pool"""
+    syllabi = held_documents(job, documents, upload_store)
+    job['total'] = len(syllabi)
+    with stage('similarity'):
+        results = queue.run(compare_syllabi, [syllabus for _, syllabus in syllabi], sections)
+    job['done'] = len(syllabi)
+    
+    path = queue.output_path(job, '.xlsx')
+    queue.run(write_similarity_to_excel, path, [file_name for file_name, _ in syllabi], results)
+    return dict(workbook_result(path, 'similarity'), summary=cluster_summary(results))
+
+
+def boilerplate_job(queue, job, documents, upload_store):
+    """Deviation of every stored document from the canonical boilerplate, computed and written on the pool"""
+    syllabi = held_documents(job, documents, upload_store)
+    job['total'] = len(syllabi)
+    with stage('boilerplate'):
+        reports = queue.run(check_boilerplate, [syllabus for _, syllabus in syllabi])
+    job['done'] = len(syllabi)
+    
+    path = queue.output_path(job, '.xlsx')
+    queue.run(write_boilerplate_to_excel, path, [file_name for file_name, _ in syllabi], reports)
+    return dict(workbook_result(path, 'boilerplate'), summary=boilerplate_summary(reports))
+
+
+def workbook_result(path, prefix):
+    """Result of a job that wrote an Excel workbook to path, offered for download as prefix_<timestamp>.xlsx"""
+    return {
+        'path': path,
+        'file_name': f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+        'mime': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    }
+
+
+# One full-text index shared by every session, keyed by content hash so
+# identical uploads are indexed once (None if it cannot be opened)
+@st.cache_resource(show_spinner=False)
+def shared_search_index():
+    return open_search_index()
 
 # Top section: Load Syllabi | Text Preview | Predefined Sections
 col1, col2, col3 = st.columns([1, 2, 1])
@@ -440,22 +285,67 @@ col1, col2, col3 = st.columns([1, 2, 1])
 with col1:
     st.subheader("Load Syllabi")
     
+    # Files parsed by this session's finished upload jobs join its loaded files
+    for entry, job in session_jobs('upload'):
+        if job['status'] in ('done', 'failed'):
+            for file_name, loaded in (job['result'] or {}).items():
+                st.session_state.loaded_files.setdefault(file_name, loaded)
+            st.session_state.load_errors.extend(job['warnings'])
+            if job['error']:
+                st.session_state.load_errors.append(f"Loading failed: {job['error']}")
+            # The loaded files are this session's now, so their index rows stay
+            dismiss_job(entry, cleanup=False)
+    
+    def upload_progress(jobs):
+        for _, job in jobs:
+            if job['status'] in ('queued', 'running'):
+                st.progress(job['done'] / job['total'] if job['total'] else 0.0, text=f"{job['label']}: {job['done']} of {job['total']}")
+    
+    polled(upload_progress, 'upload')
+    
+    for error in st.session_state.load_errors:
+        st.error(error)
+    st.session_state.load_errors = []
+    
+    # A fresh key after each batch empties the uploader, so upload bytes are not kept in the session
     uploaded_files = st.file_uploader(
         "Choose files",
         type=['txt', 'pdf', 'docx'],
         accept_multiple_files=True,
-        key="file_uploader"
+        key=f"file_uploader_{st.session_state.upload_generation}"
     )
     
     if uploaded_files:
+        # Uploads any session already parsed are looked up; the rest are parsed
+        # by a background job on the shared pool
+        upload_store = shared_upload_store()
+        search_index = shared_search_index()
+        new_uploads = []
+        new_syllabi = []
         for file in uploaded_files:
-            if file.name not in st.session_state.loaded_files:
-                content = read_file(file, BytesIO(file.read()))
-                if content:
-                    st.session_state.loaded_files[file.name] = {
-                        'content': content,
-                        'path': file.name
-                    }
+            if file.name in st.session_state.loaded_files or any(file.name == upload[0] for upload in new_uploads):
+                continue
+            data = file.getvalue()
+            key = upload_key(data)
+            syllabus = upload_store.get(key, file.name)
+            if syllabus is None:
+                new_uploads.append((file.name, key, data))
+            else:
+                st.session_state.loaded_files[file.name] = {'key': key, 'content_hash': syllabus.content_hash}
+                new_syllabi.append(syllabus)
+        
+        if new_syllabi and search_index is not None:
+            with stage('search index'):
+                search_index.add_many((syllabus.content_hash, syllabus) for syllabus in new_syllabi)
+        if new_uploads:
+            job_id = shared_job_queue().submit(
+                f"Loading {len(new_uploads)} file(s)", parse_uploads_job, new_uploads, upload_store, search_index,
+                profiler=active()
+            )
+            st.session_state.jobs.append({'id': job_id, 'kind': 'upload'})
+        
+        st.session_state.upload_generation += 1
+        st.rerun()
     
     st.write("**Loaded Files:**")
     file_names = list(st.session_state.loaded_files.keys())
@@ -471,19 +361,60 @@ with col1:
             st.rerun()
     else:
         st.info("No files loaded yet")
+    
+    # Search across the loaded files and their sections
+    search_index = shared_search_index()
+    if file_names and search_index is not None:
+        query = st.text_input("Search loaded syllabi:", key="search_query")
+        if query.strip():
+            names_by_hash = {}
+            for file_name, entry in st.session_state.loaded_files.items():
+                names_by_hash.setdefault(entry['content_hash'], []).append(file_name)
+            # Documents dropped from the index since they were loaded (evicted from the upload store) are indexed again
+            unindexed = set(names_by_hash) - search_index.indexed(names_by_hash)
+            if unindexed:
+                with stage('search index'):
+                    search_index.add_many(
+                        (content_hash, syllabus) for content_hash, syllabus in (
+                            (content_hash, loaded_syllabus(names_by_hash[content_hash][0])) for content_hash in unindexed
+                        ) if syllabus is not None
+                    )
+            results = search_index.search(query, keys=names_by_hash.keys())
+            if not results:
+                st.info("No matches")
+            for result in results:
+                for file_name in names_by_hash[result['key']]:
+                    st.markdown(f"**{file_name}** - {result['section']}")
+                    st.caption(" ".join(result['snippet'].split()))
 
 # Middle column: Text Preview and Selected Text
 with col2:
+    syllabus = None
     if st.session_state.current_file and st.session_state.current_file in st.session_state.loaded_files:
-        file_data = st.session_state.loaded_files[st.session_state.current_file]
-        course_code, course_title = extract_course_info(file_data['content'])
+        syllabus = loaded_syllabus(st.session_state.current_file)
+    if syllabus is not None:
         
         st.subheader(f"File: {st.session_state.current_file}")
-        st.caption(f"{course_code or 'Unknown'} - {course_title or 'Unknown'}")
+        st.caption(f"{syllabus.course_code or 'Unknown'} - {syllabus.course_title or 'Unknown'}")
         
-        # Text preview
+        # Text preview; only one page of a long document is sent to the browser per rerun
         st.write("**Text Preview (you can copy text from here)**")
-        st.text_area("Preview:", value=file_data['content'], height=200, disabled=True, key="preview")
+        pages = preview_pages(syllabus.text)
+        sections_found = [section for section in predefined_sections if syllabus.span(section)]
+        jump = st.selectbox("Jump to section:", ["(none)"] + sections_found, key="preview_jump")
+        if jump != "(none)":
+            # Start the window at the section's heading line
+            start = syllabus.text.rfind('\n', 0, syllabus.span(jump)[0]) + 1
+            end = preview_window_end(syllabus.text, start)
+        else:
+            page = 1
+            if len(pages) > 1:
+                page = st.number_input(f"Page (of {len(pages)}):", min_value=1, max_value=len(pages), value=1, step=1, key="preview_page")
+            start = pages[page - 1]
+            end = pages[page] if page < len(pages) else len(syllabus.text)
+        if len(pages) > 1 or start > 0:
+            st.caption(f"Lines {syllabus.line_number(start)}-{syllabus.line_number(max(end - 1, start))} of {syllabus.line_number(len(syllabus.text))}")
+        st.text_area("Preview:", value=syllabus.text[start:end], height=200, disabled=True, key=f"preview_{start}")
         
         # Manual text selection/input
         st.write("**Selected/Manual Text:**")
@@ -508,7 +439,10 @@ col_export, col_compare = st.columns(2)
 with col_export:
     st.subheader("Export")
     
-    if st.button("Export to Excel"):
+    export_format = st.selectbox("Format:", export_formats(), key="export_format")
+    section_metadata = st.checkbox("Add found / length / page columns per section", key="section_metadata")
+    
+    if st.button("Export"):
         if not st.session_state.loaded_files:
             st.warning("Please load at least one file first.")
         else:
@@ -517,42 +451,13 @@ with col_export:
             if not checked_sections and not st.session_state.selected_text:
                 st.warning("Please select text or check predefined sections to export.")
             else:
-                export_data = []
-                for file_name, file_data in st.session_state.loaded_files.items():
-                    content = file_data['content']
-                    course_code, course_title = extract_course_info(content)
-                    row_data = {
-                        'Source File': file_name,
-                        'Course Code': course_code or 'Unknown',
-                        'Course Title': course_title or 'Unknown'
-                    }
-                    
-                    if st.session_state.selected_text and file_name == st.session_state.current_file:
-                        row_data['Selected Text'] = st.session_state.selected_text
-                    
-                    for section in checked_sections:
-                        section_content = extract_section(content, section)
-                        row_data[section] = section_content if section_content else "[Not Found]"
-                    
-                    # Search for prerequisites anywhere in the document
-                    if 'Prerequisites' in checked_sections and (row_data.get('Prerequisites') == "[Not Found]" or 'Prerequisites' not in row_data):
-                        extracted_prereqs = extract_prerequisites(content)
-                        if extracted_prereqs:
-                            row_data['Prerequisites'] = extracted_prereqs
-                    
-                    export_data.append(row_data)
-                
-                wb = write_to_excel(export_data)
-                output = BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                st.download_button(
-                    label="Download Excel File",
-                    data=output,
-                    file_name=f"syllabus_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                documents = [(file_name, entry['key']) for file_name, entry in st.session_state.loaded_files.items()]
+                job_id = shared_job_queue().submit(
+                    f"Export of {len(documents)} file(s) to {export_format}", export_job, documents, checked_sections,
+                    st.session_state.selected_text, st.session_state.current_file, section_metadata, export_format,
+                    shared_upload_store(), profiler=active()
                 )
+                st.session_state.jobs.append({'id': job_id, 'kind': 'file'})
 
 with col_compare:
     st.subheader("Compare Syllabi")
@@ -572,55 +477,48 @@ with col_compare:
                 if not checked_sections:
                     st.warning("Please check at least one section to compare.")
                 else:
-                    original_content = st.session_state.loaded_files[original_file]['content']
-                    new_content = st.session_state.loaded_files[new_file]['content']
-                    
-                    original_code, original_title = extract_course_info(original_content)
-                    new_code, new_title = extract_course_info(new_content)
-                    
-                    # Display comparison
-                    st.write("---")
-                    st.write(f"**Original:** {original_code or 'Unknown'} - {original_title or 'Unknown'}")
-                    st.write(f"**New:** {new_code or 'Unknown'} - {new_title or 'Unknown'}")
-                    st.write("---")
+                    original = loaded_syllabus(original_file)
+                    new = loaded_syllabus(new_file)
                     
-                    for section in checked_sections:
-                        original_section = extract_section(original_content, section)
-                        new_section = extract_section(new_content, section)
+                    if original is not None and new is not None:
+                        # The same comparison the workbook export writes, prerequisites fallback included
+                        comparison_data = build_comparison(original, new, checked_sections)
                         
-                        # Search for prerequisites anywhere in the document if not found
-                        if section == 'Prerequisites':
-                            if not original_section or original_section == "[NOT FOUND]":
-                                original_section = extract_prerequisites(original_content)
-                            if not new_section or new_section == "[NOT FOUND]":
-                                new_section = extract_prerequisites(new_content)
+                        # Display comparison
+                        st.write("---")
+                        st.write(f"**Original:** {comparison_data['original_code']} - {comparison_data['original_title']}")
+                        st.write(f"**New:** {comparison_data['new_code']} - {comparison_data['new_title']}")
+                        st.write("---")
                         
-                        col_a, col_b = st.columns(2)
-                        
-                        with col_a:
-                            st.write(f"**{section} - Original:**")
-                            st.text_area(
-                                label=f"original_{section}",
-                                value=original_section if original_section else "[NOT FOUND]",
-                                height=150,
-                                disabled=True,
-                                label_visibility="collapsed"
-                            )
-                        
-                        with col_b:
-                            st.write(f"**{section} - New:**")
-                            st.text_area(
-                                label=f"new_{section}",
-                                value=new_section if new_section else "[NOT FOUND]",
-                                height=150,
-                                disabled=True,
-                                label_visibility="collapsed"
-                            )
-                        
-                        if original_section != new_section:
-                            st.warning("⚠️ Changes detected in this section")
-                        else:
-                            st.success("✓ No changes in this section")
+                        for section, section_data in comparison_data['sections'].items():
+                            col_a, col_b = st.columns(2)
+                            
+                            with col_a:
+                                st.write(f"**{section} - Original:**")
+                                st.text_area(
+                                    label=f"original_{section}",
+                                    value=section_data['original'],
+                                    height=150,
+                                    disabled=True,
+                                    label_visibility="collapsed"
+                                )
+                            
+                            with col_b:
+                                st.write(f"**{section} - New:**")
+                                st.text_area(
+                                    label=f"new_{section}",
+                                    value=section_data['new'],
+                                    height=150,
+                                    disabled=True,
+                                    label_visibility="collapsed"
+                                )
+                            
+                            diff = section_data['diff']
+                            if diff['changed']:
+                                st.warning(f"⚠️ Changes detected in this section ({diff['similarity']:.0%} similar)")
+                                st.code("\n".join(format_diff(diff)), language="diff")
+                            else:
+                                st.success("✓ No changes in this section")
         
         if st.button("Export Comparison to Excel"):
             checked_sections = [s for s, checked in selected_sections.items() if checked]
@@ -630,47 +528,129 @@ with col_compare:
             elif original_file == new_file:
                 st.warning("Please select two different syllabi to compare.")
             else:
-                original_content = st.session_state.loaded_files[original_file]['content']
-                new_content = st.session_state.loaded_files[new_file]['content']
-                
-                original_code, original_title = extract_course_info(original_content)
-                new_code, new_title = extract_course_info(new_content)
-                
-                comparison_data = {
-                    'original_code': original_code or 'Unknown',
-                    'original_title': original_title or 'Unknown',
-                    'new_code': new_code or 'Unknown',
-                    'new_title': new_title or 'Unknown',
-                    'sections': {}
-                }
-                
-                for section in checked_sections:
-                    original_section = extract_section(original_content, section)
-                    new_section = extract_section(new_content, section)
-                    
-                    # Search for prerequisites anywhere in the document if not found
-                    if section == 'Prerequisites':
-                        if not original_section or original_section == "[NOT FOUND]":
-                            original_section = extract_prerequisites(original_content)
-                        if not new_section or new_section == "[NOT FOUND]":
-                            new_section = extract_prerequisites(new_content)
-                    
-                    comparison_data['sections'][section] = {
-                        'original': original_section or '[NOT FOUND]',
-                        'new': new_section or '[NOT FOUND]',
-                        'changed': original_section != new_section
-                    }
-                
-                wb = write_comparison_to_excel(comparison_data)
-                output = BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                st.download_button(
-                    label="Download Comparison Excel File",
-                    data=output,
-                    file_name=f"comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                documents = [(file_name, st.session_state.loaded_files[file_name]['key']) for file_name in (original_file, new_file)]
+                job_id = shared_job_queue().submit(
+                    f"{original_file} vs {new_file}", comparison_job, documents, checked_sections,
+                    shared_upload_store(), profiler=active()
+                )
+                st.session_state.jobs.append({'id': job_id, 'kind': 'file'})
+        
+        if st.button("Export Original vs All Loaded"):
+            checked_sections = [s for s, checked in selected_sections.items() if checked]
+            
+            if not checked_sections:
+                st.warning("Please check at least one section to compare.")
+            else:
+                # One sheet per other loaded syllabus, compared across the shared pool
+                documents = [(file_name, entry['key']) for file_name, entry in st.session_state.loaded_files.items()]
+                job_id = shared_job_queue().submit(
+                    f"{original_file} vs {len(documents) - 1} other file(s)", comparisons_job, original_file, documents,
+                    checked_sections, shared_upload_store(), profiler=active()
+                )
+                st.session_state.jobs.append({'id': job_id, 'kind': 'file'})
+        
+        if st.button("Compare All Loaded Syllabi"):
+            checked_sections = [s for s, checked in selected_sections.items() if checked]
+            
+            if not checked_sections:
+                st.warning("Please check at least one section to compare.")
+            else:
+                # Similarity matrix and clusters of every loaded syllabus, per checked section
+                documents = [(file_name, entry['key']) for file_name, entry in st.session_state.loaded_files.items()]
+                job_id = shared_job_queue().submit(
+                    f"Similarity of {len(documents)} file(s)", similarity_job, documents, checked_sections,
+                    shared_upload_store(), profiler=active()
                 )
+                st.session_state.jobs.append({'id': job_id, 'kind': 'file'})
+        
+        if st.button("Check Boilerplate Sections"):
+            # Deviation of each syllabus from the canonical Academic Integrity / Disability Services wording
+            documents = [(file_name, entry['key']) for file_name, entry in st.session_state.loaded_files.items()]
+            job_id = shared_job_queue().submit(
+                f"Boilerplate check of {len(documents)} file(s)", boilerplate_job, documents, shared_upload_store(),
+                profiler=active()
+            )
+            st.session_state.jobs.append({'id': job_id, 'kind': 'file'})
     else:
         st.info("Load at least 2 files to compare syllabi.")
+
+# Background jobs: progress of this session's exports, and their downloads once ready
+def file_jobs_panel(file_jobs):
+    if not file_jobs:
+        return
+    st.divider()
+    st.subheader("Jobs")
+    
+    for entry, job in file_jobs:
+        col_job, col_action = st.columns([3, 1])
+        with col_job:
+            if job['status'] in ('queued', 'running'):
+                st.progress(job['done'] / job['total'] if job['total'] else 0.0, text=f"{job['label']} ({job['status']})")
+            elif job['status'] == 'done':
+                st.write(f"**{job['label']}**: ready")
+                for line in job['result'].get('summary', ()):
+                    st.write(line)
+            else:
+                st.error(f"{job['label']} failed: {job['error']}")
+            for warning in job['warnings']:
+                st.warning(warning)
+        with col_action:
+            if job['status'] == 'done':
+                with open(job['result']['path'], 'rb') as f:
+                    st.download_button(
+                        label="Download",
+                        data=f.read(),
+                        file_name=job['result']['file_name'],
+                        mime=job['result']['mime'],
+                        key=f"download_{entry['id']}"
+                    )
+            if job['status'] in ('done', 'failed') and st.button("Dismiss", key=f"dismiss_{entry['id']}"):
+                dismiss_job(entry)
+                st.rerun()
+
+polled(file_jobs_panel, 'file')
+
+# Performance: per-stage timings of this session's loads, previews and exports
+st.divider()
+
+with st.expander("Performance"):
+    # Shared by every session on this server
+    upload_stats = shared_upload_store().stats()
+    st.caption(
+        f"Server holds {upload_stats['documents']} parsed upload(s), "
+        f"{upload_stats['bytes'] / 2**20:.1f} of {shared_upload_store().max_bytes / 2**20:.0f} MB"
+    )
+    job_stats = shared_job_queue().stats()
+    st.caption(
+        f"Background jobs on {shared_job_queue().workers} worker(s): "
+        + (", ".join(f"{count} {status}" for status, count in sorted(job_stats.items())) or "none")
+    )
+    st.checkbox("Record stage timings", key="record_timings")
+    report = st.session_state.profiler.report()
+    if report['stages']:
+        st.table([
+            {
+                'Stage': entry['stage'], 'Calls': entry['calls'], 'Wall s': round(entry['wall_seconds'], 3),
+                'CPU s': round(entry['cpu_seconds'], 3), 'MB': round(entry['bytes'] / 1e6, 2)
+            }
+            for entry in report['stages']
+        ])
+        st.write("**Slowest files:**")
+        for file_name, seconds in slowest_files(report, 5):
+            st.write(f"{file_name}: {seconds:.3f} s")
+        
+        col_download, col_clear = st.columns(2)
+        with col_download:
+            st.download_button(
+                label="Download Report (JSON)",
+                data=json.dumps(report, indent=2),
+                file_name=f"timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json"
+            )
+        with col_clear:
+            if st.button("Clear Timings"):
+                st.session_state.profiler.clear()
+                st.rerun()
+    else:
+        st.info("Check \"Record stage timings\", then load, preview or export files. Timings cover stages run since.")
+